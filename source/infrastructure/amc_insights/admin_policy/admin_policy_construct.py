@@ -279,6 +279,7 @@ class AdminPolicy(Construct):
         OCTAGON_DATASETS_TABLE = self._foundations_resources.datasets.table_arn
         OCTAGON_OBJECT_METADATA_TABLE = self._foundations_resources.object_metadata.table_arn
         OCTAGON_PIPELINE_EXECUTION_TABLE = self._foundations_resources.peh.table_arn
+        OCTAGON_PIPELINE_EXECUTION_EVENTS_TABLE = self._foundations_resources.peh_events.table_arn
         OCTAGON_PIPELINE_TABLE = self._foundations_resources.pipelines.table_arn
 
         ARTIFACTS_BUCKET = self._solution_buckets.artifacts_bucket.bucket_arn
@@ -296,6 +297,7 @@ class AdminPolicy(Construct):
         OCTAGON_DATASETS_TABLE_KEY = self._foundations_resources.datasets.encryption_key.key_arn
         OCTAGON_OBJECT_METADATA_TABLE_KEY = self._foundations_resources.object_metadata.encryption_key.key_arn
         OCTAGON_PIPELINE_EXECUTION_TABLE_KEY = self._foundations_resources.peh.encryption_key.key_arn
+        OCTAGON_PIPELINE_EXECUTION_EVENTS_TABLE_KEY = self._foundations_resources.peh_events.encryption_key.key_arn
         OCTAGON_PIPELINES_TABLE_KEY = self._foundations_resources.pipelines.encryption_key.key_arn
 
         LAKE_FORMATION_CATALOG = f"arn:aws:lakeformation:{Aws.REGION}:{Aws.ACCOUNT_ID}:catalog:{Aws.ACCOUNT_ID}"
@@ -354,6 +356,7 @@ class AdminPolicy(Construct):
                             OCTAGON_DATASETS_TABLE_KEY,
                             OCTAGON_OBJECT_METADATA_TABLE_KEY,
                             OCTAGON_PIPELINE_EXECUTION_TABLE_KEY,
+                            OCTAGON_PIPELINE_EXECUTION_EVENTS_TABLE_KEY,
                             OCTAGON_PIPELINES_TABLE_KEY
                         ]
                     ),
@@ -366,6 +369,7 @@ class AdminPolicy(Construct):
                             f"{OCTAGON_DATASETS_TABLE}*",
                             f"{OCTAGON_OBJECT_METADATA_TABLE}*",
                             f"{OCTAGON_PIPELINE_EXECUTION_TABLE}*",
+                            f"{OCTAGON_PIPELINE_EXECUTION_EVENTS_TABLE}*",
                             f"{OCTAGON_PIPELINE_TABLE}*",
                         ]
                     ),
@@ -53,8 +53,8 @@ METRICS_TO_SUM = [
     'DeleteWorkflowSchedule',
     'GetExecutionSummary',
     'GetWorkflow',
-    'SdlfHeavyTransformCheckJob',
     'SdlfHeavyTransformError',
+    'SdlfHeavyTransformJobStateChange',
     'SdlfHeavyTransformPostupdateMetadata',
     'SdlfHeavyTransformProcessObject',
     'SdlfHeavyTransformRedrive',
@@ -163,6 +163,9 @@ class SDLFDatasetConstruct(Construct):
             ]
         )
 
+        # Catalog updates of a table are serialized across job runs with a lease
+        self._foundations_resources.catalog_leases.grant_write_data(self.glue_role)
+
         ManagedPolicy(
             self,
             "glue-job-policy",
@@ -239,6 +242,7 @@ class SDLFDatasetConstruct(Construct):
                 "--SOLUTION_VERSION": self.node.try_get_context("SOLUTION_VERSION"),
                 "--METRICS_NAMESPACE": self.node.try_get_context("METRICS_NAMESPACE"),
                 "--RESOURCE_PREFIX": self._resource_prefix,
+                "--CATALOG_LEASES_TABLE": self._foundations_resources.catalog_leases.table_name,
             },
             role=self.glue_role.role_arn,
         )
@@ -380,3 +384,33 @@ class SDLFDatasetConstruct(Construct):
             source_arn=post_state_rule.attr_arn
         )
         event_invoke_lambda_permission.node.add_dependency(self._sdlf_pipeline_stage_b._routing_lambda)
+
+        # Resumes the stage B executions waiting for a run of the dataset job
+        job_state_change_rule = CfnRule(
+            self,
+            "job-state-change-rule-b",
+            name=f"{self._resource_prefix}-{self._team}-{self.dataset}-jobstate-rule-b",
+            description=f"Resume stage b step function when a {self.dataset} dataset glue job run ends",
+            event_pattern={
+                "source": ["aws.glue"],
+                "detail-type": ["Glue Job State Change"],
+                "detail": {
+                    "jobName": [self.job.name],
+                    "state": ["SUCCEEDED", "FAILED", "TIMEOUT", "STOPPED", "ERROR"]
+                }
+            },
+            state="ENABLED",
+            targets=[CfnRule.TargetProperty(
+                arn=self._sdlf_pipeline_stage_b._job_state_change_lambda.function_arn,
+                id="target-job-state-change-rule-b"
+            )])
+
+        job_state_change_lambda_permission = CfnPermission(
+            self,
+            "sdlf-dataset-jobstate-b",
+            action="lambda:InvokeFunction",
+            function_name=self._sdlf_pipeline_stage_b._job_state_change_lambda.function_name,
+            principal="events.amazonaws.com",
+            source_arn=job_state_change_rule.attr_arn
+        )
+        job_state_change_lambda_permission.node.add_dependency(self._sdlf_pipeline_stage_b._job_state_change_lambda)
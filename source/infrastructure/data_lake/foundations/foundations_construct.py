@@ -62,6 +62,14 @@ class FoundationsConstruct(Construct):
         self.stage_bucket, self.stage_bucket_key = self._create_bucket(name="stage")
         self.athena_bucket, self.athena_bucket_key = self._create_bucket(name="athena")
 
+        # Stage B batch manifests are only read while the batch is processed or redriven from its DLQ
+        self.stage_bucket.add_lifecycle_rule(
+            id="expire-batch-manifests",
+            prefix="manifests/",
+            expiration=cdk.Duration.days(14),
+            noncurrent_version_expiration=cdk.Duration.days(1)
+        )
+
         # Create Output Links for Buckets
         self._create_bucket_output_link(id_name="Raw", bucket_name=self.raw_bucket.bucket_name)
         self._create_bucket_output_link(id_name="Stage", bucket_name=self.stage_bucket.bucket_name)
@@ -71,6 +79,8 @@ class FoundationsConstruct(Construct):
         self._create_table_output_link(id_name="Octagon Datasets", table_name=self.datasets.table_name)
         self._create_table_output_link(id_name="Octagon Metadata", table_name=self.object_metadata.table_name)
         self._create_table_output_link(id_name="Octagon Pipeline Execution History", table_name=self.peh.table_name)
+        self._create_table_output_link(id_name="Octagon Pipeline Execution History Events",
+                                       table_name=self.peh_events.table_name)
         self._create_table_output_link(id_name="Octagon Pipelines", table_name=self.pipelines.table_name)
 
     def _create_customer_config_table(self) -> None:
@@ -103,8 +113,32 @@ class FoundationsConstruct(Construct):
             name=f"octagon-PipelineExecutionHistory-{self._environment_id}-{self._resource_prefix}",
             ddb_props={"partition_key": DDB.Attribute(name="id", type=DDB.AttributeType.STRING)},
         )
+        self.peh_events = self._create_octagon_ddb_table(
+            id="peh-events",
+            name=f"octagon-PipelineExecutionHistoryEvents-{self._environment_id}-{self._resource_prefix}",
+            ddb_props={"partition_key": DDB.Attribute(name="peh_id", type=DDB.AttributeType.STRING),
+                       "sort_key": DDB.Attribute(name="timestamp", type=DDB.AttributeType.STRING),
+                       "time_to_live_attribute": "ttl"},
+        )
+
+        # Leases serializing the catalog updates of a table across concurrent stage B jobs
+        self.catalog_leases = self._create_octagon_ddb_table(
+            id="catalog-leases",
+            name=f"octagon-CatalogLeases-{self._environment_id}-{self._resource_prefix}",
+            ddb_props={"partition_key": DDB.Attribute(name="name", type=DDB.AttributeType.STRING),
+                       "time_to_live_attribute": "ttl"},
+        )
+
+        # Task tokens of the stage B executions waiting for their glue job run to end
+        self.job_task_tokens = self._create_octagon_ddb_table(
+            id="job-task-tokens",
+            name=f"octagon-JobTaskTokens-{self._environment_id}-{self._resource_prefix}",
+            ddb_props={"partition_key": DDB.Attribute(name="id", type=DDB.AttributeType.STRING),
+                       "time_to_live_attribute": "ttl"},
+        )
 
-        for table in [self.object_metadata, self.datasets, self.pipelines, self.peh]:
+        for table in [self.object_metadata, self.datasets, self.pipelines, self.peh, self.peh_events,
+                      self.catalog_leases, self.job_task_tokens]:
             add_cfn_nag_suppressions(
                 table.node.default_child,
                 [
@@ -13,10 +13,13 @@ from pyspark.sql.types import NumericType, StructType
 
 from utilities import GlueUtilities
 solution_args = getResolvedOptions(sys.argv,
-                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE'])
+                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE',
+                                    'CATALOG_LEASES_TABLE'])
 glue_utils = GlueUtilities(solution_args)
 logger = glue_utils.logger
 
+NDJSON_SUFFIX = ".ndjson"
+
 
 def initialize_glue() -> (Job, GlueContext):
     spark_session = SparkSession.builder.config("hive.metastore.client.factory.class",
@@ -28,14 +31,22 @@ def initialize_glue() -> (Job, GlueContext):
     return job, glue_context
 
 
+def get_format_options(s3_key: str) -> dict:
+    if s3_key.endswith(NDJSON_SUFFIX):
+        # newline delimited json written by the light transform has one record per line
+        # and is split across executors
+        return {"multiline": False}
+    return {
+        "multiline": False,
+        # ads data is returned as list-structured json [{},{},{}]
+        # without this jsonPath, Glue will not properly load the data
+        "jsonPath": "$[*]"
+    }
+
+
 def load_source_data_from_s3(glue_context, bucket_name, s3_key) -> DynamicFrame:
     df_dynamic = glue_context.create_dynamic_frame.from_options(
-        format_options={
-            "multiline": False,
-            # ads data is returned as list-structured json [{},{},{}]
-            # without this jsonPath, Glue will not properly load the data
-            "jsonPath": "$[*]"
-        },
+        format_options=get_format_options(s3_key),
         connection_type="s3",
         format="json",
         connection_options={
@@ -63,11 +74,12 @@ def create_or_update_table(glue_context, frame: DynamicFrame, db: str, table: st
 def extract_table_name_and_s3_path(object_key: str) -> Tuple[str, str]:
     """
     Parse an S3 object key to extract the table name and generate the output S3 path.
-    @param object_key: object_key (str): The S3 object key in the format "pre-stage/<team>/<dataset>/<table_name>/<filename>.json".
+    @param object_key: object_key (str): The S3 object key in the format "pre-stage/<team>/<dataset>/<table_name>/<filename>.json"
+        or "pre-stage/<team>/<dataset>/<table_name>/<filename>.ndjson".
     @return: A tuple containing the table name and the output S3 path.
     """
     table_name = object_key.split("/")[3]
-    output_s3_path = object_key.replace("pre-stage", "post-stage").removesuffix(".json")
+    output_s3_path = object_key.replace("pre-stage", "post-stage").removesuffix(NDJSON_SUFFIX).removesuffix(".json")
     return table_name, output_s3_path
 
 
@@ -124,14 +136,16 @@ def get_resolve_choice_specs(dynamic_frame: DynamicFrame, fields_with_choice: Li
 
 
 if __name__ == '__main__':
+    # Large batches are passed as a manifest instead of comma separated keys
+    source_argument = 'SOURCE_MANIFEST' if '--SOURCE_MANIFEST' in sys.argv else 'SOURCE_S3_OBJECT_KEYS'
     args = getResolvedOptions(
         sys.argv, ['JOB_NAME',
                    'STAGE_BUCKET',
                    'DATABASE_NAME',
-                   'SOURCE_S3_OBJECT_KEYS',
+                   source_argument,
                    ])
     stage_bucket = args['STAGE_BUCKET']
-    source_s3_object_keys = args['SOURCE_S3_OBJECT_KEYS'].split(",")
+    source_s3_object_keys, source_s3_object_sizes = glue_utils.get_source_object_keys(args)
     database = args['DATABASE_NAME']
     job_name = args['JOB_NAME']
 
@@ -165,8 +179,10 @@ if __name__ == '__main__':
         logger.info(f"Number of rows: {df_dynamic.count()}")
         
         # <bucket-name>/<team>/<dataset>/<table_name>/<source_file_name>/output.parquet
-        create_or_update_table(glue_context, df_dynamic, database, table_name,
-                               f"s3://{stage_bucket}/{output_s3_path}")
+        # Concurrent runs updating the same table wait for each other
+        with glue_utils.catalog_lease(database, table_name):
+            create_or_update_table(glue_context, df_dynamic, database, table_name,
+                                   f"s3://{stage_bucket}/{output_s3_path}")
         
         destination_s3_object_paths.append(output_s3_path)
         
@@ -174,7 +190,8 @@ if __name__ == '__main__':
         source_bucket=stage_bucket,
         source_keys=source_s3_object_keys,
         destination_bucket=stage_bucket,
-        destination_paths=destination_s3_object_paths
+        destination_paths=destination_s3_object_paths,
+        source_sizes=source_s3_object_sizes
     )
 
     job.commit()
\ No newline at end of file
@@ -14,12 +14,14 @@ import re
 import unicodedata
 from pandas.api.types import is_numeric_dtype, is_string_dtype
 from aws_lambda_powertools import Logger
+from utilities import GlueUtilities
 
 # create logger
 logger = Logger(service="Glue job for AMC dataset", level='INFO', utc=True)
 
 solution_args = getResolvedOptions(sys.argv,
-                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE'])
+                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE',
+                                    'CATALOG_LEASES_TABLE'])
 solution_id = solution_args['SOLUTION_ID']
 solution_version = solution_args['SOLUTION_VERSION']
 resource_prefix = solution_args['RESOURCE_PREFIX']
@@ -45,6 +47,7 @@ glue_client = get_service_client('glue')
 s3_resource = get_service_resource('s3')
 s3_client = get_service_client('s3')
 lf_client = get_service_client('lakeformation')
+glue_utils = GlueUtilities(solution_args)
 
 # This map is used to convert Athena datatypes (in uppercase) to pandas Datatypes
 data_type_map = {
@@ -101,6 +104,15 @@ def get_bucket_and_key_from_s3_uri(s3_path: str) -> (str, str):
     return output_bucket, output_key
 
 
+def get_source_locations(args: dict) -> list:
+    # Large batches are passed as a manifest of keys of the source bucket instead of comma separated locations
+    if 'SOURCE_MANIFEST' in args:
+        source_bucket, _ = get_bucket_and_key_from_s3_uri(args['SOURCE_LOCATION'])
+        source_keys, _ = glue_utils.read_source_manifest(args['SOURCE_MANIFEST'])
+        return [f"s3://{source_bucket}/{key}" for key in source_keys]
+    return args['SOURCE_LOCATIONS'].split(',')
+
+
 def athena_sanitize_name(name: str) -> str:
     name = "".join(c for c in unicodedata.normalize("NFD", name) if unicodedata.category(c) != "Mn")  # strip accents
     return re.sub("\W+", "_", name).lower()  # Replacing non-alphanumeric characters by underscore
@@ -200,12 +212,17 @@ def add_tags_lf(cust_hash_tag_dict, database_name, table_name):
         print("Exception while adding tags to tables : " + str(e))
 
 
+def table_exists(silver_catalog, target_table_name):
+    try:
+        glue_client.get_table(DatabaseName=silver_catalog, Name=wr.catalog.sanitize_table_name(target_table_name))
+    except glue_client.exceptions.EntityNotFoundException:
+        return False
+    return True
+
+
 def create_update_tbl(csvdf, csv_schema, tbl_schema, silver_catalog, target_table_name, list_partns, outputfilebasepath,
                       table_exist, cust_hash, pandas_athena_datatypes):
     if table_exist == 1:
-        extra_cols = list(set(csv_schema.keys()) - set(tbl_schema.keys()))
-        print("extra_cols : " + str(extra_cols))
-
         tbl = glue_client.get_table(
             DatabaseName=silver_catalog,
             Name=wr.catalog.sanitize_table_name(target_table_name)
@@ -214,6 +231,10 @@ def create_update_tbl(csvdf, csv_schema, tbl_schema, silver_catalog, target_tabl
         print(tbl)
 
         strg_descrptr = tbl["Table"]["StorageDescriptor"]
+        # Columns added by another run since the schema was read are not added twice
+        tbl_cols = set(tbl_schema.keys()) | {col['Name'] for col in strg_descrptr["Columns"]}
+        extra_cols = [col for col in csv_schema.keys() if col not in tbl_cols]
+        print("extra_cols : " + str(extra_cols))
         new_cols = []
         if len(extra_cols) > 0:
             print("Adding new columns")
@@ -482,6 +503,7 @@ def process_files(source_locations, output_location, kms_key, silver_catalog):
             continue
 
         # Read the bytes of the csv file once so we can process it with pandas twice, only reading from S3 once.
+        # Escaped double quotes are normalised here, stage A copies the AMC files unchanged
         csv_file_data = io.StringIO(source_s3_object['Body'].read().decode("UTF8").replace('\\"', "'"))
 
         # create filtered copy of the data that will be used to derive the schema in case there is no filter fields
@@ -588,12 +610,19 @@ def process_files(source_locations, output_location, kms_key, silver_catalog):
 
         outputfilebasepath = '{}/{}/'.format(output_location, target_table_name)
 
-        # Create or update table
-        create_update_tbl(csvdf, csv_schema, table_schema, silver_catalog, target_table_name, list_partns,
-                          outputfilebasepath, table_exist, cust_hash, pandas_athena_datatypes)
+        # Concurrent runs updating the same table wait for each other
+        with glue_utils.catalog_lease(silver_catalog, wr.catalog.sanitize_table_name(target_table_name)):
+            if table_exist == 0 and table_exists(silver_catalog, target_table_name):
+                logger.info(f"Table {target_table_name} was created by another run, updating it")
+                table_exist = 1
+                table_schema = {}
+
+            # Create or update table
+            create_update_tbl(csvdf, csv_schema, table_schema, silver_catalog, target_table_name, list_partns,
+                              outputfilebasepath, table_exist, cust_hash, pandas_athena_datatypes)
 
-        # add partitions
-        add_partitions(outputfilebasepath, silver_catalog, list_partns, target_table_name)
+            # add partitions
+            add_partitions(outputfilebasepath, silver_catalog, list_partns, target_table_name)
 
 
 def record_metric(metric_name, metric_value):
@@ -616,15 +645,16 @@ def record_metric(metric_name, metric_value):
 
 
 if __name__ == '__main__':
+    # Large batches are passed as a manifest instead of comma separated locations
+    source_argument = 'SOURCE_MANIFEST' if '--SOURCE_MANIFEST' in sys.argv else 'SOURCE_LOCATIONS'
     args = getResolvedOptions(
         sys.argv,
-        ['JOB_NAME', 'SOURCE_LOCATION', 'SOURCE_LOCATIONS', 'OUTPUT_LOCATION', 'SILVER_CATALOG', 'GOLD_CATALOG',
+        ['JOB_NAME', 'SOURCE_LOCATION', source_argument, 'OUTPUT_LOCATION', 'SILVER_CATALOG', 'GOLD_CATALOG',
          'KMS_KEY'])
 
     job_name = args['JOB_NAME']
     source_location = args['SOURCE_LOCATION']
-    source_locations = args['SOURCE_LOCATIONS']
-    source_locations = source_locations.split(',')
+    source_locations = get_source_locations(args)
     output_location = args['OUTPUT_LOCATION']
     silver_catalog = args['SILVER_CATALOG']
     gold_catalog = args['GOLD_CATALOG']
@@ -15,7 +15,8 @@ from awsglue.gluetypes import ChoiceType, NullType
 
 from utilities import GlueUtilities
 solution_args = getResolvedOptions(sys.argv,
-                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE'])
+                                   ['SOLUTION_ID', 'SOLUTION_VERSION', 'RESOURCE_PREFIX', 'METRICS_NAMESPACE',
+                                    'CATALOG_LEASES_TABLE'])
 glue_utils = GlueUtilities(solution_args)
 logger = glue_utils.logger
 
@@ -40,6 +41,8 @@ class ReportChoiceFields:
 
 SP_REPORT_KEY_IN_JSON_FILE = "examples"
 REPORT_SPECIFICATION_KEY_IN_JSON_FILE = "reportSpecification"
+# report sections written by the light transform as "<filename>/<report_name>.ndjson", one record per line
+NDJSON_SUFFIX = ".ndjson"
 
 
 def load_source_data_from_s3(glue_context, bucket_name, s3_key) -> SourceData:
@@ -74,11 +77,12 @@ def create_or_update_table(glue_context, frame: DynamicFrame, db: str, table: st
 def parse_s3_object_key(object_key: str) -> Tuple[str, str]:
     """
     Parse an S3 object key to extract the table name and generate the output S3 path.
-    @param object_key: object_key (str): The S3 object key in the format "pre-stage/<team>/<dataset>/<table_name>/<filename>.json".
+    @param object_key: object_key (str): The S3 object key in the format "pre-stage/<team>/<dataset>/<table_name>/<filename>.json"
+        or "pre-stage/<team>/<dataset>/<table_name>/<filename>/<report_name>.ndjson".
     @return: A tuple containing the table name and the output S3 path.
     """
     table_name = object_key.split("/")[3]
-    output_s3_path = object_key.replace("pre-stage", "post-stage").removesuffix(".json")
+    output_s3_path = object_key.replace("pre-stage", "post-stage").removesuffix(NDJSON_SUFFIX).removesuffix(".json")
     return table_name, output_s3_path
 
 
@@ -102,6 +106,34 @@ def extract_sp_reports(dynamic_df: DynamicFrame) -> List[Report]:
     return reports
 
 
+def extract_sp_ndjson_report(source_data: SourceData, object_key: str) -> List[Report]:
+    """
+    Create the Report of a report section file, its records are already one per row so nothing is exploded.
+    @param source_data: The source data loaded from the report section file.
+    @param object_key: The S3 object key in the format "pre-stage/<team>/<dataset>/<table_name>/<filename>/<report_name>.ndjson".
+    @return: A list with the Report, empty if the report has no records.
+    """
+    report_name = object_key.split("/")[-1].removesuffix(NDJSON_SUFFIX)
+    choice_fields = [field.name for field in source_data.dynamic_frame.schema().fields
+                     if isinstance(field.dataType, ChoiceType)]
+    report_choice_fields = categorize_choice_fields(source_data.spark_dataframe, choice_fields)
+    logger.info(f"Report's numeric and non-numeric choice fields: {report_choice_fields}")
+
+    specs = [(field, "cast:double") for field in report_choice_fields.fields_with_numeric_choice] + \
+            [(field, "cast:string") for field in report_choice_fields.fields_with_non_numeric_choice]
+    logger.info(f"Resolve choice specs: {specs}")
+
+    report_dynamic_df = source_data.dynamic_frame
+    if specs:
+        report_dynamic_df = report_dynamic_df.resolveChoice(specs=specs)
+
+    report_df = report_dynamic_df.toDF()
+    if report_df.isEmpty():
+        logger.info("The report is empty")
+        return []
+    return [Report(name=report_name, dataframe=report_df)]
+
+
 def is_struct_type_numeric(struct_type: StructType) -> bool:
     return all(isinstance(field.dataType, NumericType) for field in struct_type.fields)
 
@@ -207,15 +239,17 @@ def get_resolve_choice_specs(report_to_choice_fields: Dict[str, ReportChoiceFiel
 
 
 if __name__ == '__main__':
+    # Large batches are passed as a manifest instead of comma separated keys
+    source_argument = 'SOURCE_MANIFEST' if '--SOURCE_MANIFEST' in sys.argv else 'SOURCE_S3_OBJECT_KEYS'
     args = getResolvedOptions(
         sys.argv, ['JOB_NAME',
                    'STAGE_BUCKET',
                    'DATABASE_NAME',
-                   'SOURCE_S3_OBJECT_KEYS',
+                   source_argument,
                    ])
 
     stage_bucket = args['STAGE_BUCKET']
-    source_s3_object_keys = args['SOURCE_S3_OBJECT_KEYS'].split(",")
+    source_s3_object_keys, source_s3_object_sizes = glue_utils.get_source_object_keys(args)
     database = args['DATABASE_NAME']
 
     job, glue_context = initialize_glue()
@@ -227,22 +261,26 @@ if __name__ == '__main__':
         table_name, output_s3_path = parse_s3_object_key(source_s3_object_key)
         source_data = load_source_data_from_s3(glue_context, stage_bucket, source_s3_object_key)
 
-        report_columns = get_sp_report_columns(source_data.spark_dataframe, [REPORT_SPECIFICATION_KEY_IN_JSON_FILE])
-        reports_dynamic_df = source_data.dynamic_frame.select_fields(paths=report_columns)
-        reports_dynamic_df.printSchema()
+        if source_s3_object_key.endswith(NDJSON_SUFFIX):
+            source_data.dynamic_frame.printSchema()
+            reports = extract_sp_ndjson_report(source_data, source_s3_object_key)
+        else:
+            report_columns = get_sp_report_columns(source_data.spark_dataframe, [REPORT_SPECIFICATION_KEY_IN_JSON_FILE])
+            reports_dynamic_df = source_data.dynamic_frame.select_fields(paths=report_columns)
+            reports_dynamic_df.printSchema()
 
-        choice_fields_by_report = get_choice_fields_by_report(reports_dynamic_df)
+            choice_fields_by_report = get_choice_fields_by_report(reports_dynamic_df)
 
-        report_choice_fields = categorize_choice_fields_by_report(source_data.spark_dataframe, choice_fields_by_report)
-        logger.info(f"Reports' numeric and non-numeric choice fields: {report_choice_fields}")
+            report_choice_fields = categorize_choice_fields_by_report(source_data.spark_dataframe, choice_fields_by_report)
+            logger.info(f"Reports' numeric and non-numeric choice fields: {report_choice_fields}")
 
-        specs = get_resolve_choice_specs(report_choice_fields)
-        logger.info(f"Resolve choice specs: {specs}")
+            specs = get_resolve_choice_specs(report_choice_fields)
+            logger.info(f"Resolve choice specs: {specs}")
 
-        if specs:
-            reports_dynamic_df = reports_dynamic_df.resolveChoice(specs=specs)
+            if specs:
+                reports_dynamic_df = reports_dynamic_df.resolveChoice(specs=specs)
 
-        reports = extract_sp_reports(reports_dynamic_df)
+            reports = extract_sp_reports(reports_dynamic_df)
 
         for report in reports:
             report_table_name = f"{table_name}_{report.name}"
@@ -259,8 +297,10 @@ if __name__ == '__main__':
             logger.info(f"Number of rows: {report_dynamic_frame.count()}")
 
             # <bucket-name>/<team>/<dataset>/<table_name>/<source_file_name>/output.parquet
-            create_or_update_table(glue_context, report_dynamic_frame, database, report_table_name,
-                                   f"s3://{stage_bucket}/{report_output_s3_path}")
+            # Concurrent runs updating the same table wait for each other
+            with glue_utils.catalog_lease(database, report_table_name):
+                create_or_update_table(glue_context, report_dynamic_frame, database, report_table_name,
+                                       f"s3://{stage_bucket}/{report_output_s3_path}")
             
             destination_s3_object_paths.append(report_output_s3_path)
             
@@ -268,7 +308,8 @@ if __name__ == '__main__':
         source_bucket=stage_bucket,
         source_keys=source_s3_object_keys,
         destination_bucket=stage_bucket,
-        destination_paths=destination_s3_object_paths
+        destination_paths=destination_s3_object_paths,
+        source_sizes=source_s3_object_sizes
     )
 
     job.commit()
\ No newline at end of file
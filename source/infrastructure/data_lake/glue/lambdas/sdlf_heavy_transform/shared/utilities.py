@@ -1,12 +1,27 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
 import logging
+import random
+import threading
+import time
+import uuid
 import datetime as dt
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+from urllib.parse import urlparse
 
 import boto3
 from botocore.config import Config
 
+# A catalog lease expires on its own if the job holding it stops before releasing it
+CATALOG_LEASE_SECONDS = 900
+# The lease is renewed while it is held, so it doesn't expire during a long sink write
+CATALOG_LEASE_RENEW_SECONDS = 300
+CATALOG_LEASE_WAIT_SECONDS = 3600
+CATALOG_LEASE_POLL_SECONDS = 10
+
 
 class GlueUtilities:
     """
@@ -24,11 +39,13 @@ class GlueUtilities:
             - 'SOLUTION_VERSION': The current version of the solution.
             - 'RESOURCE_PREFIX': The prefix used to name and identify resources.
             - 'METRICS_NAMESPACE': The CloudWatch namespace used for logging custom metrics.
+            - 'CATALOG_LEASES_TABLE' (optional): The DynamoDB table holding the catalog table leases.
         """
         self.solution_id = solution_args['SOLUTION_ID']
         self.solution_version = solution_args['SOLUTION_VERSION']
         self.resource_prefix = solution_args['RESOURCE_PREFIX']
         self.metrics_namespace = solution_args['METRICS_NAMESPACE']
+        self.catalog_leases_table = solution_args.get('CATALOG_LEASES_TABLE')
         self.logger = self.create_logger()
         self.s3_client = self.get_service_client("s3")
         self.cloudwatch_client = self.get_service_client('cloudwatch')
@@ -104,11 +121,43 @@ class GlueUtilities:
             # Log error but do not raise so that execution is not interrupted
             self.logger.error(f"Error recording custom value {metric_value} to metric {metric_name}: {e}")
         
+    def read_source_manifest(self, manifest_uri: str) -> Tuple[list, dict]:
+        """
+        Reads the batch manifest written by the stage B routing, which replaces the comma separated source keys
+        argument so that a job can process batches of any size.
+
+        :param manifest_uri: The S3 URI of the manifest.
+
+        :return: A tuple of the source object keys and of their sizes by key, when recorded in the manifest.
+        """
+        parsed_uri = urlparse(manifest_uri)
+        self.logger.info(f"Reading source manifest {manifest_uri}")
+        response = self.s3_client.get_object(Bucket=parsed_uri.netloc, Key=parsed_uri.path.lstrip('/'))
+        entries = json.loads(response['Body'].read())['entries']
+
+        source_keys = [entry['key'] for entry in entries]
+        source_sizes = {entry['key']: entry['size'] for entry in entries if 'size' in entry}
+        return source_keys, source_sizes
+
+    def get_source_object_keys(self, args: dict) -> Tuple[list, dict]:
+        """
+        Returns the source object keys of the job from the SOURCE_MANIFEST argument if it was passed,
+        or from the SOURCE_S3_OBJECT_KEYS argument otherwise.
+
+        :param args: The resolved job arguments.
+
+        :return: A tuple of the source object keys and of their sizes by key, when known.
+        """
+        if 'SOURCE_MANIFEST' in args:
+            return self.read_source_manifest(args['SOURCE_MANIFEST'])
+        return args['SOURCE_S3_OBJECT_KEYS'].split(","), {}
+
     def record_glue_metrics(self, 
                             source_bucket: str, 
                             destination_bucket: str, 
                             source_keys: list=[], 
                             destination_paths: list=[],
+                            source_sizes: dict=None,
     ) -> None:
         """
         Records metrics for bytes read from the source S3 object and bytes written to the destination S3 object 
@@ -118,12 +167,18 @@ class GlueUtilities:
         :param destination_bucket: The name of the S3 bucket containing the destination objects.
         :param source_keys (optional): A list of s3 keys for source objects.
         :param destination_paths (optional): A list of s3 key paths for destination objects that excludes the file name.
+        :param source_sizes (optional): The sizes of the source objects by key, e.g. from the source manifest,
+            the other source objects are retrieved from S3.
         """
         if not source_keys:
             self.logger.warning("No source keys provided for Glue job, skipping bytes_read metric")
             
+        source_sizes = source_sizes or {}
         total_bytes_read = 0
         for key in source_keys:
+            if key in source_sizes:
+                total_bytes_read += source_sizes[key]
+                continue
             try:
                 response = self.s3_client.head_object(Bucket=source_bucket, Key=key)
                 bytes_read = response["ContentLength"]
@@ -157,6 +212,92 @@ class GlueUtilities:
             self.put_metrics_count_value_custom("SdlfHeavyTransformJob-bytes_written", total_bytes_written)
     
     
+    @contextmanager
+    def catalog_lease(self, database: str, table: str, owner: Optional[str] = None) -> Iterator[None]:
+        """
+        Holds a lease on a catalog table while the job updates its schema and partitions. Concurrent jobs
+        updating the same table wait for the lease, so they don't overwrite each other's table updates.
+        Without a leases table the updates are not serialized.
+
+        :param database: The name of the Glue database of the table.
+        :param table: The name of the table.
+        :param owner (optional): The identifier of the lease holder, e.g. the job run id.
+        """
+        if not self.catalog_leases_table:
+            yield
+            return
+
+        dynamodb_client = self.get_service_client('dynamodb')
+        lease_name = f"{database}.{table}"
+        owner = owner or str(uuid.uuid4())
+        deadline = time.monotonic() + CATALOG_LEASE_WAIT_SECONDS
+        while True:
+            now = int(time.time())
+            try:
+                dynamodb_client.put_item(
+                    TableName=self.catalog_leases_table,
+                    Item={
+                        'name': {'S': lease_name},
+                        'owner': {'S': owner},
+                        'ttl': {'N': str(now + CATALOG_LEASE_SECONDS)}
+                    },
+                    ConditionExpression='attribute_not_exists(#name) OR #ttl < :now OR #owner = :owner',
+                    ExpressionAttributeNames={'#name': 'name', '#ttl': 'ttl', '#owner': 'owner'},
+                    ExpressionAttributeValues={':now': {'N': str(now)}, ':owner': {'S': owner}}
+                )
+                break
+            except dynamodb_client.exceptions.ConditionalCheckFailedException:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Unable to acquire the catalog lease of {lease_name}")
+                self.logger.info(f"Waiting for the catalog lease of {lease_name}")
+                time.sleep(CATALOG_LEASE_POLL_SECONDS * (1 + random.random()))  # NOSONAR
+
+        self.logger.info(f"Acquired the catalog lease of {lease_name}")
+        released = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._renew_catalog_lease, args=(dynamodb_client, lease_name, owner, released),
+            name="catalog-lease-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            yield
+        finally:
+            released.set()
+            heartbeat.join()
+            try:
+                dynamodb_client.delete_item(
+                    TableName=self.catalog_leases_table,
+                    Key={'name': {'S': lease_name}},
+                    ConditionExpression='#owner = :owner',
+                    ExpressionAttributeNames={'#owner': 'owner'},
+                    ExpressionAttributeValues={':owner': {'S': owner}}
+                )
+            except dynamodb_client.exceptions.ConditionalCheckFailedException:
+                self.logger.warning(f"The catalog lease of {lease_name} expired before it was released")
+
+    def _renew_catalog_lease(self, dynamodb_client, lease_name: str, owner: str, released: threading.Event) -> None:
+        """
+        Extends the ttl of a held catalog lease until it is released. Renewing stops if the lease was taken over.
+        """
+        while not released.wait(CATALOG_LEASE_RENEW_SECONDS):
+            try:
+                dynamodb_client.update_item(
+                    TableName=self.catalog_leases_table,
+                    Key={'name': {'S': lease_name}},
+                    UpdateExpression='SET #ttl = :ttl',
+                    ConditionExpression='#owner = :owner',
+                    ExpressionAttributeNames={'#ttl': 'ttl', '#owner': 'owner'},
+                    ExpressionAttributeValues={
+                        ':ttl': {'N': str(int(time.time()) + CATALOG_LEASE_SECONDS)},
+                        ':owner': {'S': owner}
+                    }
+                )
+            except dynamodb_client.exceptions.ConditionalCheckFailedException:
+                self.logger.warning(f"The catalog lease of {lease_name} was lost before it was released")
+                return
+            except Exception as e:
+                # The lease is still valid until its ttl, the next heartbeat retries
+                self.logger.warning(f"Unable to renew the catalog lease of {lease_name}: {e}")
+
     def get_s3_object_metadata(self, bucket_name: str, s3_key: str) -> dict:
         """
         Retrieves metadata from an S3 object.
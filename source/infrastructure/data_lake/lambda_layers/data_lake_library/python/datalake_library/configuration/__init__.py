@@ -1,4 +1,6 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-from .resource_configs import StateMachineConfiguration, DynamoConfiguration, SQSConfiguration, S3Configuration
\ No newline at end of file
+from .base_config import clear_ssm_parameters_cache
+from .resource_configs import StateMachineConfiguration, DynamoConfiguration, SQSConfiguration, S3Configuration, \
+    KMSConfiguration, GlueConfiguration
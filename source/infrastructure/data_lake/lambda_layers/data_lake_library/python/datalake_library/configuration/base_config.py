@@ -1,16 +1,33 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import time
+
 from botocore.exceptions import ClientError
 
 from ..commons import init_logger
 
+# SSM parameters cache shared by all configuration instances of the process
+# {parameter name: (value, expiry)} and {path: expiry} for the prefetched paths
+_ssm_parameters_cache = dict()
+_ssm_prefetched_paths = dict()
+
+
+def clear_ssm_parameters_cache():
+    """Drops all the SSM parameters cached by the configuration classes
+    """
+    _ssm_parameters_cache.clear()
+    _ssm_prefetched_paths.clear()
+
 
 class BaseConfig:
     def __init__(self, log_level, ssm_interface):
         self.log_level = log_level
         self._logger = init_logger(log_level)
         self._ssm = ssm_interface
+        self._cache_ttl = int(os.getenv('SSM_PARAMETERS_CACHE_TTL', '300'))
+        self._prefetch = os.getenv('SSM_PARAMETERS_PREFETCH', 'false').lower() == 'true'
 
     def _fetch_from_event(self):
         raise NotImplementedError()
@@ -24,11 +41,47 @@ class BaseConfig:
     def _fetch_from_dynamodb(self):
         raise NotImplementedError()
 
+    def _get_cached_ssm_param(self, key):
+        cached = _ssm_parameters_cache.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        return None
+
+    def _cache_ssm_param(self, key, value):
+        _ssm_parameters_cache[key] = (value, time.time() + self._cache_ttl)
+
+    def _prefetch_ssm_params(self, path):
+        """Loads all the parameters under the path in the cache with GetParametersByPath
+
+        Arguments:
+            path {string} -- Parameters hierarchy to load (e.g. /prefix/)
+        """
+        prefetched = _ssm_prefetched_paths.get(path)
+        if prefetched and prefetched > time.time():
+            return
+        try:
+            self._logger.info('Prefetching SSM Parameters under: {}'.format(path))
+            paginator = self._ssm.get_paginator('get_parameters_by_path')
+            for page in paginator.paginate(Path=path, Recursive=True):
+                for parameter in page['Parameters']:
+                    self._cache_ssm_param(parameter['Name'], parameter['Value'])
+        except ClientError as e:
+            # Individual parameters are still read with GetParameter
+            self._logger.error("Unable to prefetch SSM Parameters: %s" % e)
+        _ssm_prefetched_paths[path] = time.time() + self._cache_ttl
+
     def _get_ssm_param(self, key):
+        ssm_parameter_value = self._get_cached_ssm_param(key)
+        if ssm_parameter_value is None and self._prefetch:
+            self._prefetch_ssm_params('/{}/'.format(key.split('/')[1]))
+            ssm_parameter_value = self._get_cached_ssm_param(key)
+        if ssm_parameter_value is not None:
+            return ssm_parameter_value
         try:
             self._logger.info('Obtaining SSM Parameter: {}'.format(key))
             ssm_parameter_value = self._ssm.get_parameter(Name=key)['Parameter']['Value']
             self._logger.info('Obtained SSM Parameter: Key: {} Value: {}'.format(key, ssm_parameter_value))
+            self._cache_ssm_param(key, ssm_parameter_value)
             return ssm_parameter_value
         except ClientError as e:
             if e.response['Error']['Code'] == 'ThrottlingException':
@@ -115,6 +115,7 @@ class DynamoConfiguration(BaseConfig):
     def _fetch_from_ssm(self):
         self._object_metadata_table = None
         self._transform_mapping_table = None
+        self._job_task_tokens_table = None
 
     @property
     def object_metadata_table(self):
@@ -130,6 +131,13 @@ class DynamoConfiguration(BaseConfig):
                 '/{}/DynamoDB/Datasets'.format(self._resource_prefix))
         return self._transform_mapping_table
 
+    @property
+    def job_task_tokens_table(self):
+        if not self._job_task_tokens_table:
+            self._job_task_tokens_table = self._get_ssm_param(
+                '/{}/DynamoDB/JobTaskTokens'.format(self._resource_prefix))
+        return self._job_task_tokens_table
+
 
 class SQSConfiguration(BaseConfig):
     def __init__(self, resource_prefix, team, dataset, stage, log_level=None, ssm_interface=None):
@@ -197,6 +205,34 @@ class StateMachineConfiguration(BaseConfig):
         return self._stage_state_machine_arn
 
 
+class GlueConfiguration(BaseConfig):
+    def __init__(self, resource_prefix, team, dataset, log_level=None, ssm_interface=None):
+        """
+        Complementary Glue config stores the parameters required to access the dataset Glue catalog
+        :param log_level: level the class logger should log at
+        :param ssm_interface: ssm interface, normally boto, to read parameters from parameter store
+        """
+        self.log_level = log_level or os.getenv('LOG_LEVEL', 'INFO')
+        self._logger = init_logger(self.log_level)
+        self._ssm = ssm_interface or get_service_client('ssm')
+        self._team = team
+        self._dataset = dataset
+        self._resource_prefix = resource_prefix
+        super().__init__(self.log_level, self._ssm)
+
+        self._fetch_from_ssm()
+
+    def _fetch_from_ssm(self):
+        self._stage_data_catalog = None
+
+    @property
+    def get_stage_data_catalog(self):
+        if not self._stage_data_catalog:
+            self._stage_data_catalog = self._get_ssm_param(
+                '/{}/Glue/{}/{}/StageDataCatalog'.format(self._resource_prefix, self._team, self._dataset))
+        return self._stage_data_catalog
+
+
 class KMSConfiguration(BaseConfig):
     def __init__(self, resource_prefix, name, log_level=None, ssm_interface=None):
         """
@@ -1,7 +1,12 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 from aws_solutions.core.helpers import get_service_client
 import awswrangler as wr  # Ensure Lambda has an AWS Wrangler Layer configured
@@ -9,6 +14,27 @@ from ..commons import init_logger
 
 logger = init_logger()
 
+# Parquet footer column types by object ETag, kept in the warm container so only new objects are read
+SCHEMA_CACHE_MAX_ENTRIES = int(os.getenv('SCHEMA_CACHE_MAX_ENTRIES', '10000'))
+_footer_schema_cache = OrderedDict()
+_footer_schema_cache_lock = threading.Lock()
+
+
+def _get_cached_footer_schema(etag):
+    with _footer_schema_cache_lock:
+        column_types = _footer_schema_cache.get(etag)
+        if column_types is not None:
+            _footer_schema_cache.move_to_end(etag)
+        return column_types
+
+
+def _cache_footer_schema(etag, column_types):
+    with _footer_schema_cache_lock:
+        _footer_schema_cache[etag] = column_types
+        _footer_schema_cache.move_to_end(etag)
+        while len(_footer_schema_cache) > SCHEMA_CACHE_MAX_ENTRIES:
+            _footer_schema_cache.popitem(last=False)
+
 
 class GlueSchemaValidator(ABC):
     """
@@ -25,6 +51,7 @@ class GlueSchemaValidator(ABC):
         self.boto3_session = boto3_session
         # Reuse session or create a default one
         self.glue_client = boto3_session.client('glue') if boto3_session else get_service_client('glue')
+        self.s3_client = boto3_session.client('s3') if boto3_session else get_service_client('s3')
 
     def _get_table_parameters(self, database_name, table_name):
         """
@@ -69,13 +96,24 @@ class GlueSchemaValidator(ABC):
 
 
 class ParquetSchemaValidator(GlueSchemaValidator):
+    def __init__(self, boto3_session=None, max_workers=None):
+        """
+        Initializes Glue and S3 clients based on the supplied or a new session.
+
+        Args:
+            boto3_session: Boto3 session
+            max_workers: Maximum number of Parquet footers read concurrently
+        """
+        super().__init__(boto3_session)
+        self.max_workers = max_workers or int(os.getenv('SCHEMA_VALIDATOR_MAX_WORKERS', '8'))
+
     def validate(self, prefix, keys, database_name, table_name):
         """
         Validates the Parquet S3 object(s) against the Glue schema
 
         Args:
             prefix: S3 prefix
-            keys: list of S3 keys
+            keys: list of S3 keys, only these objects are validated when set (e.g. the objects of a batch)
             database_name: Glue database name
             table_name: Glue table name
 
@@ -109,6 +147,44 @@ class ParquetSchemaValidator(GlueSchemaValidator):
 
         return True
 
+    def _describe_objects(self, prefix, keys):
+        """
+        Retrieves the ETag, size and last modified date of the objects
+
+        Args:
+            prefix: S3 prefix, listed when no keys are given
+            keys: list of S3 keys
+
+        Returns: dict of S3 paths to dicts of a form { 'ETag': ..., 'ContentLength': ..., 'LastModified': ...}
+        """
+        if keys:
+            def head_object(path):
+                url = urlparse(path)
+                return path, self.s3_client.head_object(Bucket=url.netloc, Key=url.path.lstrip('/'))
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return dict(executor.map(head_object, keys))
+
+        # The listing carries the metadata, no head_object call is needed per object
+        url = urlparse(prefix)
+        s3_objects = {}
+        for page in self.s3_client.get_paginator('list_objects_v2').paginate(
+                Bucket=url.netloc, Prefix=url.path.lstrip('/')):
+            for obj in page.get('Contents', []):
+                s3_objects[f"s3://{url.netloc}/{obj['Key']}"] = {
+                    'ETag': obj['ETag'], 'ContentLength': obj['Size'], 'LastModified': obj['LastModified']}
+        return s3_objects
+
+    def _read_footer_schema(self, path, etag):
+        column_types = _get_cached_footer_schema(etag)
+        if column_types is None:
+            column_types, _ = wr.s3.read_parquet_metadata(
+                path=path,
+                boto3_session=self.boto3_session
+            )
+            _cache_footer_schema(etag, column_types)
+        return column_types
+
     def _get_object_schema(self, prefix, keys, get_latest):
         """
         Retrieves object schema from a Parquet file
@@ -121,29 +197,28 @@ class ParquetSchemaValidator(GlueSchemaValidator):
         Returns:  list of dicts of a form { 'Name': ..., 'Type': ...}
         """
         # Retrieve object metadata
-        s3_objects = wr.s3.describe_objects(
-            path=keys if keys and len(keys) > 0 else prefix,
-            boto3_session=self.boto3_session
-        )
+        s3_objects = self._describe_objects(prefix, keys)
 
         # Sort by last modified date and filter out empty objects
-        object_keys = [object_key for object_key, object_metadata in sorted(
+        s3_objects = [(object_key, object_metadata) for object_key, object_metadata in sorted(
             s3_objects.items(),
             key=lambda k_v: k_v[1]['LastModified']
         ) if object_metadata['ContentLength'] > 0]
+        if get_latest:
+            s3_objects = s3_objects[-1:]
 
-        # Retrieve Parquet metadata
-        column_types, _ = wr.s3.read_parquet_metadata(
-            path=object_keys[0] if get_latest else object_keys,
-            boto3_session=self.boto3_session
-        )
+        # Retrieve Parquet metadata, footers of objects already read are served from the cache
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            footer_schemas = list(executor.map(
+                lambda k_v: self._read_footer_schema(k_v[0], k_v[1]['ETag']), s3_objects))
 
         # Columns must be sorted in order to compare the schema because Parquet
-        # does not respect the order
+        # does not respect the order, a column typed differently across objects is listed once per type
         return sorted(
-            list({'Name': name.lower(), 'Type': type}
-                 for name, type in column_types.items()),
-            key=lambda x: x['Name'])
+            list({'Name': name, 'Type': type}
+                 for name, type in {(name.lower(), type) for column_types in footer_schemas
+                                    for name, type in column_types.items()}),
+            key=lambda x: (x['Name'], x['Type']))
 
     @staticmethod
     def _parse_table_parameters(table_parameters):
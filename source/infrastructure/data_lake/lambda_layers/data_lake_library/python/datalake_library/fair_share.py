@@ -0,0 +1,111 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+from collections import OrderedDict, deque
+
+from .commons import init_logger
+
+# Customer of the objects that are not partitioned by customer
+DEFAULT_CUSTOMER = ''
+
+
+class FairShareScheduler:
+    """Builds batches with a weighted round robin across customers, and across tables for each customer
+
+    Customers with a backlog can't fill a batch while other customers have objects waiting, each
+    customer gets its weight in objects per round and is capped at its max items per batch
+    """
+
+    def __init__(self, max_items_per_customer=None, customers=None, lookahead=None, log_level=None):
+        """
+        Keyword Arguments:
+            max_items_per_customer {int} -- Default maximum number of objects of a customer in a batch, 0 for no limit
+            customers {dict} -- Weight and max_items of a customer by customer hash, override the defaults
+            lookahead {int} -- Number of batches worth of messages read from the queue to build a batch
+        """
+        self.log_level = log_level or os.getenv('LOG_LEVEL', 'INFO')
+        self._logger = init_logger(self.log_level)
+        self.max_items_per_customer = int(
+            os.getenv('FAIR_SHARE_MAX_ITEMS_PER_CUSTOMER', '0') if max_items_per_customer is None
+            else max_items_per_customer)
+        self.customers = json.loads(os.getenv('FAIR_SHARE_CUSTOMERS', '{}')) if customers is None else customers
+        self.lookahead = max(1, int(os.getenv('FAIR_SHARE_LOOKAHEAD', '5') if lookahead is None else lookahead))
+
+    @staticmethod
+    def get_share(key):
+        """Customer hash and table of an object key
+
+        Arguments:
+            key {str} -- pre-stage/{team}/{dataset}/{table}/[customer_hash={customer_hash}/]...
+
+        Returns:
+            {tuple} -- Customer hash, table
+        """
+        parts = key.split('/')
+        table = parts[3] if len(parts) > 4 else ''
+        customer_hash = next(
+            (part.split('=', 1)[1] for part in parts[4:-1] if part.startswith('customer_hash=')), DEFAULT_CUSTOMER)
+        return customer_hash, table
+
+    @staticmethod
+    def get_message_group_id(group_id, key):
+        """Message group of an object key in a stage queue, one group per customer so that
+        the messages waiting for a customer don't hold back those of the other customers
+
+        Arguments:
+            group_id {str} -- Message group of the dataset
+            key {str} -- Object key
+
+        Returns:
+            {str} -- Message group of the customer of the key
+        """
+        customer_hash, _ = FairShareScheduler.get_share(key)
+        return '{}-{}'.format(group_id, customer_hash) if customer_hash != DEFAULT_CUSTOMER else group_id
+
+    def _get_customer_setting(self, customer_hash, name, default):
+        return int(self.customers.get(customer_hash, {}).get(name, default))
+
+    def select(self, keys, max_items):
+        """Picks the keys of the next batch
+
+        Arguments:
+            keys {list} -- Object keys in queue order
+            max_items {int} -- Maximum number of keys in the batch
+
+        Returns:
+            {list} -- Positions of the picked keys, the order of a customer table is kept
+        """
+        # {customer_hash: {table: deque of positions}}
+        shares = OrderedDict()
+        for position, key in enumerate(keys):
+            customer_hash, table = self.get_share(key)
+            shares.setdefault(customer_hash, OrderedDict()).setdefault(table, deque()).append(position)
+
+        customers = deque()
+        for customer_hash, tables in shares.items():
+            max_customer_items = self._get_customer_setting(customer_hash, 'max_items', self.max_items_per_customer)
+            customers.append({
+                'customer_hash': customer_hash,
+                'tables': deque(tables.values()),
+                'weight': max(1, self._get_customer_setting(customer_hash, 'weight', 1)),
+                'left': max_customer_items or max_items
+            })
+
+        selected = []
+        while customers and len(selected) < max_items:
+            customer = customers.popleft()
+            for _ in range(min(customer['weight'], customer['left'], max_items - len(selected))):
+                table = customer['tables'].popleft()
+                selected.append(table.popleft())
+                customer['left'] -= 1
+                if table:
+                    customer['tables'].append(table)
+                if not customer['tables']:
+                    break
+            if customer['tables'] and customer['left']:
+                customers.append(customer)
+
+        self._logger.info('Selected {} of {} objects across {} customers'.format(len(selected), len(keys), len(shares)))
+        return sorted(selected)
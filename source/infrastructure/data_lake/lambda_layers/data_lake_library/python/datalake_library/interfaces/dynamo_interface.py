@@ -2,7 +2,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import json
+import queue
+import threading
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 
 from aws_solutions.core.helpers import get_service_resource
 from boto3.dynamodb.conditions import Key, Attr
@@ -10,6 +14,11 @@ from botocore.exceptions import ClientError
 
 from ..commons import init_logger
 
+# Partitions queried concurrently and items read ahead by iter_object_metadata_index_partitions
+QUERY_MAX_WORKERS = int(os.getenv('DYNAMO_QUERY_MAX_WORKERS', '8'))
+QUERY_BUFFER_SIZE = 1000
+QUERY_BUFFER_POLL_SECONDS = 0.1
+
 
 class DynamoInterface:
     def __init__(self, configuration, log_level=None, dynamodb_resource=None):
@@ -22,6 +31,7 @@ class DynamoInterface:
 
         self.object_metadata_table = None
         self.transform_mapping_table = None
+        self.job_task_tokens_table = None
 
         self._get_object_metadata_table()
         self._get_transform_mapping_table()
@@ -38,6 +48,12 @@ class DynamoInterface:
                 self._config.transform_mapping_table)
         return self.transform_mapping_table
 
+    def _get_job_task_tokens_table(self):
+        if not self.job_task_tokens_table:
+            self.job_task_tokens_table = self.dynamodb_resource.Table(
+                self._config.job_task_tokens_table)
+        return self.job_task_tokens_table
+
     @staticmethod
     def build_id(bucket, key):
         return 's3://{}/{}'.format(bucket, key)
@@ -59,6 +75,32 @@ class DynamoInterface:
             self._logger.exception(msg)
             raise
 
+    def put_job_task_token(self, job_run_id, task_token, payload, ttl_seconds):
+        """Stores the task token of the execution waiting for a job run
+
+        Arguments:
+            job_run_id {str} -- Id of the job run
+            task_token {str} -- Task token of the waiting state machine execution
+            payload {dict} -- Output of the task once the job run ends
+            ttl_seconds {int} -- Seconds the token is kept if the job run end is never received
+        """
+        self.put_item(self._get_job_task_tokens_table(), {
+            'id': job_run_id,
+            'task_token': task_token,
+            'payload': json.dumps(payload),
+            'ttl': int(dt.datetime.utcnow().timestamp()) + ttl_seconds
+        })
+
+    def get_job_task_token(self, job_run_id):
+        """Task token and task output stored for a job run, None if no execution waits for the job run"""
+        response = self._get_job_task_tokens_table().get_item(Key={'id': job_run_id}, ConsistentRead=True)
+        if 'Item' not in response:
+            return None
+        return response['Item']['task_token'], json.loads(response['Item']['payload'])
+
+    def delete_job_task_token(self, job_run_id):
+        self._get_job_task_tokens_table().delete_item(Key={'id': job_run_id})
+
     def get_transform_table_item(self, dataset):
         return self.get_item(self.transform_mapping_table, {'name': dataset})
 
@@ -68,6 +110,21 @@ class DynamoInterface:
             round(dt.datetime.utcnow().timestamp()*1000, 0))
         return self.put_item_in_object_metadata_table(item)
 
+    def update_object_metadata_catalog_batch(self, items):
+        timestamp = int(
+            round(dt.datetime.utcnow().timestamp()*1000, 0))
+        try:
+            # batch_writer groups the puts in BatchWriteItem requests of 25 and retries unprocessed items
+            with self.object_metadata_table.batch_writer(overwrite_by_pkeys=['id']) as batch:
+                for item in items:
+                    item['id'] = self.build_id(item['bucket'], item['key'])
+                    item['timestamp'] = timestamp
+                    batch.put_item(Item=item)
+        except ClientError:
+            msg = 'Error putting {} items into {} table'.format(len(items), self.object_metadata_table)
+            self._logger.exception(msg)
+            raise
+
     def put_item_in_object_metadata_table(self, item):
         return self.put_item(self.object_metadata_table, item)
 
@@ -95,29 +152,115 @@ class DynamoInterface:
             raise
 
     def query_object_metadata_index(self, index, key_expression, key_value, filter_expression, filter_value, max_items):
+        return list(self.iter_object_metadata_index(
+            index, key_expression, key_value, filter_expression, filter_value, limit=max_items))
+
+    def iter_object_metadata_index(self, index, key_expression, key_value, filter_expression=None, filter_value=None,
+                                   projection=None, limit=None, page_size=None):
+        """Streams the items of an object metadata index partition, one page at a time
+
+        Arguments:
+            index {str} -- Name of the index
+            key_expression {str} -- Partition key name of the index
+            key_value {str} -- Partition key value
+
+        Keyword Arguments:
+            filter_expression {str} -- Attribute name the items are filtered on
+            filter_value {str} -- Value of the filter attribute
+            projection {list} -- Attribute names returned, all the attributes of the index by default
+            limit {int} -- Maximum number of items returned, pages are no longer read once reached
+            page_size {int} -- Maximum number of items evaluated per query
+
+        Returns:
+            {generator} -- Items of the partition
+        """
+        query_kwargs = {
+            'IndexName': index,
+            'KeyConditionExpression': Key(key_expression).eq(key_value)
+        }
+        if filter_expression:
+            query_kwargs['FilterExpression'] = Attr(filter_expression).eq(filter_value)
+        if projection:
+            # Placeholders so reserved words can be projected, distinct from the condition ones
+            names = {'#p{}'.format(i): name for i, name in enumerate(projection)}
+            query_kwargs['ProjectionExpression'] = ', '.join(names)
+            query_kwargs['ExpressionAttributeNames'] = names
+        if page_size:
+            query_kwargs['Limit'] = page_size
+
+        returned = 0
+        while limit is None or returned < limit:
+            try:
+                response = self.object_metadata_table.query(**query_kwargs)
+            except ClientError:
+                msg = 'Error querying object metadata {} index'.format(index)
+                self._logger.exception(msg)
+                raise
+            for item in response['Items']:
+                yield item
+                returned += 1
+                if limit is not None and returned >= limit:
+                    return
+            if 'LastEvaluatedKey' not in response:
+                return
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def iter_object_metadata_index_partitions(self, index, key_expression, key_values, filter_expression=None,
+                                              filter_value=None, projection=None, limit=None, max_workers=None):
+        """Streams the items of several index partitions queried in parallel
+
+        The partitions are read ahead into a bounded buffer, the queries stop when the generator is closed
+
+        Arguments:
+            key_values {list} -- Partition key values, the other arguments are the iter_object_metadata_index ones
+
+        Keyword Arguments:
+            limit {int} -- Maximum number of items returned per partition
+            max_workers {int} -- Maximum number of partitions queried concurrently
+
+        Returns:
+            {generator} -- Partition key value and item tuples, in no particular order across partitions
+        """
+        key_values = list(key_values)
+        if not key_values:
+            return
+        results = queue.Queue(maxsize=QUERY_BUFFER_SIZE)
+        stop = threading.Event()
+        done = object()
+
+        def put(entry):
+            while not stop.is_set():
+                try:
+                    results.put(entry, timeout=QUERY_BUFFER_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def query_partition(key_value):
+            try:
+                for item in self.iter_object_metadata_index(index, key_expression, key_value, filter_expression,
+                                                            filter_value, projection, limit):
+                    if not put((key_value, item)):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        executor = ThreadPoolExecutor(max_workers=min(len(key_values), max_workers or QUERY_MAX_WORKERS))
         try:
-            items = []
-            response = self.object_metadata_table.query(
-                IndexName=index,
-                KeyConditionExpression=Key(key_expression).eq(key_value),
-                FilterExpression=Attr(filter_expression).eq(filter_value)
-            )
-            if response['Items']:
-                items.extend(response['Items'])
-            while 'LastEvaluatedKey' in response:
-                response = self.object_metadata_table.query(
-                    IndexName=index,
-                    KeyConditionExpression=Key(key_expression).eq(key_value),
-                    FilterExpression=Attr(filter_expression).eq(filter_value),
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                if response['Items']:
-                    items.extend(response['Items'])
-                if len(items) > max_items:
-                    items = items[:max_items]
-                    break
-        except ClientError:
-            msg = 'Error querying object metadata {} index'.format(index)
-            self._logger.exception(msg)
-            raise
-        return items
+            for key_value in key_values:
+                executor.submit(query_partition, key_value)
+            pending = len(key_values)
+            while pending:
+                entry = results.get()
+                if entry is done:
+                    pending -= 1
+                elif isinstance(entry, Exception):
+                    raise entry
+                else:
+                    yield entry
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
@@ -3,15 +3,43 @@
 
 import os
 import json
-from io import StringIO
-from urllib.parse import unquote_plus
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO, SEEK_END
+from urllib.parse import unquote_plus, urlparse
 
 from aws_solutions.core.helpers import get_service_resource, get_service_client
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 
 from ..commons import init_logger
 from ..datalake_exceptions import ObjectDeleteFailedException
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Multipart settings for the managed copy and upload calls, each transfer also uses its own threads
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=int(os.getenv('S3_TRANSFER_MAX_CONCURRENCY', '4')),
+    use_threads=True
+)
+
+# Thread pool shared by the bulk APIs across all instances, bounded so a large batch can't exhaust the sandbox
+_transfer_executor = None
+_transfer_executor_lock = threading.Lock()
+
+
+def _get_transfer_executor():
+    global _transfer_executor
+    with _transfer_executor_lock:
+        if _transfer_executor is None:
+            _transfer_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('S3_TRANSFER_MAX_WORKERS', '16')),
+                thread_name_prefix='s3-transfer'
+            )
+    return _transfer_executor
+
 
 class S3Interface:
     def __init__(self, log_level=None, s3_client=None, s3_resource=None):
@@ -35,18 +63,60 @@ class S3Interface:
             raise
         return object_path
 
+    @staticmethod
+    def _get_kms_extra_args(kms_key):
+        if not kms_key:
+            return {}
+        return {
+            "ServerSideEncryption": "aws:kms",  # NOSONAR
+            "SSEKMSKeyId": kms_key
+        }
+
+    def _run_bulk(self, function, items):
+        """Runs function(*args) for each key, args in items on the shared thread pool
+
+        Returns:
+            {tuple} -- Dictionaries with the results and the exceptions by key
+        """
+        executor = _get_transfer_executor()
+        futures = {key: executor.submit(function, *args) for key, args in items}
+        results = {}
+        errors = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+        if errors:
+            self._logger.error('{} of {} S3 operations failed'.format(len(errors), len(futures)))
+        return results, errors
+
     def upload_object(self, object_path, bucket, key, kms_key=None):
         self._logger.info('Uploading object: {}'.format(object_path))
         try:
-            extra_kwargs = {}
-            if kms_key:
-                extra_kwargs = {
-                    "ServerSideEncryption": "aws:kms",  # NOSONAR
-                    "SSEKMSKeyId": kms_key
-                }
             self._s3_client.upload_file(object_path,
                                         bucket, key,
-                                        ExtraArgs=extra_kwargs)
+                                        ExtraArgs=self._get_kms_extra_args(kms_key),
+                                        Config=TRANSFER_CONFIG)
+        except ClientError:
+            msg = 'Error uploading object: {}/{}'.format(bucket, key)
+            self._logger.exception(msg)
+            raise
+
+    def upload_fileobj(self, fileobj, bucket, key, kms_key=None, metadata=None):
+        """Uploads a readable binary stream, multipart once it is above the multipart threshold
+
+        The stream is consumed in chunks so its content never needs to fit in memory
+        """
+        self._logger.info('Uploading stream to: {}/{}'.format(bucket, key))
+        try:
+            extra_kwargs = self._get_kms_extra_args(kms_key)
+            if metadata is not None:
+                extra_kwargs["Metadata"] = metadata
+            self._s3_client.upload_fileobj(fileobj,
+                                           bucket, key,
+                                           ExtraArgs=extra_kwargs,
+                                           Config=TRANSFER_CONFIG)
         except ClientError:
             msg = 'Error uploading object: {}/{}'.format(bucket, key)
             self._logger.exception(msg)
@@ -64,14 +134,34 @@ class S3Interface:
                 keys.append(obj.key)
         return keys
 
+    def list_objects_metadata(self, bucket, keys_path):
+        # Size and last modified date come with the listing, no head_object call is needed per key
+        keys_path = unquote_plus(keys_path)
+        self._logger.info(
+            'Listing objects metadata in: s3://{}/{}'.format(bucket, keys_path))
+        keys_path = keys_path + \
+                    '/' if not keys_path.endswith('/') else keys_path
+        objects = []
+        for obj in self._s3_resource.Bucket(bucket).objects.filter(Prefix=keys_path):
+            if obj.key[-1] != '/':
+                objects.append({
+                    'key': obj.key,
+                    'size': obj.size,
+                    'last_modified_date': obj.last_modified.isoformat()
+                })
+        return objects
+
     def read_object(self, bucket, key):
         key = unquote_plus(key)
         self._logger.info("Reading object from {}/{}".format(bucket, key))
-        data = StringIO()
         try:
             obj = self._s3_resource.Object(bucket, key)
-            for line in obj.get()["Body"].iter_lines():
-                data.write('{}\n'.format(line.decode('utf-8')))
+            # Decoded in a single pass, universal newlines keep the line endings normalised to \n
+            text = obj.get()["Body"].read().decode('utf-8')
+            data = StringIO(text, newline=None)
+            if text and not text.endswith(('\n', '\r')):
+                data.seek(0, SEEK_END)
+                data.write('\n')
             data.seek(0)
         except ClientError:
             msg = 'Error reading object: {}/{}'.format(bucket, key)
@@ -79,45 +169,113 @@ class S3Interface:
             raise
         return data
 
+    def iter_object_lines(self, bucket, key, encoding='utf-8', chunk_size=STREAM_CHUNK_SIZE, buffered=False):
+        """Lazily decoded lines of an object, without line endings
+
+        The body is streamed in chunks of chunk_size bytes so objects of any size are read in constant
+        memory. buffered=True reads the whole body in one request instead, which is faster for small objects
+        """
+        key = unquote_plus(key)
+        self._logger.info("Streaming object lines from {}/{}".format(bucket, key))
+        try:
+            body = self._s3_resource.Object(bucket, key).get()["Body"]
+            if buffered:
+                lines = body.read().splitlines()
+            else:
+                lines = body.iter_lines(chunk_size=chunk_size)
+            for line in lines:
+                yield line.decode(encoding)
+        except ClientError:
+            msg = 'Error reading object: {}/{}'.format(bucket, key)
+            self._logger.exception(msg)
+            raise
+
+    def iter_object_records(self, bucket, key, parser=json.loads, **kwargs):
+        """Lazily parsed records of a line delimited object (i.e. JSON Lines), blank lines are skipped"""
+        for line in self.iter_object_lines(bucket, key, **kwargs):
+            if line.strip():
+                yield parser(line)
+
+    def read_object_range(self, bucket, key, start, end=None):
+        """Raw bytes of an object from the start offset to the end offset (inclusive, defaults to the end)"""
+        key = unquote_plus(key)
+        byte_range = 'bytes={}-{}'.format(start, '' if end is None else end)
+        self._logger.info("Reading {} of object {}/{}".format(byte_range, bucket, key))
+        try:
+            return self._s3_client.get_object(Bucket=bucket, Key=key, Range=byte_range)['Body'].read()
+        except ClientError:
+            msg = 'Error reading object range: {}/{}'.format(bucket, key)
+            self._logger.exception(msg)
+            raise
+
     def write_object(self, bucket, key, data_object, kms_key=None):
         self._logger.info("Writing object to {}/{}".format(bucket, key))
         try:
             # always rewind for safety
             data_object.seek(0)
-            extra_kwargs = {}
-            if kms_key:
-                extra_kwargs = {
-                    "ServerSideEncryption": "aws:kms",  # NOSONAR
-                    "SSEKMSKeyId": kms_key
-                }
             self._s3_client.put_object(
-                Bucket=bucket, Key=key, Body=data_object.read(), **extra_kwargs)
+                Bucket=bucket, Key=key, Body=data_object.read(), **self._get_kms_extra_args(kms_key))
         except ClientError:
             msg = 'Error uploading object: {}/{}'.format(bucket, key)
             self._logger.exception(msg)
             raise
 
-    def copy_object(self, source_bucket, source_key, dest_bucket, dest_key=None, kms_key=None):
+    def write_manifest(self, bucket, key, source_bucket, entries, kms_key=None):
+        """Writes a batch manifest so only its URI needs to be handed over to the next step
+
+        Arguments:
+            source_bucket {str} -- Bucket of the objects listed in the manifest
+            entries {list} -- Dictionaries with the key, size and etag of each object
+
+        Returns:
+            {str} -- S3 URI of the manifest
+        """
+        manifest = {
+            'bucket': source_bucket,
+            'entries': entries
+        }
+        self.write_object(bucket, key, BytesIO(json.dumps(manifest).encode('utf-8')), kms_key)
+        return 's3://{}/{}'.format(bucket, key)
+
+    def read_manifest(self, manifest_uri):
+        """Reads a batch manifest written by write_manifest
+
+        Returns:
+            {dict} -- Bucket and entries of the manifest
+        """
+        parsed_uri = urlparse(manifest_uri)
+        bucket, key = parsed_uri.netloc, parsed_uri.path.lstrip('/')
+        self._logger.info("Reading manifest {}".format(manifest_uri))
+        try:
+            return json.loads(self._s3_client.get_object(Bucket=bucket, Key=key)['Body'].read())
+        except ClientError:
+            msg = 'Error reading manifest: {}'.format(manifest_uri)
+            self._logger.exception(msg)
+            raise
+
+    def copy_object(self, source_bucket, source_key, dest_bucket, dest_key=None, kms_key=None, metadata=None):
         source_key = unquote_plus(source_key)
         self._logger.info("Copying object {}/{} to {}/{}".format(source_bucket,
                                                                  source_key,
                                                                  dest_bucket,
                                                                  dest_key if dest_key else source_key))
         try:
-            extra_kwargs = {}
-            if kms_key:
-                extra_kwargs = {
-                    "ServerSideEncryption": "aws:kms",  # NOSONAR
-                    "SSEKMSKeyId": kms_key
-                }
             copy_source = {
                 'Bucket': source_bucket,
                 'Key': source_key
             }
+            extra_kwargs = self._get_kms_extra_args(kms_key)
+            if metadata is not None:
+                extra_kwargs.update({
+                    "MetadataDirective": "REPLACE",
+                    "Metadata": metadata
+                })
+            # Server side copy, objects above the multipart threshold are copied in parts
             self._s3_resource.meta.client.copy(copy_source,
                                                dest_bucket,
                                                dest_key if dest_key else source_key,
-                                               ExtraArgs=extra_kwargs)
+                                               ExtraArgs=extra_kwargs,
+                                               Config=TRANSFER_CONFIG)
         except ClientError:
             msg = 'Error copying object: {}/{} to {}/{}'.format(source_bucket,
                                                                 source_key,
@@ -126,6 +284,49 @@ class S3Interface:
             self._logger.exception(msg)
             raise
 
+    def upload_objects(self, objects, bucket, kms_key=None):
+        """Uploads local files in parallel
+
+        Arguments:
+            objects {dict} -- Destination keys by local file path
+
+        Returns:
+            {tuple} -- Uploaded local file paths and exceptions by destination key
+        """
+        def upload(object_path, key):
+            self.upload_object(object_path, bucket, key, kms_key)
+            return object_path
+
+        return self._run_bulk(upload, [(key, (object_path, key)) for object_path, key in objects.items()])
+
+    def copy_objects(self, source_bucket, source_keys, dest_bucket, dest_keys=None, kms_key=None):
+        """Copies objects in parallel
+
+        Arguments:
+            source_keys {list} -- Keys to copy from the source bucket
+            dest_keys {dict} -- Destination keys by source key, defaults to the source keys
+
+        Returns:
+            {tuple} -- Destination keys and exceptions by source key
+        """
+        dest_keys = dest_keys or {}
+
+        def copy(source_key, dest_key):
+            self.copy_object(source_bucket, source_key, dest_bucket, dest_key, kms_key)
+            return dest_key
+
+        return self._run_bulk(copy, [
+            (source_key, (source_key, dest_keys.get(source_key, source_key))) for source_key in source_keys
+        ])
+
+    def head_objects(self, bucket, keys):
+        """Retrieves the size, etag and last modified date of objects in parallel
+
+        Returns:
+            {tuple} -- Objects metadata and exceptions by key
+        """
+        return self._run_bulk(self.get_object_metadata, [(key, (bucket, key)) for key in keys])
+
     def tag_object(self, bucket, key, tag_dict):
         self._logger.info(
             'Tagging s3 object {}/{} with values {}'.format(bucket, key, tag_dict))
@@ -173,6 +374,15 @@ class S3Interface:
         self._logger.info(
             'Successfully deleted all objects in bucket {} with prefix {}'.format(bucket, prefix))
 
+    def get_object_metadata(self, bucket, key):
+        response = self._s3_client.head_object(Bucket=bucket, Key=key)
+        return {
+            'key': key,
+            'size': response['ContentLength'],
+            'etag': response['ETag'].strip('"'),
+            'last_modified_date': response['LastModified'].isoformat()
+        }
+
     def get_size(self, bucket, key):
         return self._s3_client.head_object(Bucket=bucket, Key=key)['ContentLength']
 
@@ -9,6 +9,7 @@ from aws_solutions.core.helpers import get_service_resource
 from botocore.exceptions import ClientError
 
 from ..commons import init_logger
+from ..fair_share import FairShareScheduler
 
 
 class SQSInterface:
@@ -23,6 +24,33 @@ class SQSInterface:
     def receive_messages(self, max_num_messages=1):
         return self._message_queue.receive_messages(MaxNumberOfMessages=max_num_messages, WaitTimeSeconds=1)
 
+    def receive_message_batch(self, max_num_messages=10, wait_time_seconds=20):
+        """Long polls the queue for up to 10 messages"""
+        return self._message_queue.receive_messages(
+            MaxNumberOfMessages=min(max_num_messages, 10), WaitTimeSeconds=wait_time_seconds)
+
+    def delete_message_batch(self, messages):
+        """Deletes up to 10 received messages in one request
+
+        Returns:
+            {set} -- Message ids that could not be deleted
+        """
+        if not messages:
+            return set()
+        response = self._message_queue.delete_messages(Entries=[
+            {'Id': message.message_id, 'ReceiptHandle': message.receipt_handle} for message in messages
+        ])
+        failed = response.get('Failed', [])
+        if failed:
+            self._logger.error('Failed to delete {} messages: {}'.format(len(failed), failed))
+        return {entry['Id'] for entry in failed}
+
+    def get_in_flight_count(self):
+        """Number of messages waiting in the queue or being processed"""
+        self._message_queue.reload()
+        return int(self._message_queue.attributes['ApproximateNumberOfMessages']) + \
+            int(self._message_queue.attributes['ApproximateNumberOfMessagesNotVisible'])
+
     def receive_min_max_messages(self, min_items_process, max_items_process):
         """Gets max_items_process messages from an SQS queue.
         :param min_items_process: Minimum number of items to process.
@@ -58,6 +86,57 @@ class SQSInterface:
                 break
         return messages
 
+    def receive_fair_share_messages(self, min_items_process, max_items_process, scheduler):
+        """Gets up to max_items_process messages picked by a scheduler across the messages waiting
+        :param min_items_process: Minimum number of items to process.
+        :param max_items_process: Maximum number of items to process.
+        :param scheduler: FairShareScheduler picking the messages of the batch.
+        :return messages obtained
+        """
+        num_messages_queue = int(
+            self._message_queue.attributes['ApproximateNumberOfMessages'])
+        if (num_messages_queue == 0) or (min_items_process > num_messages_queue):
+            self._logger.info("Not enough messages - exiting")
+            return []
+
+        # A FIFO message group returns no more messages while some are in flight, the window spans the
+        # message groups of the customers and the messages are only deleted once they are picked
+        window_size = min(num_messages_queue, max_items_process * scheduler.lookahead)
+        received = []
+        while len(received) < window_size:
+            resp_msg = self._message_queue.receive_messages(
+                MaxNumberOfMessages=min(10, window_size - len(received)))
+            if not resp_msg:
+                break
+            received.extend(resp_msg)
+
+        selected = set(scheduler.select([message.body for message in received], max_items_process))
+        picked = [message for position, message in enumerate(received) if position in selected]
+        for x in range(0, len(picked), 10):
+            self.delete_message_batch(picked[x:x + 10])
+        # Messages left for the next batches keep their place in their message group
+        self.release_messages([message for position, message in enumerate(received) if position not in selected])
+        return [message.body for message in picked]
+
+    def release_messages(self, messages):
+        """Makes received messages visible again, they become visible once their visibility timeout
+        expires if they can't be released
+
+        Arguments:
+            messages {list} -- Received messages
+        """
+        for x in range(0, len(messages), 10):
+            try:
+                response = self._message_queue.change_message_visibility_batch(Entries=[
+                    {'Id': message.message_id, 'ReceiptHandle': message.receipt_handle, 'VisibilityTimeout': 0}
+                    for message in messages[x:x + 10]
+                ])
+            except ClientError:
+                self._logger.warning('Unable to release {} messages'.format(len(messages[x:x + 10])), exc_info=True)
+                continue
+            if response.get('Failed'):
+                self._logger.warning('Unable to release messages: {}'.format(response['Failed']))
+
     def send_message_to_fifo_queue(self, message, group_id):
         try:
             self._message_queue.send_message(
@@ -66,6 +145,42 @@ class SQSInterface:
             self._logger.error("Received error: %s", e, exc_info=True)
             raise e
 
+    def send_message_batch_to_fifo_queue(self, messages, group_id):
+        """Sends up to 10 messages in one request
+
+        Arguments:
+            messages {dict} -- Message bodies by id, the id is also used as deduplication id
+
+        Returns:
+            {set} -- Ids of the messages that could not be sent
+        """
+        if not messages:
+            return set()
+        try:
+            response = self._message_queue.send_messages(Entries=[
+                {
+                    'Id': message_id,
+                    'MessageBody': body,
+                    'MessageGroupId': group_id,
+                    'MessageDeduplicationId': message_id
+                } for message_id, body in messages.items()
+            ])
+        except ClientError as e:
+            self._logger.error("Received error: %s", e, exc_info=True)
+            raise e
+        failed = response.get('Failed', [])
+        if failed:
+            self._logger.error('Failed to send {} messages: {}'.format(len(failed), failed))
+        return {entry['Id'] for entry in failed}
+
+    def send_fair_share_messages_to_fifo_queue(self, messages, batch_size, group_id):
+        """Sends object keys in one message group per customer of the dataset message group"""
+        groups = {}
+        for message in messages:
+            groups.setdefault(FairShareScheduler.get_message_group_id(group_id, message), []).append(message)
+        for message_group_id, group_messages in groups.items():
+            self.send_batch_messages_to_fifo_queue(group_messages, batch_size, message_group_id)
+
     def send_batch_messages_to_fifo_queue(self, messages, batch_size, group_id):
         try:
             chunks = [messages[x:x + batch_size]
@@ -41,6 +41,30 @@ class StatesInterface:
             input=json.dumps(message, default=self.json_serial)
         )
 
+    def count_running_executions(self, machine_arn, limit):
+        """Number of running executions of a state machine, counted up to limit"""
+        running = 0
+        pages = self._states_client.get_paginator('list_executions').paginate(
+            stateMachineArn=machine_arn, statusFilter='RUNNING', PaginationConfig={'MaxItems': limit})
+        for result in pages:
+            running += len(result['executions'])
+        return running
+
+    def send_task_success(self, task_token, output):
+        self._logger.info('resuming execution waiting for a task')
+        return self._states_client.send_task_success(
+            taskToken=task_token,
+            output=json.dumps(output, default=self.json_serial)
+        )
+
+    def send_task_failure(self, task_token, error, cause):
+        self._logger.info('failing execution waiting for a task: {}'.format(error))
+        return self._states_client.send_task_failure(
+            taskToken=task_token,
+            error=error,
+            cause=cause[:32768]
+        )
+
     def describe_state_execution(self, execution_arn):
         self._logger.info('describing {}'.format(execution_arn))
         response = self._states_client.describe_execution(
@@ -0,0 +1,128 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+from .commons import init_logger
+from .configuration.resource_configs import SQSConfiguration
+from .interfaces.s3_interface import S3Interface
+from .interfaces.sqs_interface import SQSInterface
+from .transforms import TransformHandler
+
+logger = init_logger()
+
+
+def preupdate_metadata(octagon_client, dynamo_interface, body, component='Preupdate'):
+    """Starts the pipeline execution of an object and stores its metadata
+
+    Arguments:
+        octagon_client {OctagonClient} -- Octagon client of the object environment
+        dynamo_interface {DynamoInterface} -- Interface to the objects metadata catalog
+        body {str} -- JSON metadata of the object
+
+    Keyword Arguments:
+        component {str} -- Pipeline execution component of the step
+
+    Returns:
+        {dict} -- Metadata of the object with its pipeline execution
+    """
+    object_metadata = json.loads(body)
+    stage = object_metadata['pipeline_stage']
+    object_metadata['peh_id'] = octagon_client.start_pipeline_execution(
+        pipeline_name='{}-{}-stage-{}'.format(object_metadata['team'],
+                                              object_metadata['pipeline'],
+                                              stage[-1].lower()),
+        comment=body
+    )
+    # Add business metadata (e.g. object_metadata['project'] = 'xyz')
+
+    logger.info('Storing metadata to DynamoDB')
+    dynamo_interface.update_object_metadata_catalog(object_metadata)
+    octagon_client.update_pipeline_execution(
+        status="{} {} Processing".format(stage, component), component=component)
+    object_metadata['peh_start_timestamp'] = octagon_client.pipeline_start_timestamp
+    return object_metadata
+
+
+def process_object(octagon_client, resource_prefix, object_metadata, component='Process'):
+    """Runs the light transform of the object dataset
+
+    Arguments:
+        octagon_client {OctagonClient} -- Octagon client with the object pipeline execution
+        resource_prefix {str} -- Resource prefix of the data lake
+        object_metadata {dict} -- Metadata of the object
+
+    Keyword Arguments:
+        component {str} -- Pipeline execution component of the step
+
+    Returns:
+        {list} -- Keys of the processed objects in the stage bucket
+    """
+    stage = object_metadata['pipeline_stage']
+    team = object_metadata['team']
+    dataset = object_metadata['dataset']
+
+    logger.info('Calling user custom processing code')
+    transform_handler = TransformHandler().stage_transform(resource_prefix, team, dataset, stage)
+    processed_keys = transform_handler().transform_object(
+        resource_prefix, object_metadata['bucket'], object_metadata['key'], team, dataset)
+    octagon_client.update_pipeline_execution(
+        status="{} {} Processing".format(stage, component), component=component)
+    return processed_keys
+
+
+def postupdate_metadata(octagon_client, dynamo_interface, resource_prefix, stage_bucket, object_metadata,
+                        processed_keys, component='Postupdate'):
+    """Stores the metadata of the processed objects, sends them to the next stage and closes the execution
+
+    The keys already reached the next stage once sent, so failing to close the pipeline execution
+    is only logged and the object is not run again
+
+    Arguments:
+        octagon_client {OctagonClient} -- Octagon client with the object pipeline execution
+        dynamo_interface {DynamoInterface} -- Interface to the objects metadata catalog
+        resource_prefix {str} -- Resource prefix of the data lake
+        stage_bucket {str} -- Bucket of the processed objects
+        object_metadata {dict} -- Metadata of the object
+        processed_keys {list} -- Keys of the processed objects
+
+    Keyword Arguments:
+        component {str} -- Pipeline execution component of the step
+    """
+    stage = object_metadata['pipeline_stage']
+    team = object_metadata['team']
+    dataset = object_metadata['dataset']
+
+    logger.info('Storing metadata to DynamoDB')
+    objects_metadata, errors = S3Interface().head_objects(stage_bucket, processed_keys)
+    if errors:
+        raise next(iter(errors.values()))
+    for processed_metadata in objects_metadata.values():
+        processed_metadata.update({
+            'bucket': stage_bucket,
+            'env': object_metadata['env'],
+            'team': team,
+            'pipeline': object_metadata['pipeline'],
+            'dataset': dataset,
+            'stage': 'stage',
+            'pipeline_stage': stage,
+            'peh_id': object_metadata['peh_id']
+        })
+    dynamo_interface.update_object_metadata_catalog_batch(list(objects_metadata.values()))
+
+    logger.info('Sending messages to next SQS queue if it exists')
+    sqs_config = SQSConfiguration(resource_prefix, team, dataset, ''.join(
+        [stage[:-1], chr(ord(stage[-1]) + 1)]))
+    sqs_interface = SQSInterface(sqs_config.get_stage_queue_name)
+    sqs_interface.send_fair_share_messages_to_fifo_queue(
+        processed_keys, 10, '{}-{}'.format(team, dataset))
+
+    try:
+        octagon_client.update_pipeline_execution(
+            status="{} {} Processing".format(stage, component), component=component)
+    except Exception:
+        logger.error("Unable to update Pipeline Execution", exc_info=True)
+    try:
+        octagon_client.end_pipeline_execution_success()
+    except Exception:
+        logger.error("Unable to close Pipeline Execution", exc_info=True)
@@ -15,6 +15,11 @@ from ..commons import init_logger
 
 
 class OctagonClient:
+    # Built clients and parsed configuration cache across all instances
+    # {(instance, resource_prefix, region, profile, configuration file, metadata file):
+    #   (account_id, dynamodb, sns, config, meta)}
+    built = dict()
+
     def __init__(self):
         self.logger = init_logger()
         self.region = os.environ.get("AWS_REGION", "us-east-1") or "us-east-1"
@@ -30,6 +35,7 @@ class OctagonClient:
         # No current pipeline execution
         self.pipeline_name = None
         self.pipeline_execution_id = None
+        self.pipeline_start_timestamp = None
 
         # No current resource prefix
         self.resource_prefix = None
@@ -130,8 +136,21 @@ class OctagonClient:
         self.resource_prefix = resource_prefix
         return self
 
+    @classmethod
+    def clear_cache(cls):
+        """ Drops the clients and configuration reused across builds """
+        cls.built.clear()
+
     def build(self):
         """ Client initialization method """
+        # Fargate sessions are built from credentials in the environment and are never reused
+        cache_key = (self.configuration_instance, self.resource_prefix, self.region, self.profile,
+                     self.configuration_file, self.metadata_file)
+        if not self.run_in_fargate and cache_key in self.built:
+            self.account_id, self.dynamodb, self.sns, self.config, self.meta = self.built[cache_key]
+            self.initialized = True
+            return self
+
         # Initialization here
         if self.run_in_fargate:
             if "AWS_ACCESS_KEY" in os.environ and "AWS_SECRET_ACCESS_KEY" in os.environ:
@@ -161,6 +180,8 @@ class OctagonClient:
         self.config = ConfigParser(self.configuration_file, self.configuration_instance, self.resource_prefix)
         self.meta = OctagonMetadata(self.metadata_file)
         self.initialized = True
+        if not self.run_in_fargate:
+            self.built[cache_key] = (self.account_id, self.dynamodb, self.sns, self.config, self.meta)
 
         return self
 
@@ -241,6 +262,17 @@ class OctagonClient:
         """
         return PipelineExecutionHistoryAPI(self).retrieve_pipeline_execution(peh_id)
 
+    def get_pipeline_execution_history(self, peh_id: str) -> list:
+        """Retrieve the status history of a pipeline execution in chronological order
+
+        Arguments:
+            peh_id {str} -- Uniqie Pipeline execution ID
+
+        Returns:
+            list -- History events of the pipeline execution
+        """
+        return PipelineExecutionHistoryAPI(self).get_history_events(peh_id)
+
     def create_event(self, reason: str, comment: str, component_name: str = None, event_details: str = None) -> str:
         """ Create Event for the current pipeline
 
@@ -286,16 +318,22 @@ class OctagonClient:
         """
         self.pipeline_execution_id = None
         self.pipeline_name = None
+        self.pipeline_start_timestamp = None
 
-    def set_pipeline_execution(self, pipeline_execution_id: str, pipeline_name: str):
+    def set_pipeline_execution(self, pipeline_execution_id: str, pipeline_name: str, start_timestamp: str = None):
         """Sets the current pipeline execution
 
         Arguments:
             pipeline_execution_id {str} -- Unique identifier of pipeline execution
             pipeline_name {str} -- Pipeline name
+
+        Keyword Arguments:
+            start_timestamp {str} -- Optional. ISO 8601 start timestamp of the pipeline execution,
+                                     used to compute its duration without reading the record
         """
         self.pipeline_execution_id = pipeline_execution_id
         self.pipeline_name = pipeline_name
+        self.pipeline_start_timestamp = start_timestamp
 
     def is_pipeline_set(self) -> bool:
         """Check if current pipeline execution is set
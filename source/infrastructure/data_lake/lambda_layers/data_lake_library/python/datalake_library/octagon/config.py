@@ -13,6 +13,7 @@ class ConfigObjectEnum(Enum):
     OCTAGON_OBJECT_DATASCHEMAS = "DataSchemas"
     OCTAGON_OBJECT_PIPELINES = "Pipelines"
     OCTAGON_OBJECT_PIPELINEHISTORY = "PipelineExecutionHistory"
+    OCTAGON_OBJECT_PIPELINEHISTORYEVENTS = "PipelineExecutionHistoryEvents"
     OCTAGON_OBJECT_EVENTS = "Events"
     OCTAGON_OBJECT_ARTIFACTS = "Artifacts"
     OCTAGON_OBJECT_METRICS = "Metrics"
@@ -131,6 +132,15 @@ class ConfigParser:
     def get_peh_ttl(self) -> str:
         return self.get_table_ttl(ConfigObjectEnum.OCTAGON_OBJECT_PIPELINEHISTORY)
 
+    def get_peh_events_table(self) -> str:
+        # Configuration files without the events table keep the history in the PEH item
+        if ConfigObjectEnum.OCTAGON_OBJECT_PIPELINEHISTORYEVENTS.value not in self.table_info:
+            return None
+        return self.get_table_name(ConfigObjectEnum.OCTAGON_OBJECT_PIPELINEHISTORYEVENTS)
+
+    def get_peh_events_ttl(self) -> int:
+        return self.get_table_ttl(ConfigObjectEnum.OCTAGON_OBJECT_PIPELINEHISTORYEVENTS)
+
     def get_artifacts_table(self) -> str:
         return self.get_table_name(ConfigObjectEnum.OCTAGON_OBJECT_ARTIFACTS)
 
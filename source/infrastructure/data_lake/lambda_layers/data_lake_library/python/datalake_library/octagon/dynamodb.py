@@ -1,23 +1,100 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
 from ..commons import init_logger
 
 logger = init_logger()
 
+# Parallel scan segments, each segment is scanned and deleted by its own thread
+DEFAULT_TOTAL_SEGMENTS = 8
+# Maximum number of requests in a BatchWriteItem call
+BATCH_DELETE_SIZE = 25
+# Exponential backoff on throttling and unprocessed items
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_MAX_SECONDS = 5
+MAX_ATTEMPTS = 10
+THROTTLING_ERRORS = ("ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded")
+
+
+def _backoff(attempt):
+    time.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+
+
+def _call_with_backoff(operation, **kwargs):
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in THROTTLING_ERRORS or attempt == MAX_ATTEMPTS - 1:
+                raise
+            logger.debug(f"Throttled, retrying: {e}")
+            _backoff(attempt)
+
 
-def clean_table(dynamodb, table_name, pk_name, sk_name=""):
-    logger.debug(f"Clean dynamodb table {table_name}, PK: {pk_name}, SK: {sk_name}")
-    table = dynamodb.Table(table_name)
-    while True:
-        result = table.scan()
-        if result["Count"] == 0:
-            logger.debug(f"Clean dynamodb table {table_name}... DONE")
+def _batch_delete(client, table_name, keys):
+    requests = [{"DeleteRequest": {"Key": key}} for key in keys]
+    for attempt in range(MAX_ATTEMPTS):
+        response = _call_with_backoff(client.batch_write_item, RequestItems={table_name: requests})
+        requests = response.get("UnprocessedItems", {}).get(table_name, [])
+        if not requests:
             return
+        _backoff(attempt)
+    raise RuntimeError(f"Unable to delete {len(requests)} items from {table_name}")
+
+
+def clean_table(dynamodb, table_name, pk_name, sk_name="", total_segments=DEFAULT_TOTAL_SEGMENTS, progress=None):
+    """Deletes all the items of a table with a parallel segmented scan of the keys
+
+    Arguments:
+        dynamodb {ServiceResource} -- DynamoDB service resource
+        table_name {str} -- Name of the table
+        pk_name {str} -- Partition key name
+        sk_name {str} -- Sort key name, empty when the table has no sort key
+        total_segments {int} -- Number of segments scanned and deleted concurrently
+        progress {function} -- Called with the number of items deleted so far after each batch
+
+    Returns:
+        {int} -- Number of items deleted
+    """
+    logger.debug(f"Clean dynamodb table {table_name}, PK: {pk_name}, SK: {sk_name}, segments: {total_segments}")
+    client = dynamodb.meta.client
+    key_names = {"#pk": pk_name}
+    if sk_name:
+        key_names["#sk"] = sk_name
+    deleted = [0]
+    lock = threading.Lock()
+
+    def clean_segment(segment):
+        scan_kwargs = {
+            "TableName": table_name,
+            "ProjectionExpression": ", ".join(key_names),
+            "ExpressionAttributeNames": key_names,
+            "Segment": segment,
+            "TotalSegments": total_segments
+        }
+        while True:
+            result = _call_with_backoff(client.scan, **scan_kwargs)
+            keys = result.get("Items", [])
+            for x in range(0, len(keys), BATCH_DELETE_SIZE):
+                _batch_delete(client, table_name, keys[x:x + BATCH_DELETE_SIZE])
+                with lock:
+                    deleted[0] += len(keys[x:x + BATCH_DELETE_SIZE])
+                    if progress:
+                        progress(deleted[0])
+            if "LastEvaluatedKey" not in result:
+                return
+            scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+    with ThreadPoolExecutor(max_workers=total_segments, thread_name_prefix="clean-table") as executor:
+        # Raises the first error of a segment
+        list(executor.map(clean_segment, range(total_segments)))
 
-        with table.batch_writer() as batch:
-            for item in result["Items"]:
-                if not sk_name:
-                    batch.delete_item(Key={pk_name: item[pk_name]})
-                else:
-                    batch.delete_item(Key={pk_name: item[pk_name], sk_name: item[sk_name]})
+    logger.debug(f"Clean dynamodb table {table_name}... DONE, {deleted[0]} items deleted")
+    return deleted[0]
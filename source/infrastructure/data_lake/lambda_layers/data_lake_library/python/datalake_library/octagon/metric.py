@@ -55,121 +55,124 @@ class MetricAPI:
 
         metric_rec_arr = self._get_metric_records(date_str, metric_code)
 
+        # Records with a threshold need their new value back, the rest are only incremented
+        rollup_records = []
         for metric_rec in metric_rec_arr:
-            self._create_single_metric(metric_rec, value)
+            if self._get_metric_config_infos(metric_rec):
+                self._create_single_metric(metric_rec, value)
+            else:
+                rollup_records.append(metric_rec)
 
-        return True
-
-    def _create_single_metric(self, metric_rec: MetricRecordInfo, value: int):
-        self.logger.debug(f"create_single_metric() {metric_rec}")
+        self._create_rollup_metrics(rollup_records, value)
 
-        result = self.metrics_table.get_item(
-            Key={"root": metric_rec.root, "metric": metric_rec.metric}, ConsistentRead=True,
-            AttributesToGet=["root", "metric", "version"]
-        )
+        return True
 
+    def _get_metric_update(self, metric_rec: MetricRecordInfo, value: int):
         utc_time_iso = get_timestamp_iso()
-        local_date_iso = get_local_date()
 
-        metric_found = "Item" in result
-        new_metric_value = None
+        expr_names = {
+            "#V": "version",
+            "#X": "value",
+            "#Y": "type",
+            "#C": "creation_timestamp",
+            "#T": "last_updated_timestamp",
+            "#D": "last_updated_date",
+            "#P": "last_pipeline_execution_id",
+        }
 
-        if metric_found:  # Update existing metrics
-            version = result["Item"]["version"]
+        expr_values = {
+            ":X": value,
+            ":INC": 1,
+            ":Y": metric_rec.metric_type,
+            ":T": utc_time_iso,
+            ":D": get_local_date(),
+            ":P": self.client.pipeline_execution_id,
+        }
+        # New metrics are created by the same update, the counters start from the increment
+        update_expr = "ADD #V :INC, #X :X SET #Y = if_not_exists(#Y, :Y), #C = if_not_exists(#C, :T), " \
+                      "#T = :T, #P = :P, #D = :D"
+
+        if self.metrics_ttl > 0:
+            expr_names["#TTL"] = "ttl"
+            expr_values[":TTL"] = get_ttl(self.metrics_ttl)
+            update_expr += ", #TTL = if_not_exists(#TTL, :TTL)"
+
+        return {
+            "Key": {"root": metric_rec.root, "metric": metric_rec.metric},
+            "UpdateExpression": update_expr,
+            "ExpressionAttributeNames": expr_names,
+            "ExpressionAttributeValues": expr_values,
+        }
 
-            expr_names = {
-                "#V": "version",
-                "#T": "last_updated_timestamp",
-                "#D": "last_updated_date",
-                "#X": "value",
-                "#P": "last_pipeline_execution_id",
-            }
+    def _create_single_metric(self, metric_rec: MetricRecordInfo, value: int):
+        self.logger.debug(f"create_single_metric() {metric_rec}")
 
-            expr_values = {
-                ":X": value,
-                ":INC": 1,
-                ":T": utc_time_iso,
-                ":D": local_date_iso,
-                ":V": version,
-                ":P": self.client.pipeline_execution_id,
-            }
-            update_expr = "ADD #V :INC, #X :X SET #T = :T, #P = :P, #D = :D"
-
-            result = self.metrics_table.update_item(
-                Key={"root": metric_rec.root, "metric": metric_rec.metric},
-                UpdateExpression=update_expr,
-                ExpressionAttributeValues=expr_values,
-                ExpressionAttributeNames=expr_names,
-                ConditionExpression="#V = :V",
-                ReturnValues="UPDATED_NEW",
-            )
-            # self.logger.debug(result)
-            new_metric_value = int(result["Attributes"]["value"])
-            new_metric_version = int(result["Attributes"]["version"])
-
-        else:  # New metric
-            item = {}
-            item["root"] = metric_rec.root
-            item["metric"] = metric_rec.metric
-            item["type"] = metric_rec.metric_type
-            item["creation_timestamp"] = utc_time_iso
-            item["last_updated_timestamp"] = utc_time_iso
-            item["last_updated_date"] = local_date_iso
-            item["last_pipeline_execution_id"] = self.client.pipeline_execution_id
-            item["value"] = value
-            item["version"] = 1
-            if self.metrics_ttl > 0:
-                item["ttl"] = get_ttl(self.metrics_ttl)
-
-            self.metrics_table.put_item(Item=item)
-            new_metric_value = int(value)
-            new_metric_version = 1
+        result = self.metrics_table.update_item(ReturnValues="ALL_NEW", **self._get_metric_update(metric_rec, value))
 
         # Process threshold settings and send SNS notifications
-        self._process_sns_notifications(metric_rec, new_metric_value, new_metric_version)
+        self._process_sns_notifications(metric_rec, result["Attributes"])
+
+        return True
+
+    def _create_rollup_metrics(self, metric_rec_arr: List[MetricRecordInfo], value: int):
+        # Each counter is incremented on its own, ADD updates of shared counters don't conflict
+        for metric_rec in metric_rec_arr:
+            self.logger.debug(f"create_rollup_metrics() {metric_rec}")
+            self.metrics_table.update_item(**self._get_metric_update(metric_rec, value))
 
         return True
 
-    def _process_sns_notifications(self, metric_rec: MetricRecordInfo, new_metric_value: int, new_metric_version):
-        for metric_config_info in self.client.config.metric_info:
+    def _get_metric_config_infos(self, metric_rec: MetricRecordInfo):
+        return [
+            metric_config_info for metric_config_info in self.client.config.metric_info
+            if self._check_metric_config_info(metric_rec, metric_config_info)
+        ]
 
-            if self._check_metric_threshold(
+    def _process_sns_notifications(self, metric_rec: MetricRecordInfo, metric_item: dict):
+        new_metric_value = int(metric_item["value"])
+        for metric_config_info in self._get_metric_config_infos(metric_rec):
+
+            if not self._check_metric_threshold(
                     new_metric_value, metric_config_info.evaluation, metric_config_info.threshold
-            ) and (
-                    (metric_config_info.notify == METRIC_ALWAYS)
-                    or (metric_config_info.notify == METRIC_ONCE and not self._is_notification_sent(metric_rec))
-            ) and self._check_metric_config_info(metric_rec, metric_config_info):
-                
-                message = {
-                    "root": metric_rec.root,
-                    "metric": metric_rec.metric,
-                    "type": metric_rec.metric_type,
-                    "threshold": metric_config_info.threshold,
-                    "value": new_metric_value,
-                }
-                message_str = json.dumps(message)
-
-                # Get Global ARN if defined, then local metric ARN, then pass sending to SNS
-                if self.client.is_sns_set():
-                    topic = self.client.sns_topic
-                elif metric_config_info.sns_topic != "":
-                    topic = metric_config_info.sns_topic
-                else:
-                    self.logger.warn("SNS ARN is not defined neither globally nor in the metrics")
-                    return
-                
-                topic_arn = self._get_topic_arn(topic)
-
-                sns_result = self._send_sns_message(message_str, topic_arn)
-                sns_message_id = sns_result["MessageId"]
-                self._update_notification_info(
-                    metric_info=metric_rec,
-                    frequency=metric_config_info.notify,
-                    threshold=metric_config_info.threshold,
-                    sns_topic_arn=topic_arn,
-                    sns_message_id=sns_message_id,
-                    version=new_metric_version,
-                )
+            ):
+                continue
+
+            if metric_config_info.notify == METRIC_ONCE and (
+                    self._is_notification_sent(metric_item) or not self._claim_notification(metric_rec)
+            ):
+                continue
+            elif metric_config_info.notify not in [METRIC_ONCE, METRIC_ALWAYS]:
+                continue
+
+            message = {
+                "root": metric_rec.root,
+                "metric": metric_rec.metric,
+                "type": metric_rec.metric_type,
+                "threshold": metric_config_info.threshold,
+                "value": new_metric_value,
+            }
+            message_str = json.dumps(message)
+
+            # Get Global ARN if defined, then local metric ARN, then pass sending to SNS
+            if self.client.is_sns_set():
+                topic = self.client.sns_topic
+            elif metric_config_info.sns_topic != "":
+                topic = metric_config_info.sns_topic
+            else:
+                self.logger.warn("SNS ARN is not defined neither globally nor in the metrics")
+                return
+
+            topic_arn = self._get_topic_arn(topic)
+
+            sns_result = self._send_sns_message(message_str, topic_arn)
+            sns_message_id = sns_result["MessageId"]
+            self._update_notification_info(
+                metric_info=metric_rec,
+                frequency=metric_config_info.notify,
+                threshold=metric_config_info.threshold,
+                sns_topic_arn=topic_arn,
+                sns_message_id=sns_message_id,
+            )
 
     def _check_metric_config_info(self, metric_rec, metric_config_info):
         if (
@@ -214,10 +217,10 @@ class MetricAPI:
         else:
             root = metric
 
-        result = self.metrics_table.get_item(Key={"root": root, "metric": metric}, ConsistentRead=True)
+        result = self.metrics_table.get_item(Key={"root": root, "metric": metric}, ConsistentRead=True,
+                                             ProjectionExpression="#X", ExpressionAttributeNames={"#X": "value"})
         if "Item" in result:
-            return self.metrics_table.get_item(Key={"root": root, "metric": metric}, ConsistentRead=True)["Item"][
-                "value"]
+            return result["Item"]["value"]
         else:
             return 0
 
@@ -228,7 +231,6 @@ class MetricAPI:
             threshold: int,
             sns_topic_arn: str,
             sns_message_id: str,
-            version: int,
     ):
 
         utc_timestamp = get_timestamp_iso()
@@ -239,7 +241,6 @@ class MetricAPI:
             "#T": "notification_threshold",
             "#S": "notification_sns_topic_arn",
             "#M": "notification_sns_message_id",
-            "#V": "version",
         }
 
         expr_values = {
@@ -248,26 +249,35 @@ class MetricAPI:
             ":T": threshold,
             ":S": sns_topic_arn,
             ":M": sns_message_id,
-            ":INC": 1,
-            ":V": version,
         }
-        update_expr = "SET #L = :L, #F = :F, #T = :T, #S = :S, #M = :M, #V = #V + :INC"
+        update_expr = "SET #L = :L, #F = :F, #T = :T, #S = :S, #M = :M"
 
         self.metrics_table.update_item(
             Key={"root": metric_info.root, "metric": metric_info.metric},
             UpdateExpression=update_expr,
             ExpressionAttributeValues=expr_values,
             ExpressionAttributeNames=expr_names,
-            ConditionExpression="#V = :V",
-            ReturnValues="UPDATED_NEW",
+            ReturnValues="NONE",
         )
         return True
 
-    def _is_notification_sent(self, metric_info: MetricRecordInfo):
-        item = \
-        self.metrics_table.get_item(Key={"root": metric_info.root, "metric": metric_info.metric}, ConsistentRead=True)[
-            "Item"]
-        return "notification_timestamp" in item.keys()
+    def _claim_notification(self, metric_info: MetricRecordInfo):
+        # Only one of the concurrent executions crossing the threshold sends the ONCE notification
+        try:
+            self.metrics_table.update_item(
+                Key={"root": metric_info.root, "metric": metric_info.metric},
+                UpdateExpression="SET #L = :L",
+                ExpressionAttributeNames={"#L": "last_notification_timestamp"},
+                ExpressionAttributeValues={":L": get_timestamp_iso()},
+                ConditionExpression="attribute_not_exists(#L)",
+                ReturnValues="NONE",
+            )
+        except self.client.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def _is_notification_sent(self, metric_item: dict):
+        return "last_notification_timestamp" in metric_item.keys()
 
     def _send_sns_message(self, message, topic_arn):
         self.logger.debug(f"Send message to SNS: Message {message}, topicArn: {topic_arn}")
@@ -34,6 +34,10 @@ class PipelineExecutionHistoryAPI:
         self.pipelines_table = client.dynamodb.Table(client.config.get_pipelines_table())
         self.peh_table = client.dynamodb.Table(client.config.get_peh_table())
         self.peh_ttl = client.config.get_peh_ttl()
+        # History events are kept in their own table so PEH updates have a constant cost
+        peh_events_table = client.config.get_peh_events_table()
+        self.peh_events_table = client.dynamodb.Table(peh_events_table) if peh_events_table else None
+        self.peh_events_ttl = client.config.get_peh_events_ttl() if peh_events_table else 0
 
     def start_pipeline_execution(self, pipeline_name, dataset_date=None, comment=None):
         self.logger.debug("peh start_pipeline_execution() called")
@@ -75,14 +79,16 @@ class PipelineExecutionHistoryAPI:
         item["start_timestamp"] = utc_time_iso
         item["last_updated_timestamp"] = utc_time_iso
         item["status_last_updated_timestamp"] = PEH_STATUS_STARTED + "#" + utc_time_iso
-        item["history"] = [{"status": PEH_STATUS_STARTED, "timestamp": utc_time_iso}]
+        if self.peh_events_table is None:
+            item["history"] = [{"status": PEH_STATUS_STARTED, "timestamp": utc_time_iso}]
 
         if self.peh_ttl > 0:
             item["ttl"] = get_ttl(self.peh_ttl)
 
         self.peh_table.put_item(Item=item)
+        self.put_history_event(peh_id, 1, PEH_STATUS_STARTED, utc_time_iso)
 
-        self.client.set_pipeline_execution(peh_id, pipeline_name)
+        self.client.set_pipeline_execution(peh_id, pipeline_name, utc_time_iso)
 
         return peh_id
 
@@ -92,108 +98,90 @@ class PipelineExecutionHistoryAPI:
         throw_if_false(self.client.is_pipeline_set(), "Pipeline execution is not yet assigned")
         peh_id = self.client.pipeline_execution_id
 
-        peh_rec = self.get_peh_record(peh_id)
-        is_active = self.check_peh_rec_is_active(peh_rec)
-        throw_if_false(is_active, "Pipeline execution is not active")
-
-        version = peh_rec["version"]
-        start_time = peh_rec["start_timestamp"]
-
         current_time = datetime.datetime.utcnow()
         utc_time_iso = get_timestamp_iso(current_time)
         local_date_iso = get_local_date()
 
+        # The record is only updated while active, the version is incremented atomically
+        expr_names = {
+            "#St": "status",
+            "#V": "version",
+            "#LUT": "last_updated_timestamp",
+            "#STT": "status_last_updated_timestamp",
+            "#A": "active",
+        }
+
+        expr_values = {
+            ":St": status,
+            ":STT": status + "#" + utc_time_iso,
+            ":LUT": utc_time_iso,
+            ":INC": 1,
+            ":T": True,
+        }
+
+        update_expr = "SET #St = :St, #STT = :STT, #V = #V + :INC, #LUT = :LUT"
+
+        if self.peh_events_table is None:
+            expr_names["#H"] = "history"
+            expr_values[":H"] = self.check_component(component, status, utc_time_iso)
+            update_expr += ", #H = list_append(#H, :H)"
+
         if status in [PEH_STATUS_COMPLETED, PEH_STATUS_CANCELED, PEH_STATUS_FAILED]:
 
+            start_time = self.client.pipeline_start_timestamp
+            if start_time is None:
+                # Start timestamp was not carried by the caller
+                peh_rec = self.get_peh_record(peh_id)
+                throw_if_false(self.check_peh_rec_is_active(peh_rec), "Pipeline execution is not active")
+                start_time = peh_rec["start_timestamp"]
             duration_sec = get_duration_sec(start_time, utc_time_iso)
 
-            if status == PEH_STATUS_COMPLETED:
-                is_success = True
-            else:
-                is_success = False
-
-            expr_names = {
-                "#H": "history",
-                "#St": "status",
-                "#V": "version",
-                "#LUT": "last_updated_timestamp",
-                "#STT": "status_last_updated_timestamp",
-                "#A": "active",
+            expr_names.update({
                 "#ETS": "end_timestamp",
                 "#S": "success",
                 "#D": "duration_in_seconds",
-            }
-
-            history_list = self.check_component(component, status, utc_time_iso)
-
-            expr_values = {
-                ":H": history_list,
-                ":St": status,
-                ":LUT": utc_time_iso,
-                ":STT": status + "#" + utc_time_iso,
-                ":INC": 1,
+            })
+            expr_values.update({
                 ":ETS": utc_time_iso,
                 ":A": False,
-                ":S": is_success,
-                ":V": version,
+                ":S": status == PEH_STATUS_COMPLETED,
                 ":D": Decimal(str(duration_sec)),
-            }
-
-            update_expr = (
-                "SET #H = list_append(#H, :H), #S = :S, #V = :V + :INC,"
-                "#LUT = :LUT, #A = :A, #St = :St, #ETS = :ETS, #D = :D,"
-                "#STT = :STT"
-            )
+            })
+            update_expr += ", #S = :S, #A = :A, #ETS = :ETS, #D = :D"
 
             if is_not_empty(issue_comment):
                 expr_names["#C"] = "issue_comment"
                 expr_values[":C"] = issue_comment
                 update_expr += ", #C = :C"
 
-        else:
-
-            expr_names = {
-                "#H": "history",
-                "#St": "status",
-                "#V": "version",
-                "#LUT": "last_updated_timestamp",
-                "#STT": "status_last_updated_timestamp"
-            }
-
-            history_list = self.check_component(component, status, utc_time_iso)
+        elif is_not_empty(issue_comment):
+            expr_names["#C"] = "comment"
+            expr_values[":C"] = issue_comment
+            update_expr += ", #C = :C"
 
-            expr_values = {
-                ":H": history_list,
-                ":St": status,
-                ":STT": status + "#" + utc_time_iso,
-                ":LUT": utc_time_iso,
-                ":INC": 1,
-                ":V": version}
-            update_expr = "SET #H = list_append(#H, :H), #St = :St, #STT = :STT, #V = :V + :INC, #LUT = :LUT"
-
-            if is_not_empty(issue_comment):
-                expr_names["#C"] = "comment"
-                expr_values[":C"] = issue_comment
-                update_expr += ", #C = :C"
+        try:
+            response = self.peh_table.update_item(
+                Key={"id": peh_id},
+                UpdateExpression=update_expr,
+                ConditionExpression="#A = :T",
+                ExpressionAttributeValues=expr_values,
+                ExpressionAttributeNames=expr_names,
+                ReturnValues="UPDATED_NEW" if self.peh_events_table is not None else "NONE",
+            )
+        except self.client.dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            raise ValueError("Pipeline execution is not active")
 
-        self.peh_table.update_item(
-            Key={"id": peh_id},
-            UpdateExpression=update_expr,
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names,
-            ReturnValues="UPDATED_NEW",
-        )
+        if self.peh_events_table is not None:
+            self.put_history_event(peh_id, int(response["Attributes"]["version"]), status, utc_time_iso,
+                                   component=component, issue_comment=issue_comment)
 
         # Add pipeline update for COMPLETED Executions
         if status == PEH_STATUS_COMPLETED:
 
             self.logger.debug(f"Pipeline: {self.client.pipeline_name}")
-            item = self.pipelines_table.get_item(
-                Key={"name": self.client.pipeline_name}, ConsistentRead=True, AttributesToGet=["name", "version"]
-            )["Item"]
-            pipeline_version = item["version"]
 
             expr_names = {
+                "#N": "name",
                 "#V": "version",
                 "#U": "last_updated_timestamp",
                 "#P": "last_execution_id",
@@ -204,7 +192,6 @@ class PipelineExecutionHistoryAPI:
             }
 
             expr_values = {
-                ":V": pipeline_version,
                 ":INC": 1,
                 ":S": status,
                 ":P": self.client.pipeline_execution_id,
@@ -213,14 +200,15 @@ class PipelineExecutionHistoryAPI:
                 ":U": utc_time_iso,
                 ":X": Decimal(str(duration_sec)),
             }
-            update_expr = "SET #P = :P, #V = :V + :INC, #S = :S, #D = :D, #X = :X, #E = :E, #U = :U"
+            update_expr = "SET #P = :P, #V = #V + :INC, #S = :S, #D = :D, #X = :X, #E = :E, #U = :U"
 
             self.pipelines_table.update_item(
                 Key={"name": self.client.pipeline_name},
                 UpdateExpression=update_expr,
+                ConditionExpression="attribute_exists(#N)",
                 ExpressionAttributeValues=expr_values,
                 ExpressionAttributeNames=expr_names,
-                ReturnValues="UPDATED_NEW",
+                ReturnValues="NONE",
             )
 
         return True
@@ -231,6 +219,44 @@ class PipelineExecutionHistoryAPI:
         else:
             return False
 
+    def put_history_event(self, peh_id, version, status, utc_time_iso, component=None, issue_comment=None):
+        if self.peh_events_table is None:
+            return
+
+        item = {
+            "peh_id": peh_id,
+            # The version keeps events written within the same millisecond apart and ordered
+            "timestamp": f"{utc_time_iso}#{version:06d}",
+            "version": version,
+            "status": status,
+        }
+        if component:
+            item["component"] = component
+        if is_not_empty(issue_comment):
+            item["comment"] = issue_comment
+        if self.peh_events_ttl > 0:
+            item["ttl"] = get_ttl(self.peh_events_ttl)
+
+        self.peh_events_table.put_item(Item=item)
+
+    def get_history_events(self, peh_id):
+        if self.peh_events_table is None:
+            peh_rec = self.get_peh_record(peh_id)
+            return peh_rec.get("history", []) if peh_rec else []
+
+        events = []
+        query_args = {
+            "KeyConditionExpression": "#P = :P",
+            "ExpressionAttributeNames": {"#P": "peh_id"},
+            "ExpressionAttributeValues": {":P": peh_id},
+        }
+        while True:
+            result = self.peh_events_table.query(**query_args)
+            events.extend(result["Items"])
+            if "LastEvaluatedKey" not in result:
+                return events
+            query_args["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
     def check_component(self, component, status, utc_time_iso):
         if component:
             return [{"status": status, "timestamp": utc_time_iso, "component": component}]
@@ -277,4 +303,4 @@ class PipelineExecutionHistoryAPI:
         if not item["active"]:
             raise ValueError("Pipeline execution is inactive")
 
-        self.client.set_pipeline_execution(peh_id, item["pipeline"])
+        self.client.set_pipeline_execution(peh_id, item["pipeline"], item["start_timestamp"])
@@ -0,0 +1,110 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+
+from .commons import init_logger
+
+# Messages are received, redriven and deleted in batches of the maximum SQS batch size
+REDRIVE_BATCH_SIZE = 10
+REDRIVE_WAIT_TIME_SECONDS = 20
+# Seconds between two checks of the downstream load while max in flight is reached
+REDRIVE_IN_FLIGHT_POLL_SECONDS = 5
+# Time left to the Lambda when the redrive stops, so the last batch is always deleted
+REDRIVE_TIME_MARGIN_SECONDS = 10
+
+
+class DLQRedrive:
+    """Drains a dead letter queue in batches, at a target rate and without exceeding a downstream load
+
+    The redrive stops once the queue is empty or before the Lambda runs out of time, messages that
+    could not be redriven are left in the queue
+    """
+
+    def __init__(self, dlq_interface, redrive, rate=None, max_in_flight=None, in_flight=None, log_level=None):
+        """
+        Arguments:
+            dlq_interface {SQSInterface} -- Dead letter queue to drain
+            redrive {function} -- Redrives a batch of messages given their bodies by message id,
+                                  returns the ids of the messages that could not be redriven
+
+        Keyword Arguments:
+            rate {float} -- Target number of messages redriven per second, 0 for no limit
+            max_in_flight {int} -- Maximum downstream load, 0 for no limit
+            in_flight {function} -- Returns the current downstream load, required with max_in_flight
+        """
+        self.log_level = log_level or os.getenv('LOG_LEVEL', 'INFO')
+        self._logger = init_logger(self.log_level)
+        self._dlq_interface = dlq_interface
+        self._redrive = redrive
+        self._in_flight = in_flight
+        self.rate = float(os.getenv('REDRIVE_RATE', '10') if rate is None else rate)
+        self.max_in_flight = int(os.getenv('REDRIVE_MAX_IN_FLIGHT', '0') if max_in_flight is None else max_in_flight)
+        if self.max_in_flight and in_flight is None:
+            raise ValueError('in_flight is required to limit the redrive to max_in_flight')
+
+    def _get_capacity(self, deadline):
+        """Number of messages that can be redriven now, waits while max in flight is reached"""
+        if not self.max_in_flight:
+            return REDRIVE_BATCH_SIZE
+        while True:
+            capacity = self.max_in_flight - self._in_flight()
+            if capacity > 0:
+                return min(capacity, REDRIVE_BATCH_SIZE)
+            if deadline is not None and time.monotonic() + REDRIVE_IN_FLIGHT_POLL_SECONDS > deadline:
+                return 0
+            self._logger.info('{} messages in flight, waiting for capacity'.format(self.max_in_flight - capacity))
+            time.sleep(REDRIVE_IN_FLIGHT_POLL_SECONDS)
+
+    def run(self, context=None):
+        """Redrives messages until the queue is drained or the Lambda context runs out of time
+
+        Returns:
+            {dict} -- Number of redriven and failed messages, and whether the queue was drained
+        """
+        started = time.monotonic()
+        deadline = None
+        if context is not None:
+            deadline = started + context.get_remaining_time_in_millis() / 1000 - REDRIVE_TIME_MARGIN_SECONDS
+        redriven = 0
+        failed = 0
+        drained = False
+        while True:
+            capacity = self._get_capacity(deadline)
+            wait_time_seconds = REDRIVE_WAIT_TIME_SECONDS
+            if deadline is not None:
+                time_left = deadline - time.monotonic()
+                if time_left <= 0:
+                    break
+                wait_time_seconds = min(wait_time_seconds, int(time_left))
+            if not capacity:
+                break
+
+            messages = self._dlq_interface.receive_message_batch(capacity, wait_time_seconds)
+            if not messages:
+                # Messages that failed are invisible until their visibility timeout expires
+                drained = not failed
+                break
+
+            failed_ids = set(self._redrive({message.message_id: message.body for message in messages}))
+            self._dlq_interface.delete_message_batch(
+                [message for message in messages if message.message_id not in failed_ids])
+            redriven += len(messages) - len(failed_ids)
+            failed += len(failed_ids)
+
+            # Paced on the start of the redrive so the average rate stays on target
+            if self.rate > 0:
+                delay = started + redriven / self.rate - time.monotonic()
+                if deadline is not None:
+                    delay = min(delay, deadline - time.monotonic())
+                if delay > 0:
+                    time.sleep(delay)
+
+        self._logger.info('Redrove {} messages, {} failed, queue {}'.format(
+            redriven, failed, 'drained' if drained else 'not drained'))
+        return {
+            'redriven': redriven,
+            'failed': failed,
+            'drained': drained
+        }
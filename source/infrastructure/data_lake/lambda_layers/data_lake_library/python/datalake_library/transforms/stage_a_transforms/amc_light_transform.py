@@ -49,8 +49,8 @@ class CustomTransform():
         # get the file size - originally we would send the file size to the email lambda to determine if it can be attached
         file_size = s3_object.content_length
 
-        # get the file last modified date as a formatted string
-        file_last_modified = s3_interface.get_last_modified(bucket, key)
+        # get the file last modified date as a formatted string, loaded by the same request as the file size
+        file_last_modified = s3_object.last_modified.isoformat()
         file_last_modified = file_last_modified.replace(' ', '-').replace(':', '-').split('+')[0]
         logger.info('file_last_modified: {}'.format(file_last_modified))
 
@@ -146,8 +146,6 @@ class CustomTransform():
 
             kms_key = KMSConfiguration(resource_prefix, "Stage").get_kms_arn
 
-            content = s3_object.get()['Body'].read().decode("UTF8").replace('\\"', "'")
-
             file_meta_data = {
                 'keyTeam': key_team,
                 'keyDataset': key_dataset,
@@ -168,9 +166,14 @@ class CustomTransform():
                 'partitionedPath': output_path.rsplit('/', 1)[0]
             }
 
-            s3.Object(stage_bucket, s3_path).put(Body=content, ServerSideEncryption='aws:kms', SSEKMSKeyId=kms_key,
-                                                 Metadata=file_meta_data
-                                                 )
+            if os.getenv('AMC_LIGHT_TRANSFORM_ZERO_COPY', 'true').lower() == 'true':
+                # Server side copy, the heavy transform normalises the escaped double quotes when parsing the file
+                s3_interface.copy_object(bucket, key, stage_bucket, s3_path, kms_key=kms_key, metadata=file_meta_data)
+            else:
+                content = s3_object.get()['Body'].read().decode("UTF8").replace('\\"', "'")
+                s3.Object(stage_bucket, s3_path).put(Body=content, ServerSideEncryption='aws:kms', SSEKMSKeyId=kms_key,
+                                                     Metadata=file_meta_data
+                                                     )
 
             # IMPORTANT S3 path(s) must be stored in a list
             processed_keys = [s3_path]
@@ -8,11 +8,14 @@
 #######################################################
 
 import awswrangler as wr
+import os
 import re
+import json
+import codecs
+import itertools
 from aws_solutions.core.helpers import get_service_resource
 import gzip
-import json
-from io import BytesIO, TextIOWrapper
+from io import RawIOBase
 
 #######################################################
 # Use S3 Interface to interact with S3 objects
@@ -20,24 +23,231 @@ from io import BytesIO, TextIOWrapper
 #######################################################
 from datalake_library.commons import init_logger
 from datalake_library.configuration.resource_configs import S3Configuration, KMSConfiguration
+from datalake_library.interfaces.s3_interface import S3Interface
 
 s3 = get_service_resource('s3')
 
+s3_interface = S3Interface()
+
 logger = init_logger()
 
+SNIFF_CHUNK_SIZE = 1024
+JSON_WHITESPACE = b' \t\r\n'
+LINE_BREAKS = b'\r\n'
+JSON_DECODE_CHUNK_SIZE = 64 * 1024
+NDJSON_FORMAT = 'ndjson'
+# sections of selling partner reports which are not report data
+NDJSON_EXCLUDED_SECTIONS = ['reportSpecification']
+END_OF_RECORDS = object()
+
+
+class PrefixedStream(RawIOBase):
+    """Readable stream replaying the bytes already consumed from a stream before the rest of it
+
+    Line breaks are dropped so the document stays on a single line as expected by the Glue jobs,
+    they can only be whitespace in valid JSON since strings escape them
+    """
+
+    def __init__(self, prefix: bytes, stream):
+        self.prefix = prefix.translate(None, LINE_BREAKS)
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.prefix:
+            data = self.stream.read(len(buffer))
+            if not data:
+                return 0
+            self.prefix = data.translate(None, LINE_BREAKS)
+        size = min(len(buffer), len(self.prefix))
+        buffer[:size] = self.prefix[:size]
+        self.prefix = self.prefix[size:]
+        return size
+
+
+class JsonStreamReader():
+    """Incremental reader of a JSON document from a binary stream
+
+    Values are decoded one at a time so that arrays can be iterated without loading the document in memory
+    """
+
+    def __init__(self, stream, chunk_size: int = JSON_DECODE_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        # drop the consumed part of the buffer before growing it
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(chunk or b'', final=self.eof)
+        self.position = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """Returns the next significant character without consuming it, empty at the end of the document"""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer) or not self._fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Invalid JSON document, expected one of '{characters}' but found '{character}'")
+        self.position += 1
+        return character
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                # a value ending with the buffer, such as a number, may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def iter_array(self):
+        """Yields the elements of the array starting at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(',]') == ']':
+                return
+
+    def iter_object(self):
+        """Yields the keys of the object starting at the current position
+
+        The value of each key must be consumed by the caller, with decode_value or iter_array,
+        before resuming the iteration
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.position += 1
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+
+class NdjsonStream(RawIOBase):
+    """Readable stream of records serialized as newline delimited JSON"""
+
+    def __init__(self, records):
+        self.records = iter(records)
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            record = next(self.records, END_OF_RECORDS)
+            if record is END_OF_RECORDS:
+                return 0
+            self.pending = json.dumps(record).encode('utf-8') + b'\n'
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
 
 class CustomTransform():
     def __init__(self):
         logger.info("S3 Blueprint Light Transform initiated")
 
     @staticmethod
-    def read_gzip(s3_object_data: dict) -> str:
-        # binary object data is retieved from s3, decompressed, and converted to json text
-        gzip_data = s3_object_data['Body'].read()
-        with gzip.GzipFile(fileobj=BytesIO(gzip_data), mode='rb') as f:
-            with TextIOWrapper(f, encoding='utf-8') as text_file:
-                json_data = json.load(text_file)
-        return json.dumps(json_data)
+    def open_gzip(s3_object_data: dict):
+        # binary object data is decompressed as it is streamed from s3
+        return gzip.GzipFile(fileobj=s3_object_data['Body'], mode='rb')
+
+    @staticmethod
+    def sniff_empty(stream) -> tuple:
+        """Reads the start of a JSON document until its first two significant characters
+
+        Returns:
+            {tuple} -- Whether the document is empty ([], {} or blank) and the bytes read from the stream
+        """
+        prefix = b''
+        significant = b''
+        while len(significant) < 2:
+            chunk = stream.read(SNIFF_CHUNK_SIZE)
+            if not chunk:
+                break
+            prefix += chunk
+            significant += chunk.translate(None, JSON_WHITESPACE)[:2]
+        return significant[:2] in [b'', b'[]', b'{}'], prefix
+
+    @staticmethod
+    def iter_ndjson_sections(reader: JsonStreamReader):
+        """Yields the name and records of each section of a report
+
+        A report made of a single array of records, such as amazon ads reports, is a single unnamed section.
+        Selling partner reports are objects with one array of records per section.
+        Empty sections are skipped.
+        """
+        sections = [None] if reader.peek() == '[' else reader.iter_object()
+        for section in sections:
+            if reader.peek() != '[' or section in NDJSON_EXCLUDED_SECTIONS:
+                reader.decode_value()
+                continue
+            records = reader.iter_array()
+            first_record = next(records, END_OF_RECORDS)
+            if first_record is END_OF_RECORDS:
+                continue
+            yield section, itertools.chain([first_record], records)
+
+    def write_ndjson_sections(self, stream, stage_bucket, s3_output_prefix, kms_key, timestamp) -> list:
+        """Streams each section of a report to the stage bucket as newline delimited json
+
+        Arguments:
+            stream -- Binary stream of the report document
+            stage_bucket {str} -- Stage bucket name
+            s3_output_prefix {str} -- Output key without extension, {s3_output_prefix}.ndjson for a single
+                                      array report or {s3_output_prefix}/{section}.ndjson for each report section
+            kms_key {str} -- Stage bucket KMS key
+
+        Returns:
+            {list} -- Written S3 keys
+        """
+        s3_output_keys = []
+        for section, records in self.iter_ndjson_sections(JsonStreamReader(stream)):
+            s3_output_key = f"{s3_output_prefix}.ndjson" if section is None else f"{s3_output_prefix}/{section}.ndjson"
+            logger.info(f"s3_output_key: {s3_output_key}")
+            s3_interface.upload_fileobj(
+                NdjsonStream(records),
+                stage_bucket,
+                s3_output_key,
+                kms_key=kms_key,
+                metadata={
+                    'timestamp': timestamp
+                }
+            )
+            s3_output_keys.append(s3_output_key)
+
+        if not s3_output_keys:
+            logger.info("File empty: No data to process")
+        return s3_output_keys
 
     def transform_object(self, resource_prefix, bucket, key, team, dataset) -> list:
         stage_bucket = S3Configuration(resource_prefix).stage_bucket
@@ -86,32 +296,44 @@ class CustomTransform():
             timestamp = s3_object_data.get('LastModified')
             timestamp = timestamp.isoformat()
 
-        # read the output data from the s3 object after first checking the filetype
-        output_data = None
+        # stream the output data from the s3 object after first checking the filetype
         if file_extension == "gz":
-            output_data = self.read_gzip(s3_object_data)
+            output_stream = self.open_gzip(s3_object_data)
             output_file = file_name # {file_name} already includes json extension
 
         elif file_extension == "json":
-            output_data = s3_object_data['Body'].read().decode('utf-8')
+            output_stream = s3_object_data['Body']
             output_file = f"{file_name}.json" # {file_name} does not include json extension
 
-        # check if report data file is empty
-        if not json.loads(output_data):
+        # check if report data file is empty from its first bytes, the document itself is never parsed
+        is_empty, prefix = self.sniff_empty(output_stream)
+        if is_empty:
             logger.info("File empty: No data to process")
             return []
 
+        kms_key = KMSConfiguration(resource_prefix, "Stage").get_kms_arn
+
+        # newline delimited json lets the stage b glue jobs split large reports across executors
+        if os.getenv('REPORTS_LIGHT_TRANSFORM_OUTPUT_FORMAT', 'json').lower() == NDJSON_FORMAT:
+            return self.write_ndjson_sections(
+                PrefixedStream(prefix, output_stream),
+                stage_bucket,
+                f"pre-stage/{team}/{dataset}/{table}/{output_file.removesuffix('.json')}",
+                kms_key,
+                timestamp
+            )
+
         # construct destination output s3 key
         s3_output_key = f"pre-stage/{team}/{dataset}/{table}/{output_file}"
         logger.info(f"s3_output_key: {s3_output_key}")
 
-        # write object to destination s3 bucket
-        kms_key = KMSConfiguration(resource_prefix, "Stage").get_kms_arn
-        s3.Object(stage_bucket, s3_output_key).put(
-            Body=output_data, 
-            ServerSideEncryption='aws:kms', 
-            SSEKMSKeyId=kms_key,
-            Metadata={
+        # stream object to destination s3 bucket, multipart for large reports
+        s3_interface.upload_fileobj(
+            PrefixedStream(prefix, output_stream),
+            stage_bucket,
+            s3_output_key,
+            kms_key=kms_key,
+            metadata={
                 'timestamp': timestamp
             }
         )
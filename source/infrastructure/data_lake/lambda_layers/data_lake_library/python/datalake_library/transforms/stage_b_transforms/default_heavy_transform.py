@@ -17,10 +17,9 @@ import datetime as dt
 
 from aws_solutions.core.helpers import get_service_client
 
-import awswrangler as wr
-
 from datalake_library.commons import init_logger
 from datalake_library.configuration.resource_configs import KMSConfiguration
+from datalake_library.transforms.table_partitions import get_table_partitions
 
 logger = init_logger()
 
@@ -37,7 +36,7 @@ class CustomTransform():
     def __init__(self):
         logger.info("Glue Job Blueprint Heavy Transform initiated")
 
-    def transform_object(self, resource_prefix, bucket, keys, team, dataset):
+    def transform_object(self, resource_prefix, bucket, keys, team, dataset, manifest_uri=None):
 
         ssm = get_service_client('ssm')
 
@@ -67,28 +66,11 @@ class CustomTransform():
         # We assume a Glue Job has already been created based on
         # customer needs. This function makes an API call to start it
         #######################################################     
-        tables = []
-
-        s3_locations_to_add = {}
-         
-        key_counter = 0
-        logger.info('Processing Keys: {}\n-----------------'.format(keys))
-        for key in keys:
-            key_counter+=1 
-            logger.info("key {}: {}".format(key_counter, key))
-            table_path = '/'.join(key.split('/')[:4])
-            logger.info("table_path:{}".format(table_path))
-            table_s3_location = 's3://{}/{}/{}'.format(bucket, 'post-stage', table_path.split('/', 1)[1])
-            logger.info('table_s3_location:{}'.format(table_s3_location))
-            s3_locations_to_add[table_s3_location]=True
-            table_partitions = '/'.join(key.split('/')[4:-1])
-            logger.info('table_partitions:{}'.format(table_partitions))
-
-            sanitized_table_name = wr.catalog.sanitize_table_name(table_path.rsplit('/')[-1])
-            if sanitized_table_name not in tables:
-                tables.append(
-                    "{}/{}".format(sanitized_table_name, table_partitions)
-                )
+        logger.info('Processing {} keys{}'.format(
+            len(keys), ' from manifest {}'.format(manifest_uri) if manifest_uri else ''))
+        # Table partitions written by the job, the post-update step reads those of a manifest batch
+        # from the manifest so that the execution payload doesn't grow with the batch
+        tables = get_table_partitions(keys) if not manifest_uri else None
 
         # S3 Path where Glue Job outputs processed keys
         # IMPORTANT: Build the output s3_path without the s3://stage-bucket/
@@ -112,7 +94,7 @@ class CustomTransform():
                 Arguments={
                     '--job-bookmark-option': 'job-bookmark-enable',
                     '--STAGE_BUCKET': bucket,
-                    '--SOURCE_S3_OBJECT_KEYS': ','.join(keys),
+                    **self.get_source_arguments('--SOURCE_S3_OBJECT_KEYS', keys, manifest_uri),
                     '--DATABASE_NAME': silver_catalog,
                     '--JOB_NAME': job_name,
                 },
@@ -120,17 +102,14 @@ class CustomTransform():
             )
         else:
             # amc glue script expects S3 URIs instead of object keys
-            unique_keys = []
-            for i in keys:
-                unique_keys.append('s3://{}/{}'.format(bucket, i))
-            source_locations = ','.join(unique_keys)
-            
+            source_locations = ['s3://{}/{}'.format(bucket, key) for key in keys]
+
             job_response = client.start_job_run(
                 JobName=job_name,
                 Arguments={
                     '--JOB_NAME': job_name,
                     '--job-bookmark-option': 'job-bookmark-disable',
-                    '--SOURCE_LOCATIONS': source_locations,
+                    **self.get_source_arguments('--SOURCE_LOCATIONS', source_locations, manifest_uri),
                     '--SOURCE_LOCATION': source_location,
                     '--OUTPUT_LOCATION': output_location,
                     '--SILVER_CATALOG': silver_catalog,
@@ -146,9 +125,10 @@ class CustomTransform():
         job_details = {
             "jobName": job_name,
             "jobRunId": json_data.get('JobRunId'),
-            "jobStatus": 'STARTED',
-            "tables": tables
+            "jobStatus": 'STARTED'
         }
+        if tables is not None:
+            job_details["tables"] = tables
 
         #######################################################
         # IMPORTANT
@@ -167,6 +147,13 @@ class CustomTransform():
 
         return response
 
+    @staticmethod
+    def get_source_arguments(argument_name, sources, manifest_uri=None):
+        # The manifest replaces the comma joined sources, whose length is bounded by the job arguments size
+        if manifest_uri:
+            return {'--SOURCE_MANIFEST': manifest_uri}
+        return {argument_name: ','.join(sources)}
+
     def check_job_status(self, processed_keys_path, job_details):
         # This function checks the status of the currently running job
         job_response = client.get_job_run(
@@ -0,0 +1,23 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import awswrangler as wr  # Ensure Lambda has an AWS Wrangler Layer configured
+
+
+def get_table_partitions(keys):
+    """Table partitions written by a stage B job run, in the order of the keys
+
+    Arguments:
+        keys {list} -- Keys of the batch, pre-stage/{team}/{dataset}/{table}/{partitions}/{file}
+
+    Returns:
+        {list} -- Distinct {sanitized table}/{partitions} paths of the keys
+    """
+    tables = {}
+    for key in keys:
+        table_path = '/'.join(key.split('/')[:4])
+        table_partitions = '/'.join(key.split('/')[4:-1])
+
+        sanitized_table_name = wr.catalog.sanitize_table_name(table_path.rsplit('/')[-1])
+        tables["{}/{}".format(sanitized_table_name, table_partitions)] = True
+    return list(tables)
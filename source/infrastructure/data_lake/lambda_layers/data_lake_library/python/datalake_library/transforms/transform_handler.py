@@ -1,6 +1,8 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import time
 from importlib import import_module
 
 from datalake_library.commons import init_logger
@@ -11,8 +13,44 @@ logger = init_logger()
 
 
 class TransformHandler:
+    # Dataset items and resolved transforms cache across all instances
+    # {(resource_prefix, dataset name): (dataset item, expiry)}
+    datasets = dict()
+    # {(resource_prefix, dataset name, stage suffix): (transform class, expiry)}
+    transforms = dict()
+
     def __init__(self):
         logger.info("Transformation Handler initiated")
+        self.cache_ttl = int(os.getenv('TRANSFORMS_CACHE_TTL', '300'))
+
+    @classmethod
+    def invalidate(cls, resource_prefix=None, team=None, dataset=None):
+        """Drops cached dataset settings and transforms
+
+        Keyword Arguments:
+            resource_prefix {string} -- Resource prefix of the dataset, all datasets if not provided
+            team {string} -- Team owning the dataset
+            dataset {string} -- Dataset to invalidate
+        """
+        if resource_prefix is None:
+            cls.datasets.clear()
+            cls.transforms.clear()
+            return
+        name = '{}-{}'.format(team, dataset)
+        cls.datasets.pop((resource_prefix, name), None)
+        for key in [key for key in cls.transforms if key[:2] == (resource_prefix, name)]:
+            cls.transforms.pop(key, None)
+
+    def _get_dataset_item(self, resource_prefix, team, dataset):
+        name = '{}-{}'.format(team, dataset)
+        cached = self.datasets.get((resource_prefix, name))
+        if cached and cached[1] > time.time():
+            return cached[0]
+        dynamo_config = DynamoConfiguration(resource_prefix)
+        dynamo_interface = DynamoInterface(dynamo_config)
+        dataset_item = dynamo_interface.get_transform_table_item(name)
+        self.datasets[(resource_prefix, name)] = (dataset_item, time.time() + self.cache_ttl)
+        return dataset_item
 
     def stage_transform(self, resource_prefix, team, dataset, stage):
         """Returns relevant stage Transformation
@@ -24,10 +62,28 @@ class TransformHandler:
             class -- Transform object 
         """
         stage_suffix = stage[-1].lower()
-        dynamo_config = DynamoConfiguration(resource_prefix)
-        dynamo_interface = DynamoInterface(dynamo_config)
-        dataset_transforms = dynamo_interface.get_transform_table_item(
-            '{}-{}'.format(team, dataset))['transforms']['stage_{}_transform'.format(stage_suffix)]
+        cache_key = (resource_prefix, '{}-{}'.format(team, dataset), stage_suffix)
+        cached = self.transforms.get(cache_key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        dataset_transforms = self._get_dataset_item(
+            resource_prefix, team, dataset)['transforms']['stage_{}_transform'.format(stage_suffix)]
         transform_info = "datalake_library.transforms.stage_{}_transforms.{}".format(
             stage_suffix, dataset_transforms)
-        return getattr(import_module(transform_info), 'CustomTransform')
+        transform = getattr(import_module(transform_info), 'CustomTransform')
+        self.transforms[cache_key] = (transform, time.time() + self.cache_ttl)
+        return transform
+
+    def stage_processing_limits(self, resource_prefix, team, dataset, stage):
+        """Returns the minimum and maximum number of items processed at once by a stage
+
+        Arguments:
+            team {string} -- Team owning the dataset
+            dataset {string} -- Dataset to process
+            stage {string} -- Stage processing the items
+        Returns:
+            tuple -- Minimum and maximum number of items to process
+        """
+        stage_key = 'stage_{}'.format(stage[-1].lower())
+        dataset_item = self._get_dataset_item(resource_prefix, team, dataset)
+        return int(dataset_item['min_items_process'][stage_key]), int(dataset_item['max_items_process'][stage_key])
@@ -3,8 +3,9 @@
 
 import os
 import json
+import time
+import hashlib
 from datetime import datetime
-import uuid
 from urllib.parse import unquote_plus
 from aws_solutions.core.helpers import get_service_client, get_service_resource
 from boto3.dynamodb.conditions import Key
@@ -21,6 +22,12 @@ OCTAGON_DATASET_TABLE_NAME = os.environ['OCTAGON_DATASET_TABLE_NAME']
 OCTAGON_METADATA_TABLE_NAME = os.environ['OCTAGON_METADATA_TABLE_NAME']
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+ROUTING_CACHE_TTL = int(os.getenv('ROUTING_CACHE_TTL', '300'))
+ROUTING_NEGATIVE_CACHE_TTL = int(os.getenv('ROUTING_NEGATIVE_CACHE_TTL', '30'))
+# Maximum number of entries of a SendMessageBatch request
+SEND_MESSAGE_BATCH_SIZE = 10
+# Maximum number of keys of a BatchGetItem request
+BATCH_GET_ITEM_SIZE = 100
 
 sqs = get_service_resource("sqs")
 ssm = get_service_client("ssm")
@@ -32,6 +39,27 @@ catalog_table = dynamodb.Table(OCTAGON_METADATA_TABLE_NAME)
 cloudtrail_detail_type = ['AWS API Call via CloudTrail']
 eventbridge_detail_type = ['Object Created', 'Object Deleted']
 
+# Resolution caches reused across invocations of a warm container
+# {(bucket, team, dataset): ((team, dataset, pipeline) or None when no pipeline is found, expiry)}
+routes = dict()
+# {queue name: (queue url, expiry)}
+queue_urls = dict()
+
+
+def get_object_version(s3_event):
+    """Identifies the version of the object an event is about
+
+    The ETag is used when the event carries it, then the version id of versioned buckets,
+    and the event id as a last resort so that only re-deliveries of the same event are duplicates
+    """
+    detail = s3_event.get('detail', {})
+    if s3_event['detail-type'] in eventbridge_detail_type:
+        s3_object = detail.get('object', {})
+        return s3_object.get('etag') or s3_object.get('version-id') or s3_event.get('id')
+    response_elements = detail.get('responseElements') or {}
+    return response_elements.get('x-amz-version-id') or detail.get('eventID') or s3_event.get('id')
+
+
 def parse_s3_event(s3_event):
     logger.info('Parsing S3 Event')
     # the event structure can come in 2 different formats depending on if 
@@ -41,14 +69,16 @@ def parse_s3_event(s3_event):
             'bucket': s3_event["detail"]["requestParameters"]["bucketName"],
             'key': s3_event["detail"]["requestParameters"]["key"],
             'timestamp': int(round(datetime.utcnow().timestamp() * 1000, 0)),
-            'last_modified_date': s3_event['time'].split('.')[0] + '+00:00'
+            'last_modified_date': s3_event['time'].split('.')[0] + '+00:00',
+            'object_version': get_object_version(s3_event)
         }
     elif s3_event['detail-type'] in eventbridge_detail_type:
         return {
             'bucket': s3_event["detail"]["bucket"]["name"],
             'key': s3_event["detail"]["object"]["key"],
             'timestamp': int(round(datetime.utcnow().timestamp() * 1000, 0)),
-            'last_modified_date': s3_event['time'].split('.')[0] + '+00:00'
+            'last_modified_date': s3_event['time'].split('.')[0] + '+00:00',
+            'object_version': get_object_version(s3_event)
         }
     else:
         raise KeyError("Unrecognized event source. Check EventBridge rule.")
@@ -65,8 +95,62 @@ def get_item(table, team, dataset):
         logger.error(e.response['Error']['Message'])
         raise e
     else:
-        item = response['Item']
-        return item['pipeline']
+        item = response.get('Item')
+        return item['pipeline'] if item else None
+
+
+def get_customer_dataset(bucket):
+    """Returns the team and dataset an external AMC bucket is ingested into, None if the bucket is unknown"""
+    config_table = dynamodb.Table(SDLF_CUSTOMER_CONFIG)
+    response = config_table.query(
+        IndexName='amc-index',
+        Select='ALL_PROJECTED_ATTRIBUTES',
+        KeyConditionExpression=Key('hash_key').eq(bucket),
+        Limit=1
+    )
+    if not response['Items']:
+        return None
+    return response['Items'][0]['team'], response['Items'][0]['dataset']
+
+
+def resolve_route(bucket, team, dataset):
+    """Resolves the team, dataset and pipeline of an object from its bucket and key prefix
+
+    Both found and missing routes are cached, missing routes for a shorter time
+    so that newly registered datasets are picked up quickly
+
+    Returns:
+        tuple -- (team, dataset, pipeline) or None if no pipeline is registered
+    """
+    cache_key = (bucket, team, dataset)
+    cached = routes.get(cache_key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+
+    route = None
+    pipeline = get_item(dataset_table, team, dataset)
+    if pipeline:
+        route = (team, dataset, pipeline)
+    else:
+        logger.info('Checking if ingestion is from outside data lake...')
+        customer_dataset = get_customer_dataset(bucket)
+        if customer_dataset:
+            pipeline = get_item(dataset_table, *customer_dataset)
+            if pipeline:
+                route = (*customer_dataset, pipeline)
+
+    ttl = ROUTING_CACHE_TTL if route else ROUTING_NEGATIVE_CACHE_TTL
+    routes[cache_key] = (route, time.time() + ttl)
+    return route
+
+
+def get_queue(queue_name):
+    cached = queue_urls.get(queue_name)
+    if cached and cached[1] > time.time():
+        return sqs.Queue(cached[0])
+    queue = sqs.get_queue_by_name(QueueName=queue_name)
+    queue_urls[queue_name] = (queue.url, time.time() + ROUTING_CACHE_TTL)
+    return queue
 
 
 def delete_item(table, key):
@@ -82,97 +166,247 @@ def delete_item(table, key):
 
 
 def put_item(table, item, key):
+    """Catalogs an object unless it is already cataloged with the same version
+
+    Returns:
+        bool -- False if the object version was already cataloged
+    """
     try:
-        response = table.put_item(
+        table.put_item(
             Item=item,
-            ConditionExpression=f"attribute_not_exists({key})",
+            ConditionExpression=f"attribute_not_exists({key}) OR attribute_not_exists(object_version) "
+                                "OR object_version <> :object_version",
+            ExpressionAttributeValues={':object_version': item.get('object_version')}
         )
     except ClientError as e:
         if e.response['Error']['Code'] == "ConditionalCheckFailedException":
             logger.info(e.response['Error']['Message'])
-        else:
-            raise
-    else:
-        return response
+            return False
+        raise
+    return True
+
+
+def release_item(table, item):
+    """Removes the catalog item of an object version which could not be forwarded,
+    so that a retry of its event is not dropped as a duplicate"""
+    try:
+        table.delete_item(
+            Key={'id': item['id']},
+            ConditionExpression="object_version = :object_version",
+            ExpressionAttributeValues={':object_version': item.get('object_version')}
+        )
+    except ClientError as e:
+        logger.warning(f"Unable to release catalog item {item['id']}: {e.response['Error']['Message']}")
+
+
+def get_cataloged_versions(table, ids):
+    """Returns the cataloged object version of the given catalog ids
+
+    Returns:
+        dict -- {catalog id: object version} for the ids in the catalog
+    """
+    ids = list(set(ids))
+    versions = dict()
+    for i in range(0, len(ids), BATCH_GET_ITEM_SIZE):
+        request = {table.name: {'Keys': [{'id': item_id} for item_id in ids[i:i + BATCH_GET_ITEM_SIZE]],
+                                'ProjectionExpression': 'id, object_version'}}
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(table.name, []):
+                versions[item['id']] = item.get('object_version')
+            request = response.get('UnprocessedKeys')
+    return versions
+
+
+def is_delete_event(s3_event):
+    event_type = s3_event['detail-type']
+    if event_type in cloudtrail_detail_type:
+        operation = s3_event["detail"]["eventName"]
+    elif event_type in eventbridge_detail_type:
+        operation = event_type
+    return operation in ['DeleteObject', 'Object Deleted']
+
+
+def get_catalog_id(message, unquote=False):
+    return 's3://{}/{}'.format(message['bucket'], unquote_plus(message['key']) if unquote else message['key'])
+
+
+def set_catalog_attributes(message):
+    message['id'] = get_catalog_id(message)
+    message['stage'] = message['bucket'].split('-')[-1]
+    if message['stage'] not in ['raw', 'stage', 'analytics']:
+        message['stage'] = 'raw'
+    return message
 
 
 def catalog_item(s3_event, message):
+    """Catalogs the object of an event
+
+    Returns:
+        dict -- The message, None if the event is a duplicate of an already cataloged object version
+    """
     try:
-        event_type = s3_event['detail-type']
-        if event_type in cloudtrail_detail_type:
-            operation = s3_event["detail"]["eventName"]
-        elif event_type in eventbridge_detail_type:
-            operation = event_type
-        if operation in ['DeleteObject', 'Object Deleted']:
-            item_id = 's3://{}/{}'.format(
-                message['bucket'],
-                unquote_plus(message['key'])
-            )
-            delete_item(catalog_table, {'id': item_id})
-        else:
-            message['id'] = f"s3://{message['bucket']}/{message['key']}"
-            message['stage'] = message['bucket'].split('-')[-1]
-            if message['stage'] not in ['raw', 'stage', 'analytics']:
-                message['stage'] = 'raw'
-            put_item(catalog_table, message, 'id')
+        if is_delete_event(s3_event):
+            delete_item(catalog_table, {'id': get_catalog_id(message, unquote=True)})
+        elif not put_item(catalog_table, set_catalog_attributes(message), 'id'):
+            return None
     except ClientError as e:
         logger.info(e.response['Error']['Message'])
-    else:
-        return message
+        raise
+    return message
+
+
+def route_message(message):
+    """Adds the team, dataset and pipeline of a raw object to its message
+
+    Returns:
+        str -- Name of the stage A queue of the pipeline
+    """
+    team = message['key'].split('/')[0]
+    dataset = message['key'].split('/')[1]
+
+    logger.info(
+        'team: {}; dataset: {}; bucket: {}; key: {}'.format(team, dataset, message['bucket'], message['key']))
+
+    route = resolve_route(message['bucket'], team, dataset)
+    if route is None:
+        raise ValueError(f"No pipeline found for bucket {message['bucket']}, team {team} and dataset {dataset}")
+    team, dataset, pipeline = route
+
+    message['team'] = team
+    message['dataset'] = dataset
+    message['pipeline'] = pipeline
+    message['env'] = environment_id
+    message['pipeline_stage'] = 'StageA'
+    return '{}-{}-{}-queue-a.fifo'.format(resource_prefix, team, pipeline)
+
+
+def get_message_entry(message):
+    # duplicates of an object version reaching the queue together are dropped by FIFO deduplication
+    deduplication_key = '{}/{}#{}'.format(message['bucket'], message['key'], message.get('object_version'))
+    return {
+        'MessageBody': json.dumps(message),
+        'MessageGroupId': '{}-{}'.format(message['team'], message['dataset']),
+        'MessageDeduplicationId': hashlib.sha256(deduplication_key.encode('utf-8')).hexdigest()
+    }
+
+
+def send_message_batches(queue_entries):
+    """Sends messages to their queue with SendMessageBatch
+
+    Arguments:
+        queue_entries {dict} -- {queue name: [(record id, message entry)]}
+
+    Returns:
+        list -- Ids of the records whose message could not be sent
+    """
+    failures = []
+    for queue_name, entries in queue_entries.items():
+        logger.info(f"Sending {len(entries)} events to {queue_name} for processing")
+        try:
+            queue = get_queue(queue_name)
+        except ClientError:
+            logger.error(f"Queue {queue_name} not found", exc_info=True)
+            failures.extend(record_id for record_id, _ in entries)
+            continue
+        for i in range(0, len(entries), SEND_MESSAGE_BATCH_SIZE):
+            chunk = entries[i:i + SEND_MESSAGE_BATCH_SIZE]
+            response = queue.send_messages(
+                Entries=[dict(entry, Id=str(index)) for index, (_, entry) in enumerate(chunk)])
+            for failed in response.get('Failed', []):
+                logger.error(f"Failed to send event: {failed}")
+                failures.append(chunk[int(failed['Id'])][0])
+    return failures
+
+
+def process_records(records):
+    """Catalogs and routes a batch of S3 events buffered in the routing queue
+
+    Catalog entries are written with a batch writer and messages are forwarded
+    to the pipeline queues with SendMessageBatch
+
+    Returns:
+        list -- Message ids of the records which failed
+    """
+    failures = []
+    events = []
+    for record in records:
+        try:
+            s3_event = json.loads(record['body'])
+            events.append((record['messageId'], s3_event, parse_s3_event(s3_event)))
+        except Exception:
+            logger.error(f"Failed to parse record {record['messageId']}", exc_info=True)
+            failures.append(record['messageId'])
+
+    # object versions already cataloged are duplicates and dropped
+    cataloged_versions = get_cataloged_versions(
+        catalog_table, [get_catalog_id(message) for _, s3_event, message in events if not is_delete_event(s3_event)])
+
+    routed_messages = dict()
+    queue_entries = dict()
+    with catalog_table.batch_writer(overwrite_by_pkeys=['id']) as batch:
+        for record_id, s3_event, message in events:
+            try:
+                if is_delete_event(s3_event):
+                    batch.delete_item(Key={'id': get_catalog_id(message, unquote=True)})
+                    cataloged_versions.pop(get_catalog_id(message), None)
+                    continue
+                set_catalog_attributes(message)
+                if message['object_version'] is not None and \
+                        cataloged_versions.get(message['id']) == message['object_version']:
+                    logger.info(f"Dropping duplicate event for {message['id']} version {message['object_version']}")
+                    continue
+                # the route is resolved first so that a failed record is not cataloged and its retry is not dropped
+                queue_name = route_message(message) if message['stage'] == 'raw' else None
+                cataloged_versions[message['id']] = message['object_version']
+                batch.put_item(Item=dict(message))
+                if queue_name is None:
+                    logger.info(f"Skipping {message['id']} from stage {message['stage']}")
+                    continue
+                routed_messages[record_id] = message
+                queue_entries.setdefault(queue_name, []).append((record_id, get_message_entry(message)))
+            except Exception:
+                logger.error(f"Failed to route record {record_id}", exc_info=True)
+                failures.append(record_id)
+
+    # events are only forwarded once their objects are in the catalog
+    send_failures = send_message_batches(queue_entries)
+    for record_id in send_failures:
+        release_item(catalog_table, routed_messages[record_id])
+    return failures + send_failures
 
 
 def lambda_handler(event, context):
     # record Lambda invocation to CloudWatch metric
     metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="DatalakeRouting")
+
+    # S3 events buffered in the routing queue are processed in batches
+    if 'Records' in event:
+        logger.info(f"Processing {len(event['Records'])} buffered events")
+        failures = process_records(event['Records'])
+        return {'batchItemFailures': [{'itemIdentifier': record_id} for record_id in failures]}
+
     try:
         logger.info(f"Event: {event}, context: {context}")
 
         message = parse_s3_event(event)
         message = catalog_item(event, message)
+        if message is None:
+            logger.info("Dropping duplicate event, the object version is already cataloged")
+            return
 
-        if message['stage'] == 'raw':
-            team = message['key'].split('/')[0]
-            dataset = message['key'].split('/')[1]
+        try:
+            if message['stage'] == 'raw':
+                queue_name = route_message(message)
 
             logger.info(
-                'team: {}; dataset: {}; bucket: {}; key: {}'.format(team, dataset, message['bucket'], message['key']))
-
-            try:
-                pipeline = get_item(dataset_table, team, dataset)
-            except Exception as e:
-                logger.info('Exception thrown')
-                logger.info(str(e))
-                logger.info('Checking if ingestion is from outside data lake...')
-
-                config_table = dynamodb.Table(SDLF_CUSTOMER_CONFIG)
-
-                response = config_table.query(
-                    IndexName='amc-index',
-                    Select='ALL_PROJECTED_ATTRIBUTES',
-                    KeyConditionExpression=Key('hash_key').eq(message['bucket'])
-                )
-
-                dataset = response['Items'][0]['dataset']
-                team = response['Items'][0]['team']
-
-                pipeline = get_item(dataset_table, team, dataset)
-
-            message['team'] = team
-            message['dataset'] = dataset
-            message['pipeline'] = pipeline
-            message['env'] = environment_id
-            message['pipeline_stage'] = 'StageA'
-
-        logger.info(
-            'Sending event to {}-{} pipeline queue for processing'.format(team, pipeline))
-        queue = sqs.get_queue_by_name(QueueName='{}-{}-{}-queue-a.fifo'.format(
-            resource_prefix,
-            team,
-            pipeline
-        ))
-        queue.send_message(MessageBody=json.dumps(
-            message), MessageGroupId='{}-{}'.format(team, dataset),
-            MessageDeduplicationId=str(uuid.uuid1()))
+                'Sending event to {}-{} pipeline queue for processing'.format(message['team'], message['pipeline']))
+            queue = get_queue(queue_name)
+            queue.send_message(**get_message_entry(message))
+        except Exception:
+            if 'id' in message:
+                release_item(catalog_table, message)
+            raise
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         raise e
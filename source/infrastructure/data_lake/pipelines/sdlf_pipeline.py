@@ -5,11 +5,16 @@ import os
 from pathlib import Path
 from constructs import Construct
 import aws_cdk.aws_events as events
-from aws_cdk import Duration
+from aws_cdk import Duration, RemovalPolicy
 import aws_cdk.aws_events_targets as targets
 from aws_cdk.aws_iam import Effect, PolicyStatement, ServicePrincipal, Policy
 from aws_cdk.aws_lambda import Code, LayerVersion, Function, Runtime
+from aws_cdk.aws_lambda_event_sources import SqsEventSource
+from aws_cdk.aws_sqs import DeadLetterQueue, QueueEncryption
 import aws_cdk.aws_lambda as lambda_
+import aws_cdk.aws_kms as kms
+import aws_cdk.aws_sqs as sqs
+import aws_cdk.aws_cloudwatch as cloudwatch
 from aws_cdk import Aws, Aspects
 from amc_insights.condition_aspect import ConditionAspect
 from aws_cdk.aws_ssm import StringParameter
@@ -47,6 +52,8 @@ class SDLFPipelineConstruct(Construct):
         self._team = team
         self.pipeline = pipeline
         self._foundations_resources = foundations_resources
+        # Buffer raw bucket events in a queue so the routing function processes them in batches
+        self._buffered_routing = str(self.node.try_get_context("DATA_LAKE_ROUTING_BUFFERED")).lower() == "true"
 
         # Simple single-dataset pipeline with static config
         self._create_sdlf_pipeline(
@@ -67,10 +74,14 @@ class SDLFPipelineConstruct(Construct):
             "DeleteObject"
         ]
 
+        event_target = targets.LambdaFunction(self.routing_function)
+        if self._buffered_routing:
+            event_target = targets.SqsQueue(self._create_routing_buffer_queue())
+
         # S3 Event Capture (Raw Bucket)
         self._create_s3_event_capture(
             bucket_name=self._foundations_resources.raw_bucket.bucket_name,
-            lambda_event_target=self.routing_function,
+            event_target=event_target,
             event_data={
                 "event_pattern_names": event_pattern_names,
                 "event_rule_id": "raw-s3-bucket-event-capture",
@@ -194,9 +205,11 @@ class SDLFPipelineConstruct(Construct):
             actions=[
                 "dynamodb:Query",
                 "dynamodb:GetItem",
+                "dynamodb:BatchGetItem",
                 "dynamodb:PutItem",
                 "dynamodb:UpdateItem",
-                "dynamodb:DeleteItem"
+                "dynamodb:DeleteItem",
+                "dynamodb:BatchWriteItem"
             ],
             resources=[
                 self._foundations_resources.customer_config_table.table_arn,
@@ -288,7 +301,65 @@ class SDLFPipelineConstruct(Construct):
 
         return routing_function
 
-    def _create_s3_event_capture(self, bucket_name, lambda_event_target, event_data):
+    def _create_routing_buffer_queue(self) -> sqs.Queue:
+        buffer_key = kms.Key(
+            self,
+            "routing-buffer-key",
+            description="SQS Key Data Lake Routing Buffer",
+            alias=f"alias/{self._resource_prefix}-data-lake-routing-buffer-key",
+            enable_key_rotation=True,
+            pending_window=Duration.days(30),
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+        # EventBridge encrypts the events it delivers to the queue
+        buffer_key.grant_encrypt_decrypt(ServicePrincipal("events.amazonaws.com"))
+
+        buffer_dlq = sqs.Queue(
+            self,
+            "routing-buffer-dlq",
+            queue_name=f"{self._resource_prefix}-data-lake-routing-buffer-dlq",
+            retention_period=Duration.days(14),
+            encryption=QueueEncryption.KMS,
+            encryption_master_key=buffer_key,
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+        cloudwatch.Alarm(
+            self,
+            id='alarm-routing-buffer-dlq',
+            alarm_description='CloudWatch Alarm for Data Lake Routing Buffer DLQ',
+            metric=buffer_dlq.metric('ApproximateNumberOfMessagesVisible', period=Duration.seconds(60)),
+            evaluation_periods=1,
+            datapoints_to_alarm=1,
+            threshold=1,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD
+        )
+
+        buffer_queue = sqs.Queue(
+            self,
+            "routing-buffer-queue",
+            queue_name=f"{self._resource_prefix}-data-lake-routing-buffer",
+            # six times the routing function timeout, as recommended for SQS event sources
+            visibility_timeout=Duration.seconds(360),
+            encryption=QueueEncryption.KMS,
+            encryption_master_key=buffer_key,
+            dead_letter_queue=DeadLetterQueue(max_receive_count=3, queue=buffer_dlq),
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+        # Events landing together, such as AMC workflow results, are routed by a single invocation
+        self.routing_function.add_event_source(
+            SqsEventSource(
+                buffer_queue,
+                batch_size=int(self.node.try_get_context("DATA_LAKE_ROUTING_BATCH_SIZE") or 100),
+                max_batching_window=Duration.seconds(5),
+                report_batch_item_failures=True,
+            )
+        )
+
+        return buffer_queue
+
+    def _create_s3_event_capture(self, bucket_name, event_target, event_data):
 
         events.Rule(
             self,
@@ -309,5 +380,5 @@ class SDLFPipelineConstruct(Construct):
                     }
                 },
             ),
-            targets=[targets.LambdaFunction(lambda_event_target)]
+            targets=[event_target]
         )
@@ -0,0 +1,74 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+from aws_lambda_powertools import Logger
+from datalake_library.configuration.resource_configs import DynamoConfiguration
+from datalake_library.interfaces.dynamo_interface import DynamoInterface
+from datalake_library.interfaces.states_interface import StatesInterface
+from datalake_library import octagon
+from cloudwatch_metrics import metrics
+
+logger = Logger(service="SDLF pipeline stage B", level="INFO", utc=True)
+
+resource_prefix = os.environ["RESOURCE_PREFIX"]
+STACK_NAME = os.environ['STACK_NAME']
+METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+
+
+def lambda_handler(event, context):
+    """Resumes the execution waiting for a Glue job run once the run ends
+
+    Arguments:
+        event {dict} -- Glue Job State Change event
+        context {dict} -- Dictionary with details on Lambda context
+    """
+    # record Lambda invocation to CloudWatch metric
+    metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(
+        metric_name="SdlfHeavyTransformJobStateChange")
+    try:
+        logger.info('Fetching event data from Glue job state change')
+        job_run_id = event['detail']['jobRunId']
+        job_state = event['detail']['state']
+        job_message = event['detail'].get('message') or 'Job failed, please check the logs'
+
+        component = context.function_name.split('-')[-2].title()
+    except Exception as e:
+        logger.error("Fatal error: unable to fetch data from Lambda event or context", exc_info=True)
+        raise e
+
+    dynamo_interface = DynamoInterface(DynamoConfiguration(resource_prefix))
+    task = dynamo_interface.get_job_task_token(job_run_id)
+    if task is None:
+        # Runs started outside of the pipeline, or whose execution was already resumed
+        logger.warning('No execution waiting for job run {}'.format(job_run_id))
+        return
+    task_token, payload = task
+    job = payload['job']
+    job['jobDetails']['jobStatus'] = job_state
+
+    states_interface = StatesInterface()
+    if job_state == 'SUCCEEDED':
+        states_interface.send_task_success(task_token, job)
+    else:
+        try:
+            logger.info('Initializing Octagon client')
+            octagon_client = (
+                octagon.OctagonClient()
+                .with_run_lambda(True)
+                .with_configuration_instance(payload['env'], resource_prefix)
+                .build()
+            )
+        except Exception as e:
+            logger.error("Fatal error: octagon client initialization fail", exc_info=True)
+            raise e
+
+        stage = payload['pipeline_stage']
+        octagon_client.set_pipeline_execution(
+            job['peh_id'], '{}-{}-stage-{}'.format(payload['team'], payload['pipeline'], stage[-1].lower()),
+            job.get('peh_start_timestamp'))
+        octagon_client.end_pipeline_execution_failed(component=component,
+                                                     issue_comment="{} {} Error: Check Job Logs".format(stage,
+                                                                                                        component))
+        states_interface.send_task_failure(task_token, 'Job Failed', '{} {}'.format(job_state, job_message))
+    dynamo_interface.delete_job_task_token(job_run_id)
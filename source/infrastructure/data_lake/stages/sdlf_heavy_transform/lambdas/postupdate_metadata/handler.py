@@ -1,12 +1,12 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 import os
+from datetime import datetime
 from aws_lambda_powertools import Logger
-from datalake_library.configuration import DynamoConfiguration
+from datalake_library.configuration import DynamoConfiguration, GlueConfiguration
 from datalake_library.interfaces import DynamoInterface
 from datalake_library.interfaces import S3Interface
 from datalake_library import octagon
-from datalake_library.octagon import peh
 from cloudwatch_metrics import metrics
 
 logger = Logger(service="SDLF pipeline stage B", level="INFO", utc=True)
@@ -14,6 +14,42 @@ logger = Logger(service="SDLF pipeline stage B", level="INFO", utc=True)
 resource_prefix = os.environ["RESOURCE_PREFIX"]
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+# Objects written by the job run are validated against the schema of tables with validate_schema set
+SCHEMA_VALIDATION = os.getenv('SCHEMA_VALIDATION', 'false') == 'true'
+
+
+def validate_batch_schema(bucket, team, dataset, processed_keys_path, processed_objects, start_timestamp):
+    """Validates the Parquet objects written by the job run against the schema of their Glue table
+
+    Arguments:
+        processed_objects {list} -- Objects listed under the tables of the job run
+        start_timestamp {str} -- Start of the pipeline execution, objects modified before belong to earlier runs
+    """
+    # Imported when enabled only, the validator requires the AWS Wrangler layer
+    import awswrangler as wr
+    from datalake_library.data_quality.schema_validator import ParquetSchemaValidator
+
+    written_since = datetime.fromisoformat(start_timestamp.replace('Z', '+00:00')) if start_timestamp else None
+    table_keys = {}
+    for processed_object in processed_objects:
+        if written_since and datetime.fromisoformat(processed_object['last_modified_date']) < written_since:
+            continue
+        # Table names are sanitized by the jobs when they update the catalog
+        table = wr.catalog.sanitize_table_name(
+            processed_object['key'][len(processed_keys_path):].strip('/').split('/')[0])
+        table_keys.setdefault(table, []).append('s3://{}/{}'.format(bucket, processed_object['key']))
+
+    database_name = GlueConfiguration(resource_prefix, team, dataset).get_stage_data_catalog
+    validator = ParquetSchemaValidator()
+    invalid_tables = []
+    for table, keys in table_keys.items():
+        try:
+            if not validator.validate(None, keys, database_name, table):
+                invalid_tables.append(table)
+        except validator.glue_client.exceptions.EntityNotFoundException:
+            logger.info('Table {} is not in the catalog, its objects are not validated'.format(table))
+    if invalid_tables:
+        raise ValueError('Objects written to tables {} do not match their schema'.format(invalid_tables))
 
 
 def lambda_handler(event, context):
@@ -34,16 +70,17 @@ def lambda_handler(event, context):
         bucket = event['body']['bucket']
         processed_keys_path = event['body']['job']['processedKeysPath']
 
-        tables_to_process = event['body']['job']['jobDetails']['tables']
-
-        table_processed_paths = []
+        s3_interface = S3Interface()
+        tables_to_process = event['body']['job']['jobDetails'].get('tables')
+        if tables_to_process is None:
+            # Imported for manifest batches only, the table names are sanitized with AWS Wrangler
+            from datalake_library.transforms.table_partitions import get_table_partitions
+            manifest = s3_interface.read_manifest(event['body']['manifestUri'])
+            tables_to_process = get_table_partitions([entry['key'] for entry in manifest['entries']])
+        processed_objects = []
         for table in tables_to_process:
             path = "{}/{}".format(processed_keys_path, table)
-            processed = S3Interface().list_objects(bucket, path)
-            for p in processed:
-                table_processed_paths.append(p)
-
-        processed_keys = table_processed_paths
+            processed_objects.extend(s3_interface.list_objects_metadata(bucket, path))
         team = event['body']['team']
         pipeline = event['body']['pipeline']
         stage = event['body']['pipeline_stage']
@@ -68,20 +105,26 @@ def lambda_handler(event, context):
         raise e
 
     try:
-        peh.PipelineExecutionHistoryAPI(
-            octagon_client).retrieve_pipeline_execution(peh_id)
+        octagon_client.set_pipeline_execution(
+            peh_id, '{}-{}-stage-{}'.format(team, pipeline, stage[-1].lower()),
+            event['body']['job'].get('peh_start_timestamp'))
+
+        if SCHEMA_VALIDATION:
+            logger.info('Validating the schema of the objects written by the job')
+            validate_batch_schema(bucket, team, dataset, processed_keys_path, processed_objects,
+                                  event['body']['job'].get('peh_start_timestamp'))
 
         logger.info('Initializing DynamoDB config and Interface')
         dynamo_config = DynamoConfiguration(resource_prefix)
         dynamo_interface = DynamoInterface(dynamo_config)
 
         logger.info('Storing metadata to DynamoDB')
-        for key in processed_keys:
-            object_metadata = {
+        dynamo_interface.update_object_metadata_catalog_batch([
+            {
                 'bucket': bucket,
-                'key': key,
-                'size': S3Interface().get_size(bucket, key),
-                'last_modified_date': S3Interface().get_last_modified(bucket, key),
+                'key': processed_object['key'],
+                'size': processed_object['size'],
+                'last_modified_date': processed_object['last_modified_date'],
                 'env': event['body']['env'],
                 'team': team,
                 'pipeline': pipeline,
@@ -89,8 +132,8 @@ def lambda_handler(event, context):
                 'stage': 'stage',
                 'pipeline_stage': stage,
                 'peh_id': peh_id
-            }
-            dynamo_interface.update_object_metadata_catalog(object_metadata)
+            } for processed_object in processed_objects
+        ])
 
         # Only uncomment if a queue for the next stage exists
         # logger.info('Sending messages to next SQS queue if it exists')
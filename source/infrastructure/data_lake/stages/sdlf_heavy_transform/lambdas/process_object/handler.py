@@ -1,8 +1,13 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
+import inspect
 import os
 from aws_lambda_powertools import Logger
+from botocore.exceptions import ClientError
 from datalake_library.transforms import TransformHandler
+from datalake_library.interfaces import S3Interface
+from datalake_library.configuration.resource_configs import DynamoConfiguration
+from datalake_library.interfaces.dynamo_interface import DynamoInterface
 from datalake_library import octagon
 from cloudwatch_metrics import metrics
 
@@ -11,6 +16,8 @@ logger = Logger(service="SDLF pipeline stage B", level="INFO", utc=True)
 resource_prefix = os.environ["RESOURCE_PREFIX"]
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+# Task tokens are kept past the default Glue job timeout of 48 hours
+TASK_TOKEN_TTL_SECONDS = 49 * 60 * 60
 
 
 def lambda_handler(event, context):
@@ -29,11 +36,15 @@ def lambda_handler(event, context):
     try:
         logger.info('Fetching event data from previous step')
         bucket = event['body']['bucket']
-        keys_to_process = event['body']['keysToProcess']
+        # Batches are handed over through a manifest, older payloads carry the keys inline
+        manifest_uri = event['body'].get('manifestUri')
+        keys_to_process = event['body']['keysToProcess'] if not manifest_uri else None
         team = event['body']['team']
         pipeline = event['body']['pipeline']
         stage = event['body']['pipeline_stage']
         dataset = event['body']['dataset']
+        # Set when the state machine waits for the job state change instead of polling the job
+        task_token = event.get('taskToken')
 
         component = context.function_name.split('-')[-2].title()
     except Exception as e:
@@ -60,19 +71,43 @@ def lambda_handler(event, context):
             comment=event
         )
 
+        transform_handler = TransformHandler().stage_transform(resource_prefix, team, dataset, stage)
+        transform_kwargs = {}
+        if manifest_uri:
+            manifest = S3Interface().read_manifest(manifest_uri)
+            keys_to_process = [entry['key'] for entry in manifest['entries']]
+            # Transforms that accept the manifest pass it on instead of the keys
+            if 'manifest_uri' in inspect.signature(transform_handler.transform_object).parameters:
+                transform_kwargs['manifest_uri'] = manifest_uri
+
         # Call custom transform created by user and process the file
         logger.info('Calling user custom processing code')
-        transform_handler = TransformHandler().stage_transform(resource_prefix, team, dataset, stage)
         response = transform_handler().transform_object(
-            resource_prefix, bucket, keys_to_process, team, dataset)  # custom user code called
+            resource_prefix, bucket, keys_to_process, team, dataset, **transform_kwargs)  # custom user code called
         response['peh_id'] = peh_id
+        response['peh_start_timestamp'] = octagon_client.pipeline_start_timestamp
+        if task_token:
+            DynamoInterface(DynamoConfiguration(resource_prefix)).put_job_task_token(
+                response['jobDetails']['jobRunId'], task_token, {
+                    'job': response,
+                    'env': event['body']['env'],
+                    'team': team,
+                    'pipeline': pipeline,
+                    'pipeline_stage': stage
+                }, TASK_TOKEN_TTL_SECONDS)
         # remove_content_tmp()
         octagon_client.update_pipeline_execution(
             status="{} {} Processing".format(stage, component), component=component)
     except Exception as e:
-        logger.error("Fatal error", exc_info=True)
-        octagon_client.end_pipeline_execution_failed(component=component,
-                                                     issue_comment="{} {} Error: {}".format(stage, component, repr(e)))
+        if isinstance(e, ClientError) and e.response['Error']['Code'] == 'ConcurrentRunsExceededException':
+            # The state machine retries the batch once a job run slot is free, the execution is not a failure
+            logger.info("Maximum concurrent job runs reached, the batch is retried")
+            octagon_client.end_pipeline_execution_cancel(
+                component=component, issue_comment="{} {} Retried: {}".format(stage, component, repr(e)))
+        else:
+            logger.error("Fatal error", exc_info=True)
+            octagon_client.end_pipeline_execution_failed(
+                component=component, issue_comment="{} {} Error: {}".format(stage, component, repr(e)))
         # remove_content_tmp()
         raise e
     return response
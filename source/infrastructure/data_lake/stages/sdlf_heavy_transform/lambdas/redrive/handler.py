@@ -8,6 +8,7 @@ from aws_lambda_powertools import Logger
 from datalake_library.configuration import SQSConfiguration, StateMachineConfiguration
 from datalake_library.interfaces import StatesInterface
 from datalake_library.interfaces import SQSInterface
+from datalake_library.redrive import DLQRedrive
 from cloudwatch_metrics import metrics
 
 logger = Logger(service="SDLF pipeline stage B", level="INFO", utc=True)
@@ -16,7 +17,14 @@ resource_prefix = os.environ["RESOURCE_PREFIX"]
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
 
-def lambda_handler(event, _):
+def lambda_handler(event, context):
+    """Restarts the state machine with the payloads of the stage DLQ
+
+    Arguments:
+        event {dict} -- Dataset of the DLQ, with optional rate and max_in_flight overriding the
+                        configured redrive limits
+        context {dict} -- Dictionary with details on Lambda context
+    """
     # record Lambda invocation to CloudWatch metric
     metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRedrive")
     try:
@@ -24,27 +32,39 @@ def lambda_handler(event, _):
         pipeline = os.environ['PIPELINE']
         dataset = event['dataset']
         stage = os.environ['STAGE']
-        state_config = StateMachineConfiguration(resource_prefix, team, pipeline, stage)
+        state_machine_arn = StateMachineConfiguration(resource_prefix, team, pipeline, stage).get_stage_state_machine_arn
         sqs_config = SQSConfiguration(resource_prefix, team, dataset, stage)
         dlq_interface = SQSInterface(sqs_config.get_stage_dlq_name)
+        states_interface = StatesInterface()
+
+        def start_executions(messages):
+            failed = set()
+            for message_id, body in messages.items():
+                try:
+                    logger.info('Starting State Machine Execution')
+                    states_interface.run_state_machine(state_machine_arn, json.loads(body))
+                except Exception:
+                    logger.error("Unable to redrive message {}".format(message_id), exc_info=True)
+                    failed.add(message_id)
+                    continue
+                # record State Machine invocation to CloudWatch metric
+                metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRedriveSM")
+            return failed
 
-        messages = dlq_interface.receive_messages(1)
-        if not messages:
+        # Each running execution holds a Glue job run, they are counted up to the limit
+        redrive = DLQRedrive(
+            dlq_interface,
+            start_executions,
+            rate=event.get('rate'),
+            max_in_flight=event.get('max_in_flight'),
+            in_flight=lambda: states_interface.count_running_executions(state_machine_arn, redrive.max_in_flight)
+        )
+        response = redrive.run(context)
+        if not response['redriven'] and not response['failed']:
             logger.info('No messages found in {}'.format(
                 sqs_config.get_stage_dlq_name))
             return
-
-        logger.info('Received {} messages'.format(len(messages)))
-        for message in messages:
-            logger.info('Starting State Machine Execution')
-            if isinstance(message.body, str):
-                response = json.loads(message.body)
-            StatesInterface().run_state_machine(
-                state_config.get_stage_state_machine_arn, response)
-            # record State Machine invocation to CloudWatch metric
-            metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRedriveSM")
-            message.delete()
-            logger.info('Delete message succeeded')
+        return response
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
-        raise e
\ No newline at end of file
+        raise e
@@ -3,12 +3,15 @@
 
 import json
 import os
+import uuid
 from aws_lambda_powertools import Logger
-from datalake_library.configuration import DynamoConfiguration, SQSConfiguration, StateMachineConfiguration, \
-    S3Configuration
-from datalake_library.interfaces import DynamoInterface
+from datalake_library.configuration import SQSConfiguration, StateMachineConfiguration, S3Configuration, \
+    KMSConfiguration
 from datalake_library.interfaces import SQSInterface
+from datalake_library.interfaces import S3Interface
 from datalake_library.interfaces import StatesInterface
+from datalake_library.fair_share import FairShareScheduler
+from datalake_library.transforms import TransformHandler
 from aws_solutions.core.helpers import get_service_client
 from cloudwatch_metrics import metrics
 
@@ -18,6 +21,47 @@ resource_prefix = os.environ["RESOURCE_PREFIX"]
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
 
+# Batch manifests are written under this prefix of the stage bucket
+MANIFEST_PREFIX = 'manifests'
+
+
+def write_keys_manifest(stage_bucket, team, dataset, keys_to_process):
+    """Writes the keys of the batch with their size and etag to a manifest in the stage bucket
+
+    Returns:
+        {str} -- S3 URI of the manifest
+    """
+    s3_interface = S3Interface()
+    objects_metadata, errors = s3_interface.head_objects(stage_bucket, keys_to_process)
+    if errors:
+        logger.warning('Unable to read the metadata of {} objects: {}'.format(len(errors), list(errors)))
+    entries = []
+    for key in keys_to_process:
+        entry = {'key': key}
+        if key in objects_metadata:
+            entry.update({
+                'size': objects_metadata[key]['size'],
+                'etag': objects_metadata[key]['etag']
+            })
+        entries.append(entry)
+
+    manifest_key = '{}/{}/{}/{}.json'.format(MANIFEST_PREFIX, team, dataset, uuid.uuid4())
+    kms_key = KMSConfiguration(resource_prefix, "Stage").get_kms_arn
+    return s3_interface.write_manifest(stage_bucket, manifest_key, stage_bucket, entries, kms_key)
+
+
+def group_keys_by_table(keys_to_process):
+    """Groups the keys of the batch by target table, in the order of the keys
+
+    Returns:
+        {dict} -- Keys by table
+    """
+    tables = {}
+    for key in keys_to_process:
+        tables.setdefault(FairShareScheduler.get_share(key)[1], []).append(key)
+    return tables
+
+
 def lambda_handler(event, _):
     """Checks if any items need processing and triggers state machine
     Arguments:
@@ -27,6 +71,7 @@ def lambda_handler(event, _):
     # record Lambda invocation to CloudWatch metric
     metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRouting")
 
+    pending_batches = []
     try:
         team = event['team']
         pipeline = event['pipeline']
@@ -34,53 +79,63 @@ def lambda_handler(event, _):
         dataset = event['dataset']
         env = event['env']
         stage_bucket = S3Configuration(resource_prefix).stage_bucket
-        dynamo_config = DynamoConfiguration(resource_prefix)
-        dynamo_interface = DynamoInterface(dynamo_config)
-        transform_info = dynamo_interface.get_transform_table_item(
-            '{}-{}'.format(team, dataset))
-        MIN_ITEMS_TO_PROCESS = int(
-            transform_info['min_items_process']['stage_{}'.format(stage[-1].lower())])
-        MAX_ITEMS_TO_PROCESS = int(
-            transform_info['max_items_process']['stage_{}'.format(stage[-1].lower())])
+        MIN_ITEMS_TO_PROCESS, MAX_ITEMS_TO_PROCESS = TransformHandler().stage_processing_limits(
+            resource_prefix, team, dataset, stage)
         sqs_config = SQSConfiguration(resource_prefix, team, dataset, stage)
         queue_interface = SQSInterface(sqs_config.get_stage_queue_name)
-        keys_to_process = []
 
         logger.info(
             'Querying {}-{} objects waiting for processing'.format(team, dataset))
-        keys_to_process = queue_interface.receive_min_max_messages(
-            MIN_ITEMS_TO_PROCESS, MAX_ITEMS_TO_PROCESS)
+        # Customers share the batch so a backfill doesn't hold back the daily results of the others
+        keys_to_process = queue_interface.receive_fair_share_messages(
+            MIN_ITEMS_TO_PROCESS, MAX_ITEMS_TO_PROCESS, FairShareScheduler())
         # If no keys to process, break
         if not keys_to_process:
             return
 
         logger.info('{} Objects ready for processing'.format(
             len(keys_to_process)))
-        keys_to_process = list(set(keys_to_process))
-
-        response = {
-            'statusCode': 200,
-            'body': {
-                "bucket": stage_bucket,
-                "keysToProcess": keys_to_process,
-                "team": team,
-                "pipeline": pipeline,
-                "pipeline_stage": stage,
-                "dataset": dataset,
-                "env": env
-            }
-        }
-        logger.info('Starting State Machine Execution')
+        keys_to_process = list(dict.fromkeys(keys_to_process))
+
+        # One execution per table, so that concurrent Glue runs update disjoint tables of the catalog
+        for table_keys in group_keys_by_table(keys_to_process).values():
+            pending_batches.append({
+                'statusCode': 200,
+                'body': {
+                    "bucket": stage_bucket,
+                    "keysToProcess": table_keys,
+                    "team": team,
+                    "pipeline": pipeline,
+                    "pipeline_stage": stage,
+                    "dataset": dataset,
+                    "env": env
+                }
+            })
+        logger.info('Starting {} State Machine Executions'.format(len(pending_batches)))
         state_config = StateMachineConfiguration(resource_prefix, team, pipeline, stage)
-        StatesInterface().run_state_machine(
-            state_config.get_stage_state_machine_arn, response)
-        # record State Machine invocation to CloudWatch metric
-        metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRoutingSM")
+        while pending_batches:
+            response = pending_batches[0]
+            # The keys are handed over through a manifest so the batch size isn't capped by the
+            # state machine payload and the Glue job arguments, they stay inline if it can't be written
+            response['body']['keysCount'] = len(response['body']['keysToProcess'])
+            try:
+                response['body']['manifestUri'] = write_keys_manifest(
+                    stage_bucket, team, dataset, response['body']['keysToProcess'])
+                del response['body']['keysToProcess']
+            except Exception:
+                logger.warning('Unable to write the batch manifest, the keys are passed inline', exc_info=True)
+
+            StatesInterface().run_state_machine(
+                state_config.get_stage_state_machine_arn, response)
+            pending_batches.pop(0)
+            # record State Machine invocation to CloudWatch metric
+            metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfHeavyTransformRoutingSM")
     except Exception as e:
-        # If failure send to DLQ
-        if keys_to_process:
+        # If failure send the batches not started to DLQ
+        if pending_batches:
             dlq_interface = SQSInterface(sqs_config.get_stage_dlq_name)
-            dlq_interface.send_message_to_fifo_queue(
-                json.dumps(response), 'failed')
+            for response in pending_batches:
+                dlq_interface.send_message_to_fifo_queue(
+                    json.dumps(response), 'failed')
         logger.error("Fatal error", exc_info=True)
         raise e
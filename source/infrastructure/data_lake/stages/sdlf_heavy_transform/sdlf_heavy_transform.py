@@ -107,7 +107,7 @@ class SDLFHeavyTransform(Construct):
                 "STACK_NAME": Aws.STACK_NAME
             },
             description="Redrive Data Lake StageB step function",
-            timeout=Duration.minutes(1),
+            timeout=Duration.minutes(15),
             memory_size=256,
             runtime=Runtime.PYTHON_3_11,
             architecture=lambda_.Architecture.ARM_64,
@@ -148,12 +148,12 @@ class SDLFHeavyTransform(Construct):
             lambda_function=self._postupdate_lambda
         )
 
-        self._check_job_lambda = lambda_.Function(
+        self._job_state_change_lambda = lambda_.Function(
             self,
-            "checkjob-b",
-            function_name=f"{self.resource_prefix}-{team}-{pipeline}-checkjob-b",
+            "jobstate-b",
+            function_name=f"{self.resource_prefix}-{team}-{pipeline}-jobstate-b",
             code=Code.from_asset(
-                os.path.join(f"{Path(__file__).parent}", "lambdas/check_job")),
+                os.path.join(f"{Path(__file__).parent}", "lambdas/job_state_change")),
             handler=lambda_handler,
             environment={
                 "SOLUTION_ID": self.node.try_get_context("SOLUTION_ID"),
@@ -162,7 +162,7 @@ class SDLFHeavyTransform(Construct):
                 "METRICS_NAMESPACE": self.node.try_get_context("METRICS_NAMESPACE"),
                 "STACK_NAME": Aws.STACK_NAME
             },
-            description="Check if glue job still running in Data Lake StageB",
+            description="Resume Data Lake StageB step function when its glue job ends",
             timeout=Duration.minutes(1),
             memory_size=256,
             architecture=lambda_.Architecture.ARM_64,
@@ -171,9 +171,9 @@ class SDLFHeavyTransform(Construct):
 
         SolutionsLambdaFunctionAlarm(
             self,
-            id="checkjob-b-lambda-alarm",
-            alarm_name=f"{self.resource_prefix}-{team}-{pipeline}-checkjob-b-lambda-alarm",
-            lambda_function=self._check_job_lambda
+            id="jobstate-b-lambda-alarm",
+            alarm_name=f"{self.resource_prefix}-{team}-{pipeline}-jobstate-b-lambda-alarm",
+            lambda_function=self._job_state_change_lambda
         )
 
         self._error_lambda = lambda_.Function(
@@ -236,19 +236,47 @@ class SDLFHeavyTransform(Construct):
         self._foundations_resources.stage_bucket_key.grant_encrypt(self._process_lambda)
         self._foundations_resources.stage_bucket.grant_write(self._process_lambda)
 
+        # The routing writes the batch manifests handed over to the state machine
+        self._foundations_resources.stage_bucket_key.grant_encrypt(self._routing_lambda)
+        self._foundations_resources.stage_bucket.grant_put(self._routing_lambda, f"manifests/{team}/*")
+
         self._process_lambda.node.add_dependency(self._foundations_resources.wrangler_layer)
-        self._check_job_lambda.node.add_dependency(self._foundations_resources.wrangler_layer)
+        self._postupdate_lambda.node.add_dependency(self._foundations_resources.wrangler_layer)
 
-        self.lambda_functions = [self._routing_lambda, self._postupdate_lambda, self._check_job_lambda,
+        self.lambda_functions = [self._routing_lambda, self._postupdate_lambda, self._job_state_change_lambda,
                             self._process_lambda, self._error_lambda, self._redrive_lambda]
 
+        # Configuration parameters are loaded once per container with GetParametersByPath
+        for _lambda_object in self.lambda_functions:
+            _lambda_object.add_environment("SSM_PARAMETERS_PREFETCH", "true")
+
+        # Fair share of the batches across customers: objects of a customer per batch, customer weights
+        # and caps overrides by customer hash, and number of batches worth of messages read to pick from
+        self._routing_lambda.add_environment(
+            "FAIR_SHARE_MAX_ITEMS_PER_CUSTOMER",
+            str(self.node.try_get_context("DATA_LAKE_FAIR_SHARE_MAX_ITEMS_PER_CUSTOMER") or 0))
+        self._routing_lambda.add_environment(
+            "FAIR_SHARE_CUSTOMERS", json.dumps(self.node.try_get_context("DATA_LAKE_FAIR_SHARE_CUSTOMERS") or {}))
+        self._routing_lambda.add_environment(
+            "FAIR_SHARE_LOOKAHEAD", str(self.node.try_get_context("DATA_LAKE_FAIR_SHARE_LOOKAHEAD") or 5))
+
+        # Schema validation of the Parquet objects written by each job run, for tables with validate_schema set
+        self._postupdate_lambda.add_environment(
+            "SCHEMA_VALIDATION", str(bool(self.node.try_get_context("DATA_LAKE_SCHEMA_VALIDATION"))).lower())
+
+        # Redrive limits: executions started per second and running executions of the state machine
+        self._redrive_lambda.add_environment(
+            "REDRIVE_RATE", str(self.node.try_get_context("DATA_LAKE_REDRIVE_RATE") or 10))
+        self._redrive_lambda.add_environment(
+            "REDRIVE_MAX_IN_FLIGHT", str(self.node.try_get_context("DATA_LAKE_REDRIVE_MAX_IN_FLIGHT_B") or 0))
+
         self._add_layers(self.lambda_functions)
 
         self._attach_policy_to_lambda_roles(team, pipeline, self.lambda_functions)
 
     def _add_layers(self, lambda_functions):
         self._process_lambda.add_layers(self._foundations_resources.wrangler_layer)
-        self._check_job_lambda.add_layers(self._foundations_resources.wrangler_layer)
+        self._postupdate_lambda.add_layers(self._foundations_resources.wrangler_layer)
 
         metrics_layer = LayerVersion(
             self,
@@ -279,7 +307,10 @@ class SDLFHeavyTransform(Construct):
         sm_b_policy_statement = PolicyStatement(
             effect=Effect.ALLOW,
             actions=[
-                "states:StartExecution"
+                "states:StartExecution",
+                "states:ListExecutions",
+                "states:SendTaskSuccess",
+                "states:SendTaskFailure"
             ],
             resources=[
                 f"arn:aws:states:{Aws.REGION}:{Aws.ACCOUNT_ID}:stateMachine:{self.resource_prefix}-{team}-{pipeline}-sm-b"],
@@ -314,6 +345,18 @@ class SDLFHeavyTransform(Construct):
                 f"arn:aws:glue:{Aws.REGION}:{Aws.ACCOUNT_ID}:crawler/{self.resource_prefix}-{team}-*"],
         )
 
+        glue_table_policy_statement = PolicyStatement(
+            effect=Effect.ALLOW,
+            actions=[
+                "glue:GetTable"
+            ],
+            resources=[
+                f"arn:aws:glue:{Aws.REGION}:{Aws.ACCOUNT_ID}:catalog",
+                f"arn:aws:glue:{Aws.REGION}:{Aws.ACCOUNT_ID}:database/*",
+                f"arn:aws:glue:{Aws.REGION}:{Aws.ACCOUNT_ID}:table/*/*"
+            ],
+        )
+
         glue_job_run_policy_statement = PolicyStatement(
             effect=Effect.ALLOW,
             actions=[
@@ -363,6 +406,8 @@ class SDLFHeavyTransform(Construct):
                 "dynamodb:GetItem",
                 "dynamodb:PutItem",
                 "dynamodb:UpdateItem",
+                "dynamodb:DeleteItem",
+                "dynamodb:BatchWriteItem",
             ],
             resources=[
                 f"arn:aws:dynamodb:{Aws.REGION}:{Aws.ACCOUNT_ID}:table/octagon-*",
@@ -377,7 +422,8 @@ class SDLFHeavyTransform(Construct):
                 "ssm:GetParameters",
                 "ssm:GetParametersByPath",
             ],
-            resources=[f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}/*"],
+            resources=[f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}",
+                       f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}/*"],
         )
 
         sqs_policy_statement = PolicyStatement(
@@ -412,7 +458,7 @@ class SDLFHeavyTransform(Construct):
             "sdlf-heavy-transform-lambdas-policy",
             statements=[
                 sm_b_policy_statement, kms_policy_statement, glue_crawler_policy_statement,
-                glue_job_run_policy_statement, s3_stage_bucket_policy_statement,
+                glue_table_policy_statement, glue_job_run_policy_statement, s3_stage_bucket_policy_statement,
                 s3_pre_and_post_stage_bucket_policy_statement, dynamodb_policy_statement,
                 ssm_policy_statement, sqs_policy_statement, cloudwatch_policy_statement
             ]
@@ -452,39 +498,29 @@ class SDLFHeavyTransform(Construct):
                             "States": {
                                 "Process Data": {
                                     "Type": "Task",
-                                    "Resource": self._process_lambda.function_arn,
+                                    # The execution waits for the job state change event once the
+                                    # job is started, instead of polling the job status
+                                    "Resource": "arn:aws:states:::lambda:invoke.waitForTaskToken",
+                                    "Parameters": {
+                                        "FunctionName": self._process_lambda.function_arn,
+                                        "Payload": {
+                                            "body.$": "$.body",
+                                            "taskToken.$": "$$.Task.Token"
+                                        }
+                                    },
                                     "Comment": "Process Data",
                                     "ResultPath": "$.body.job",
-                                    "Next": "Wait"
-                                },
-                                "Wait": {
-                                    "Type": "Wait",
-                                    "Seconds": 15,
-                                    "Next": "Get Job status"
-                                },
-                                "Get Job status": {
-                                    "Type": "Task",
-                                    "Resource": self._check_job_lambda.function_arn,
-                                    "ResultPath": "$.body.job",
-                                    "Next": "Did Job finish?"
-                                },
-                                "Did Job finish?": {
-                                    "Type": "Choice",
-                                    "Choices": [{
-                                        "Variable": "$.body.job.jobDetails.jobStatus",
-                                        "StringEquals": "SUCCEEDED",
-                                        "Next": "Post-update Comprehensive Catalogue"  # NOSONAR
-                                    }, {
-                                        "Variable": "$.body.job.jobDetails.jobStatus",
-                                        "StringEquals": "FAILED",
-                                        "Next": "Job Failed"  # NOSONAR
+                                    # Past the default Glue job timeout of 48 hours
+                                    "TimeoutSeconds": 49 * 60 * 60,
+                                    # Batches are started per table, they wait for a slot when the
+                                    # job runs its maximum number of concurrent runs
+                                    "Retry": [{
+                                        "ErrorEquals": ["ConcurrentRunsExceededException"],
+                                        "IntervalSeconds": 60,
+                                        "MaxAttempts": 10,
+                                        "BackoffRate": 1.5
                                     }],
-                                    "Default": "Wait"
-                                },
-                                "Job Failed": {
-                                    "Type": "Fail",
-                                    "Error": "Job Failed",
-                                    "Cause": "Job failed, please check the logs"
+                                    "Next": "Post-update Comprehensive Catalogue"  # NOSONAR
                                 },
                                 "Post-update Comprehensive Catalogue": {
                                     "Type": "Task",
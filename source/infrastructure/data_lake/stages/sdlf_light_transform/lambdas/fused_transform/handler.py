@@ -0,0 +1,113 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import os
+from aws_lambda_powertools import Logger
+from datalake_library.configuration import DynamoConfiguration, StateMachineConfiguration
+from datalake_library.interfaces import DynamoInterface, StatesInterface
+from datalake_library import light_transform_steps, octagon
+from cloudwatch_metrics import metrics
+
+logger = Logger(service="SDLF pipeline stage A", level="INFO", utc=True)
+
+stage_bucket = os.environ['stage_bucket']
+resource_prefix = os.environ["RESOURCE_PREFIX"]
+METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+
+
+def get_octagon_client(octagon_clients, env):
+    if env not in octagon_clients:
+        logger.info('Initializing Octagon client')
+        octagon_clients[env] = (
+            octagon.OctagonClient()
+            .with_run_lambda(True)
+            .with_configuration_instance(env, resource_prefix)
+            .build()
+        )
+    return octagon_clients[env]
+
+
+def start_error_executions(failed_records):
+    """Hands the failed objects over to the stage state machine
+
+    Arguments:
+        failed_records {list} -- SQS records which could not be processed in place
+
+    Returns:
+        {list} -- Message ids of the records that could not be handed over
+    """
+    executions = {}
+    for record in failed_records:
+        event_body = json.loads(record['body'])
+        execution_key = (event_body['team'], event_body['pipeline'], event_body['pipeline_stage'])
+        executions.setdefault(execution_key, []).append(record)
+
+    unhandled_message_ids = []
+    states_interface = StatesInterface()
+    for (team, pipeline, pipeline_stage), records in executions.items():
+        try:
+            state_config = StateMachineConfiguration(resource_prefix, team, pipeline, pipeline_stage)
+            states_interface.run_state_machine(
+                state_config.get_stage_state_machine_arn, {'objects': [record['body'] for record in records]})
+        except Exception:
+            logger.error("Unable to start State Machine Execution", exc_info=True)
+            unhandled_message_ids.extend(record['messageId'] for record in records)
+    return unhandled_message_ids
+
+
+def lambda_handler(event, _):
+    """Runs the pre-update, light transform and post-update steps in a single invocation
+
+    Arguments:
+        event {dict} -- Dictionary with the SQS records to process
+        _ {dict} -- Dictionary with details on Lambda context
+
+    Returns:
+        {dict} -- Dictionary with the records to be retried by SQS
+    """
+    metrics.Metrics(METRICS_NAMESPACE, resource_prefix, logger).put_metrics_count_value_1(
+        metric_name="SdlfLightTransformFused")
+
+    logger.info('Received {} messages'.format(len(event['Records'])))
+    octagon_clients = {}
+    dynamo_interface = DynamoInterface(DynamoConfiguration(resource_prefix))
+    failed_records = []
+    for record in event['Records']:
+        octagon_client = None
+        stage = ''
+        component = 'Preupdate'
+        try:
+            record_body = json.loads(record['body'])
+            stage = record_body['pipeline_stage']
+            octagon_client = get_octagon_client(octagon_clients, record_body['env'])
+            object_metadata = light_transform_steps.preupdate_metadata(
+                octagon_client, dynamo_interface, record['body'], component)
+            component = 'Process'
+            processed_keys = light_transform_steps.process_object(
+                octagon_client, resource_prefix, object_metadata, component)
+            component = 'Postupdate'
+            light_transform_steps.postupdate_metadata(
+                octagon_client, dynamo_interface, resource_prefix, stage_bucket, object_metadata, processed_keys,
+                component)
+        except Exception as e:
+            logger.error("Fatal error", exc_info=True)
+            if octagon_client is not None and octagon_client.is_pipeline_set():
+                try:
+                    octagon_client.end_pipeline_execution_failed(
+                        component=component,
+                        issue_comment="{} {} Error: {}".format(stage, component, repr(e)))
+                except Exception:
+                    logger.error("Unable to close Pipeline Execution", exc_info=True)
+            failed_records.append(record)
+        finally:
+            if octagon_client is not None:
+                octagon_client.reset_pipeline_execution()
+
+    if failed_records:
+        logger.info('Sending {} failed objects to the State Machine'.format(len(failed_records)))
+    return {
+        'batchItemFailures': [
+            {'itemIdentifier': message_id} for message_id in start_error_executions(failed_records)
+        ]
+    }
@@ -2,10 +2,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from aws_lambda_powertools import Logger
-from datalake_library.configuration import DynamoConfiguration, SQSConfiguration
-from datalake_library.interfaces import DynamoInterface, SQSInterface, S3Interface
-from datalake_library import octagon
-from datalake_library.octagon import peh
+from datalake_library.configuration import DynamoConfiguration
+from datalake_library.interfaces import DynamoInterface
+from datalake_library import light_transform_steps, octagon
 import os
 from cloudwatch_metrics import metrics
 
@@ -57,42 +56,16 @@ def lambda_handler(event, context):
         raise e
 
     try:
-        peh.PipelineExecutionHistoryAPI(
-            octagon_client).retrieve_pipeline_execution(peh_id)
+        octagon_client.set_pipeline_execution(
+            peh_id, '{}-{}-stage-{}'.format(team, pipeline, stage[-1].lower()),
+            event['body'].get('peh_start_timestamp'))
 
         logger.info('Initializing DynamoDB config and Interface')
         dynamo_config = DynamoConfiguration(resource_prefix)
         dynamo_interface = DynamoInterface(dynamo_config)
 
-        logger.info('Storing metadata to DynamoDB')
-        bucket = stage_bucket
-        for key in processed_keys:
-            object_metadata = {
-                'bucket': bucket,
-                'key': key,
-                'size': S3Interface().get_size(bucket, key),
-                'last_modified_date': S3Interface().get_last_modified(bucket, key),
-                'env': event['body']['env'],
-                'team': team,
-                'pipeline': pipeline,
-                'dataset': dataset,
-                'stage': 'stage',
-                'pipeline_stage': stage,
-                'peh_id': peh_id
-            }
-
-            dynamo_interface.update_object_metadata_catalog(object_metadata)
-
-        logger.info('Sending messages to next SQS queue if it exists')
-        sqs_config = SQSConfiguration(resource_prefix, team, dataset, ''.join(
-            [stage[:-1], chr(ord(stage[-1]) + 1)]))
-        sqs_interface = SQSInterface(sqs_config.get_stage_queue_name)
-        sqs_interface.send_batch_messages_to_fifo_queue(
-            processed_keys, 10, '{}-{}'.format(team, dataset))
-
-        octagon_client.update_pipeline_execution(status="{} {} Processing".format(stage, component),
-                                                 component=component)
-        octagon_client.end_pipeline_execution_success()
+        light_transform_steps.postupdate_metadata(
+            octagon_client, dynamo_interface, resource_prefix, stage_bucket, event['body'], processed_keys, component)
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         octagon_client.end_pipeline_execution_failed(component=component,
@@ -6,7 +6,7 @@ import os
 from aws_lambda_powertools import Logger
 from datalake_library.configuration import DynamoConfiguration
 from datalake_library.interfaces import DynamoInterface
-from datalake_library import octagon
+from datalake_library import light_transform_steps, octagon
 from cloudwatch_metrics import metrics
 
 logger = Logger(service="SDLF pipeline stage A", level="INFO", utc=True)
@@ -52,25 +52,13 @@ def lambda_handler(event, context):
         raise e
 
     try:
-        object_metadata['peh_id'] = octagon_client.start_pipeline_execution(
-            pipeline_name='{}-{}-stage-{}'.format(object_metadata['team'],
-                                                  object_metadata['pipeline'],
-                                                  stage[-1].lower()),
-            comment=event
-        )
-        # Add business metadata (e.g. object_metadata['project'] = 'xyz')
-
         logger.info('Initializing DynamoDB config and Interface')
         dynamo_config = DynamoConfiguration(resource_prefix)
         dynamo_interface = DynamoInterface(dynamo_config)
 
-        logger.info('Storing metadata to DynamoDB')
-        dynamo_interface.update_object_metadata_catalog(object_metadata)
-
+        object_metadata = light_transform_steps.preupdate_metadata(octagon_client, dynamo_interface, event, component)
         logger.info(
             'Passing arguments to the next function of the state machine')
-        octagon_client.update_pipeline_execution(
-            status="{} {} Processing".format(stage, component), component=component)
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         octagon_client.end_pipeline_execution_failed(component=component,
@@ -2,9 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 import os
 from aws_lambda_powertools import Logger
-from datalake_library.transforms import TransformHandler
-from datalake_library import octagon
-from datalake_library.octagon import peh
+from datalake_library import light_transform_steps, octagon
 from cloudwatch_metrics import metrics
 
 logger = Logger(service="SDLF pipeline stage A", level="INFO", utc=True)
@@ -31,6 +29,7 @@ def lambda_handler(event, context):
         bucket = event['body']['bucket']
         key = event['body']['key']
         team = event['body']['team']
+        pipeline = event['body']['pipeline']
         stage = event['body']['pipeline_stage']
         dataset = event['body']['dataset']
 
@@ -53,17 +52,13 @@ def lambda_handler(event, context):
         raise e
 
     try:
-        peh.PipelineExecutionHistoryAPI(
-            octagon_client).retrieve_pipeline_execution(event['body']['peh_id'])
+        octagon_client.set_pipeline_execution(
+            event['body']['peh_id'], '{}-{}-stage-{}'.format(team, pipeline, stage[-1].lower()),
+            event['body'].get('peh_start_timestamp'))
 
         # Call custom transform created by user and process the file
-        logger.info('Calling user custom processing code')
-        transform_handler = TransformHandler().stage_transform(resource_prefix, team, dataset, stage)
-        response = transform_handler().transform_object(
-            resource_prefix, bucket, key, team, dataset)  # custom user code called
-        # remove_content_tmp()
-        octagon_client.update_pipeline_execution(status="{} {} Processing".format(stage, component),
-                                                 component=component)
+        response = light_transform_steps.process_object(
+            octagon_client, resource_prefix, event['body'], component)  # custom user code called
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         octagon_client.end_pipeline_execution_failed(component=component,
@@ -6,6 +6,7 @@ import os
 from aws_lambda_powertools import Logger
 from datalake_library.configuration import SQSConfiguration
 from datalake_library.interfaces import SQSInterface
+from datalake_library.redrive import DLQRedrive
 from cloudwatch_metrics import metrics
 
 logger = Logger(service="SDLF pipeline stage A", level="INFO", utc=True)
@@ -17,24 +18,34 @@ stage = os.environ['STAGE']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
 
 
-def lambda_handler(event, _):  # NOSONAR
+def lambda_handler(event, context):  # NOSONAR
+    """Moves the messages of the stage DLQ back to the stage queue
+
+    Arguments:
+        event {dict} -- Optional rate and max_in_flight overriding the configured redrive limits
+        context {dict} -- Dictionary with details on Lambda context
+    """
     metrics.Metrics(METRICS_NAMESPACE, resource_prefix, logger).put_metrics_count_value_1(
         metric_name="SdlfLightTransformRedrive")
     try:
+        event = event or {}
         sqs_config = SQSConfiguration(resource_prefix, team, pipeline, stage)
         dlq_interface = SQSInterface(sqs_config.get_stage_dlq_name)
-        messages = dlq_interface.receive_messages(1)
-        if not messages:
+        queue_interface = SQSInterface(sqs_config.get_stage_queue_name)
+
+        # The stage queue depth is the load the redrive adds to the stage
+        response = DLQRedrive(
+            dlq_interface,
+            lambda messages: queue_interface.send_message_batch_to_fifo_queue(messages, 'redrive'),
+            rate=event.get('rate'),
+            max_in_flight=event.get('max_in_flight'),
+            in_flight=queue_interface.get_in_flight_count
+        ).run(context)
+        if not response['redriven'] and not response['failed']:
             logger.info('No messages found in {}'.format(
                 sqs_config.get_stage_dlq_name))
             return
-
-        logger.info('Received {} messages'.format(len(messages)))
-        queue_interface = SQSInterface(sqs_config.get_stage_queue_name)
-        for message in messages:
-            queue_interface.send_message_to_fifo_queue(message.body, 'redrive')
-            message.delete()
-            logger.info('Delete message succeeded')
+        return response
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         raise e
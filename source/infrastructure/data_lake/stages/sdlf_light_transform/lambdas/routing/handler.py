@@ -12,23 +12,34 @@ logger = Logger(service="SDLF pipeline stage A", level="INFO", utc=True)
 resource_prefix = os.environ["RESOURCE_PREFIX"]
 STACK_NAME = os.environ['STACK_NAME']
 METRICS_NAMESPACE = os.environ['METRICS_NAMESPACE']
+# When enabled, all records of a batch targeting the same state machine
+# are processed by a single execution that fans out with a Map state
+BATCH_EXECUTIONS = os.environ.get('BATCH_EXECUTIONS', 'false').lower() == 'true'
 
 
 def lambda_handler(event, _):
     try:
         logger.info('Received {} messages'.format(len(event['Records'])))
+        executions = {}
         for record in event['Records']:
-            logger.info('Starting State Machine Execution')
             event_body = json.loads(record['body'])
-            state_config = StateMachineConfiguration(
-                resource_prefix,
-                event_body['team'],
-                event_body['pipeline'],
-                event_body['pipeline_stage'])
-            StatesInterface().run_state_machine(
-                state_config.get_stage_state_machine_arn, record['body'])
-            # Record anonymized metric
-            metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfLightTransformSM")
+            execution_key = (event_body['team'], event_body['pipeline'], event_body['pipeline_stage'])
+            executions.setdefault(execution_key, []).append(record['body'])
+
+        states_interface = StatesInterface()
+        for (team, pipeline, pipeline_stage), bodies in executions.items():
+            state_config = StateMachineConfiguration(resource_prefix, team, pipeline, pipeline_stage)
+            state_machine_arn = state_config.get_stage_state_machine_arn
+            if BATCH_EXECUTIONS:
+                logger.info('Starting State Machine Execution for {} objects'.format(len(bodies)))
+                inputs = [{'objects': bodies}]
+            else:
+                inputs = bodies
+            for execution_input in inputs:
+                logger.info('Starting State Machine Execution')
+                states_interface.run_state_machine(state_machine_arn, execution_input)
+                # Record anonymized metric
+                metrics.Metrics(METRICS_NAMESPACE, STACK_NAME, logger).put_metrics_count_value_1(metric_name="SdlfLightTransformSM")
     except Exception as e:
         logger.error("Fatal error", exc_info=True)
         raise e
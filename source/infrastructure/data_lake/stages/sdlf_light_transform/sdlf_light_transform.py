@@ -54,6 +54,8 @@ class SDLFLightTransform(Construct):
         self._foundations_resources = foundations_resources
         self.team = config.team
         self.pipeline = config.pipeline
+        # Process objects in a single Lambda invocation and only use the state machine on failures
+        self._fused_execution = str(self.node.try_get_context("LIGHT_TRANSFORM_FUSED_EXECUTION")).lower() == "true"
 
         RegisterConstruct(self, self._props["id"], props=self._props,
                           register_lambda=self._foundations_resources.register_function)
@@ -118,7 +120,7 @@ class SDLFLightTransform(Construct):
             queue_name=f'{self.resource_prefix}-{team}-{pipeline}-queue-a.fifo',
             fifo=True,
             content_based_deduplication=True,
-            visibility_timeout=Duration.seconds(60),
+            visibility_timeout=Duration.minutes(15) if self._fused_execution else Duration.seconds(60),
             encryption=QueueEncryption.KMS,
             encryption_master_key=sqs_key,
             dead_letter_queue=self._routing_dlq,
@@ -133,12 +135,21 @@ class SDLFLightTransform(Construct):
         )
 
     def _create_routing_a_event_source_mapping(self):
-        self._routing_lambda.add_event_source(
-            SqsEventSource(
-                self._routing_queue,
-                batch_size=10,
+        if self._fused_execution:
+            self._fused_lambda.add_event_source(
+                SqsEventSource(
+                    self._routing_queue,
+                    batch_size=10,
+                    report_batch_item_failures=True,
+                )
+            )
+        else:
+            self._routing_lambda.add_event_source(
+                SqsEventSource(
+                    self._routing_queue,
+                    batch_size=10,
+                )
             )
-        )
 
     def _create_lambdas(self, team, pipeline, scope) -> None:
         lambda_handler = "handler.lambda_handler"
@@ -154,7 +165,8 @@ class SDLFLightTransform(Construct):
                 "SOLUTION_VERSION": self.node.try_get_context("SOLUTION_VERSION"),
                 "RESOURCE_PREFIX": self.resource_prefix,
                 "METRICS_NAMESPACE": self.node.try_get_context("METRICS_NAMESPACE"),
-                "STACK_NAME": Aws.STACK_NAME
+                "STACK_NAME": Aws.STACK_NAME,
+                "BATCH_EXECUTIONS": "true"
             },
             description="Triggers Data Lake StageA step function",
             timeout=Duration.minutes(1),
@@ -200,7 +212,7 @@ class SDLFLightTransform(Construct):
                 "RESOURCE_PREFIX": self.resource_prefix
             },
             description="Redrive Data Lake StageA Step Function",
-            timeout=Duration.minutes(1),
+            timeout=Duration.minutes(15),
             memory_size=256,
             architecture=lambda_.Architecture.ARM_64,
             runtime=Runtime.PYTHON_3_11,
@@ -329,12 +341,68 @@ class SDLFLightTransform(Construct):
         self.lambda_functions = [self._routing_lambda, self._postupdate_lambda, self._preupdate_lambda,
                             self._process_lambda, self._error_lambda, self._redrive_lambda]
 
+        if self._fused_execution:
+            self._create_fused_lambda(team, pipeline)
+            self.lambda_functions.append(self._fused_lambda)
+
+        # Configuration parameters are loaded once per container with GetParametersByPath
+        for lambda_function in self.lambda_functions:
+            lambda_function.add_environment("SSM_PARAMETERS_PREFETCH", "true")
+
+        # Output format of the light transform, ndjson lets the stage b Glue jobs split large reports
+        reports_output_format = self.node.try_get_context("REPORTS_LIGHT_TRANSFORM_OUTPUT_FORMAT")
+        if reports_output_format:
+            for lambda_function in [self._process_lambda] + ([self._fused_lambda] if self._fused_execution else []):
+                lambda_function.add_environment("REPORTS_LIGHT_TRANSFORM_OUTPUT_FORMAT", str(reports_output_format))
+
+        # Redrive limits: messages redriven per second and messages waiting in the stage queue
+        self._redrive_lambda.add_environment(
+            "REDRIVE_RATE", str(self.node.try_get_context("DATA_LAKE_REDRIVE_RATE") or 10))
+        self._redrive_lambda.add_environment(
+            "REDRIVE_MAX_IN_FLIGHT", str(self.node.try_get_context("DATA_LAKE_REDRIVE_MAX_IN_FLIGHT_A") or 0))
+
         self._add_layers(self.lambda_functions)
         self._create_and_attach_policy_to_lambda_roles(team, pipeline, self.lambda_functions)
         self._add_dependencies(self.lambda_functions)
 
+    def _create_fused_lambda(self, team, pipeline) -> None:
+        self._fused_lambda = lambda_.Function(
+            self,
+            "fused-a",
+            function_name=f"{self.resource_prefix}-{team}-{pipeline}-fused-a",
+            code=Code.from_asset(
+                os.path.join(f"{Path(__file__).parent}", "lambdas/fused_transform")),
+            handler="handler.lambda_handler",
+            environment={
+                "stage_bucket": self._foundations_resources.stage_bucket.bucket_name,
+                "SOLUTION_ID": self.node.try_get_context("SOLUTION_ID"),
+                "SOLUTION_VERSION": self.node.try_get_context("SOLUTION_VERSION"),
+                "METRICS_NAMESPACE": self.node.try_get_context("METRICS_NAMESPACE"),
+                "RESOURCE_PREFIX": self.resource_prefix
+            },
+            description="Executes pre-update, light transform and post-update in Data Lake StageA",
+            timeout=Duration.minutes(15),
+            memory_size=1536,
+            runtime=Runtime.PYTHON_3_11,
+            architecture=lambda_.Architecture.ARM_64,
+        )
+
+        SolutionsLambdaFunctionAlarm(
+            self,
+            id="fused-a-lambda-alarm",
+            alarm_name=f"{self.resource_prefix}-{team}-{pipeline}-fused-a-lambda-alarm",
+            lambda_function=self._fused_lambda
+        )
+
+        self._foundations_resources.raw_bucket_key.grant_decrypt(self._fused_lambda)
+        self._foundations_resources.raw_bucket.grant_read(self._fused_lambda)
+        self._foundations_resources.stage_bucket_key.grant_encrypt(self._fused_lambda)
+        self._foundations_resources.stage_bucket.grant_write(self._fused_lambda)
+
     def _add_layers(self, lambda_functions):
         self._process_lambda.add_layers(self._foundations_resources.wrangler_layer)
+        if self._fused_execution:
+            self._fused_lambda.add_layers(self._foundations_resources.wrangler_layer)
 
         metrics_layer = LayerVersion(
             self,
@@ -358,6 +426,8 @@ class SDLFLightTransform(Construct):
 
     def _add_dependencies(self, lambda_functions):
         self._process_lambda.node.add_dependency(self._foundations_resources.wrangler_layer)
+        if self._fused_execution:
+            self._fused_lambda.node.add_dependency(self._foundations_resources.wrangler_layer)
 
         for lambda_function in lambda_functions:
             lambda_function.node.add_dependency(self._foundations_resources.powertools_layer)
@@ -441,6 +511,7 @@ class SDLFLightTransform(Construct):
                 "dynamodb:GetItem",
                 "dynamodb:PutItem",
                 "dynamodb:UpdateItem",
+                "dynamodb:BatchWriteItem",
             ],
             resources=[
                 f"arn:aws:dynamodb:{Aws.REGION}:{Aws.ACCOUNT_ID}:table/octagon-*",
@@ -455,7 +526,8 @@ class SDLFLightTransform(Construct):
                 "ssm:GetParameters",
                 "ssm:GetParametersByPath",
             ],
-            resources=[f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}/*"],
+            resources=[f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}",
+                       f"arn:aws:ssm:{Aws.REGION}:{Aws.ACCOUNT_ID}:parameter/{self.resource_prefix}/*"],
         )
 
         sqs_policy_statement = PolicyStatement(
@@ -501,44 +573,88 @@ class SDLFLightTransform(Construct):
         )
 
         process_lambda_s3_policy.attach_to_role(self._process_lambda.role)
+        if self._fused_execution:
+            process_lambda_s3_policy.attach_to_role(self._fused_lambda.role)
         for lambda_function in lambda_functions:
             lambda_policy.attach_to_role(lambda_function.role)
             cloudwatch_metrics_policy.attach_to_role(lambda_function.role)
 
+    def _light_transform_branch(self) -> Dict[str, Any]:
+        return {
+            "StartAt": "Pre-update Comprehensive Catalogue",  # NOSONAR
+            "States": {
+                "Pre-update Comprehensive Catalogue": {
+                    "Type": "Task",
+                    "Resource": self._preupdate_lambda.function_arn,
+                    "Comment": "Pre-update Comprehensive Catalogue",
+                    "Next": "Execute Light Transformation"  # NOSONAR
+                },
+                "Execute Light Transformation": {
+                    "Type": "Task",
+                    "Resource": self._process_lambda.function_arn,
+                    "Comment": "Execute Light Transformation",
+                    "ResultPath": "$.body.processedKeys",
+                    "Next": "Post-update comprehensive Catalogue"  # NOSONAR
+                },
+                "Post-update comprehensive Catalogue": {
+                    "Type": "Task",
+                    "Resource": self._postupdate_lambda.function_arn,
+                    "Comment": "Post-update comprehensive Catalogue",
+                    "ResultPath": "$.statusCode",
+                    "End": True
+                }
+            }
+        }
+
     def _create_state_machine(self) -> None:
         definition = {
             "Comment": "Simple pseudo flow",
-            "StartAt": "Try",
+            "StartAt": "Is Batch",
             "States": {
-                "Try": {
-                    "Type": "Parallel",
-                    "Branches": [
+                "Is Batch": {
+                    "Type": "Choice",
+                    "Choices": [
                         {
-                            "StartAt": "Pre-update Comprehensive Catalogue",  # NOSONAR
-                            "States": {
-                                "Pre-update Comprehensive Catalogue": {
-                                    "Type": "Task",
-                                    "Resource": self._preupdate_lambda.function_arn,
-                                    "Comment": "Pre-update Comprehensive Catalogue",
-                                    "Next": "Execute Light Transformation"  # NOSONAR
-                                },
-                                "Execute Light Transformation": {
-                                    "Type": "Task",
-                                    "Resource": self._process_lambda.function_arn,
-                                    "Comment": "Execute Light Transformation",
-                                    "ResultPath": "$.body.processedKeys",
-                                    "Next": "Post-update comprehensive Catalogue"  # NOSONAR
-                                },
-                                "Post-update comprehensive Catalogue": {
-                                    "Type": "Task",
-                                    "Resource": self._postupdate_lambda.function_arn,
-                                    "Comment": "Post-update comprehensive Catalogue",
-                                    "ResultPath": "$.statusCode",
-                                    "End": True
-                                }
-                            }
+                            "Variable": "$.objects",
+                            "IsPresent": True,
+                            "Next": "Process Objects"
                         }
                     ],
+                    "Default": "Try"
+                },
+                "Process Objects": {
+                    "Type": "Map",
+                    "ItemsPath": "$.objects",
+                    "MaxConcurrency": 10,
+                    "Iterator": {
+                        "StartAt": "Try Object",
+                        "States": {
+                            "Try Object": {
+                                "Type": "Parallel",
+                                "Branches": [self._light_transform_branch()],
+                                "Catch": [
+                                    {
+                                        "ErrorEquals": ["States.ALL"],
+                                        "ResultPath": None,
+                                        "Next": "Object Error"
+                                    }
+                                ],
+                                "End": True
+                            },
+                            "Object Error": {
+                                "Type": "Task",
+                                "Resource": self._error_lambda.function_arn,
+                                "Comment": "Send Original Payload to DLQ",
+                                "End": True
+                            }
+                        }
+                    },
+                    "ResultPath": None,
+                    "Next": "Done"
+                },
+                "Try": {
+                    "Type": "Parallel",
+                    "Branches": [self._light_transform_branch()],
                     "Catch": [
                         {
                             "ErrorEquals": ["States.ALL"],
@@ -240,6 +240,20 @@ def test_lambda_function_roles(template):
         })
     assert len(found) == STOCK_BASIC_EXECUTION_ROLE_COUNT
     
+def test_stage_lambdas_policies(template):
+    """
+    The stage lambdas write the object metadata catalog in batches
+    """
+    policies = template.find_resources("AWS::IAM::Policy")
+    for policy_prefix in ["sdlflighttransformlambdaspolicy", "sdlfheavytransformlambdaspolicy"]:
+        stage_policies = [policy for logical_id, policy in policies.items() if policy_prefix in logical_id]
+        assert stage_policies
+        for policy in stage_policies:
+            dynamodb_actions = [statement["Action"] for statement in policy["Properties"]["PolicyDocument"]["Statement"]
+                                if "dynamodb:UpdateItem" in statement["Action"]]
+            assert dynamodb_actions and all("dynamodb:BatchWriteItem" in actions for actions in dynamodb_actions)
+
+
 # security-focused test cases
 def test_security_options(template):
     from ..amc_insights_tests.security import s3_buckets, sagemaker, wfm_secret, kms_encryption
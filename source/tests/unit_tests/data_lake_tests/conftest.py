@@ -0,0 +1,25 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clear_datalake_library_caches():
+    """Process-wide caches must not leak mocked values between tests."""
+    from datalake_library import configuration
+    from datalake_library.octagon import OctagonClient
+    from datalake_library.transforms import TransformHandler
+    from data_lake.lambda_layers.data_lake_library.python.datalake_library import configuration as layer_configuration
+    from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon import \
+        OctagonClient as LayerOctagonClient
+    from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms import \
+        TransformHandler as LayerTransformHandler
+
+    for module in (configuration, layer_configuration):
+        module.clear_ssm_parameters_cache()
+    for transform_handler in (TransformHandler, LayerTransformHandler):
+        transform_handler.invalidate()
+    for octagon_client in (OctagonClient, LayerOctagonClient):
+        octagon_client.clear_cache()
+    yield
@@ -1,5 +1,7 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
+import json
+import os
 import boto3
 import pytest
 from unittest.mock import Mock, MagicMock
@@ -9,17 +11,14 @@ from dataclasses import dataclass
 from aws_solutions.core.helpers import get_service_client, _helpers_service_clients, _helpers_service_resources
 
 
+@pytest.fixture(autouse=True)
+def mock_env_variables():
+    os.environ["RESOURCE_PREFIX"] = "prefix"
+
+
 @pytest.fixture()
-def _mock_glue():
-    glue_client = get_service_client('glue')
-    glue_client.get_job_run = Mock(
-        return_value={
-            'JobRun': {
-                'JobRunState': 'RUNNING',
-            }
-        }
-    )
-    return glue_client
+def _mock_states_client():
+    return MagicMock()
 
 
 @pytest.fixture()
@@ -56,12 +55,20 @@ def _dynamodb_resource():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         peh_table = ddb.Table("octagon-PipelineExecutionHistory-dev-prefix")
         peh_table.put_item(
             Item={
                 'id': "d11111-111c-11b1-a11c-11111dg11o111",
-                'active': "false",
+                'active': True,
                 'comment': "comment",
                 "dataset_date": '2023-05-23',
                 "duration_in_seconds": "7.822",
@@ -70,7 +77,7 @@ def _dynamodb_resource():
                 "history": [
                     "{\"M\": {\"status\": {\"S\": \"STARTED\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.369Z\"}}}, {\"M\": {\"component\": {\"S\": \"Preupdate\"}, \"status\": {\"S\": \"StageA Preupdate Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.529Z\"}}}, {\"M\": {\"component\": {\"S\": \"Process\"}, \"status\": {\"S\": \"StageA Process Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.978Z\"}}}, {\"M\": {\"component\": {\"S\": \"Postupdate\"}, \"status\": {\"S\": \"StageA Postupdate Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:52.240Z\"}}}, {\"M\": {\"status\": {\"S\": \"COMPLETED\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:52.320Z\"}}}"],
                 "last_updated_timestamp": "2023-05-23T02:24:52.320Z",
-                "pipeline": "adtech-insights-stage-a",
+                "pipeline": "adtech-insights-stage-b",
                 "start_timestamp": "2023-05-23T02:24:47.369Z",
                 "status": "COMPLETED",
                 "status_last_updated_timestamp": "COMPLETED#2023-05-23T02:24:52.320Z",
@@ -113,6 +120,34 @@ def _dynamodb_resource():
             }
         )
 
+        ddb.create_table(AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+                         TableName="octagon-JobTaskTokens-dev-prefix",
+                         KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                         BillingMode='PAY_PER_REQUEST')
+        ddb.Table("octagon-JobTaskTokens-dev-prefix").put_item(
+            Item={
+                'id': 'jr_a_id',
+                'task_token': 'task-token',
+                'payload': json.dumps({
+                    'job': {
+                        'processedKeysPath': 'post-stage/adtech/datasetA',
+                        'jobDetails': {
+                            'jobName': 'prefix-adtech-datasetA-glue-job',
+                            'jobRunId': 'jr_a_id',
+                            'jobStatus': 'STARTED',
+                            'tables': ['filename']
+                        },
+                        'peh_id': 'd11111-111c-11b1-a11c-11111dg11o111'
+                    },
+                    'env': 'dev',
+                    'team': 'adtech',
+                    'pipeline': 'insights',
+                    'pipeline_stage': 'StageB'
+                }),
+                'ttl': 1695176682
+            }
+        )
+
         yield ddb
 
 
@@ -123,6 +158,12 @@ def side_effect(*args, **kwargs):
                 'Value': 'octagon-ObjectMetadata-dev-prefix',
             }
         }
+    if kwargs["Name"].endswith('JobTaskTokens'):
+        return {
+            'Parameter': {
+                'Value': 'octagon-JobTaskTokens-dev-prefix',
+            }
+        }
     if kwargs["Name"].endswith('Datasets'):
         return {
             'Parameter': {
@@ -142,11 +183,11 @@ def _mock_ssm_client():
 
 
 @pytest.fixture()
-def _mock_clients(monkeypatch, _mock_sts_client, _dynamodb_resource, _mock_ssm_client, _mock_glue):
+def _mock_clients(monkeypatch, _mock_sts_client, _dynamodb_resource, _mock_ssm_client, _mock_states_client):
     monkeypatch.setitem(_helpers_service_clients, 'sts', _mock_sts_client)
     monkeypatch.setitem(_helpers_service_resources, 'dynamodb', _dynamodb_resource)
     monkeypatch.setitem(_helpers_service_clients, 'ssm', _mock_ssm_client)
-    monkeypatch.setitem(_helpers_service_clients, 'glue', _mock_glue)
+    monkeypatch.setitem(_helpers_service_clients, 'stepfunctions', _mock_states_client)
 
 
 @pytest.fixture()
@@ -164,40 +205,37 @@ def lambda_context():
     return LambdaContext()
 
 
-@pytest.mark.parametrize(
-    "lambda_event",
-    [
-        {
-            "body": {
-                "bucket": "stage_bucket",
-                "team": "adtech",
-                "pipeline": "insights",
-                "pipeline_stage": "StageB",
-                "dataset": "datasetA",
-                "env": "dev",
-                "job": {
-                    "processedKeysPath": "post-stage/adtech/datasetA",
-                    "jobDetails": {
-                        "jobName": "prefix-adtech-datasetA-glue-job",
-                        "jobRunId": "jr_a_id",
-                        "jobStatus": "SUCCEEDED",
-                        "tables": [
-                            "filename"
-                        ]
-                    },
-                    "peh_id": "d11111-111c-11b1-a11c-11111dg11o111"
-                }
-            }
+def _job_state_change_event(state, job_run_id='jr_a_id'):
+    return {
+        "source": "aws.glue",
+        "detail-type": "Glue Job State Change",
+        "detail": {
+            "jobName": "prefix-adtech-datasetA-glue-job",
+            "severity": "INFO" if state == 'SUCCEEDED' else "ERROR",
+            "state": state,
+            "jobRunId": job_run_id,
+            "message": "Job run {}".format(state.lower())
         }
-    ],
-)
-def test_handler(lambda_event, lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
-    from data_lake.stages.sdlf_heavy_transform.lambdas.check_job.handler import lambda_handler, \
+    }
+
+
+def test_handler(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.job_state_change.handler import lambda_handler, \
         logger as lambda_function_logger
     lambda_function_logger.propagate = True
 
-    lambda_handler(lambda_event, lambda_context)
-    peh_table = _helpers_service_resources["dynamodb"].Table("octagon-PipelineExecutionHistory-dev-prefix")
+    lambda_handler(_job_state_change_event('SUCCEEDED'), lambda_context)
+
+    states_client = _helpers_service_clients["stepfunctions"]
+    states_client.send_task_success.assert_called_once()
+    assert states_client.send_task_success.call_args.kwargs['taskToken'] == 'task-token'
+    output = json.loads(states_client.send_task_success.call_args.kwargs['output'])
+    assert output['jobDetails']['jobStatus'] == 'SUCCEEDED'
+    assert output['peh_id'] == 'd11111-111c-11b1-a11c-11111dg11o111'
+    states_client.send_task_failure.assert_not_called()
+
+    assert 'Item' not in _dynamodb_resource.Table("octagon-JobTaskTokens-dev-prefix").get_item(Key={'id': 'jr_a_id'})
+    peh_table = _dynamodb_resource.Table("octagon-PipelineExecutionHistory-dev-prefix")
     res = peh_table.get_item(
         Key={
             'id': 'd11111-111c-11b1-a11c-11111dg11o111'
@@ -205,38 +243,47 @@ def test_handler(lambda_event, lambda_context, _mock_clients, _dynamodb_resource
     )
     assert res['Item']['status'] == 'COMPLETED'
 
-    _helpers_service_clients["ssm"].get_parameter.assert_called()
-    _helpers_service_clients["sts"].get_caller_identity.assert_called()
-
-
-@pytest.mark.parametrize(
-    "lambda_event",
-    [
-        {
-            "body": {
-                "bucket": "raw_bucket",
-                "key": "filename",
-                "timestamp": 1684808687458,
-                "last_modified_date": "2023-05-23T02:24:43Z+00:00",
-                "id": "s3://raw_bucket/filename",
-                "pipeline_stage": "StageA",
-                "peh_id": "d11111-111c-11b1-a11c-11111dg11o111"
-            }
-        }
-    ],
-)
-def test_handler_fail_fetch_event_data(lambda_event, lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
-    from data_lake.stages.sdlf_heavy_transform.lambdas.check_job.handler import lambda_handler, \
+
+def test_handler_job_failed(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.job_state_change.handler import lambda_handler, \
         logger as lambda_function_logger
     lambda_function_logger.propagate = True
 
-    with pytest.raises(KeyError):
-        lambda_handler(lambda_event, lambda_context)
+    lambda_handler(_job_state_change_event('TIMEOUT'), lambda_context)
+
+    states_client = _helpers_service_clients["stepfunctions"]
+    states_client.send_task_failure.assert_called_once_with(
+        taskToken='task-token', error='Job Failed', cause='TIMEOUT Job run timeout')
+    states_client.send_task_success.assert_not_called()
 
-    peh_table = _helpers_service_resources["dynamodb"].Table("octagon-PipelineExecutionHistory-dev-prefix")
+    assert 'Item' not in _dynamodb_resource.Table("octagon-JobTaskTokens-dev-prefix").get_item(Key={'id': 'jr_a_id'})
+    peh_table = _dynamodb_resource.Table("octagon-PipelineExecutionHistory-dev-prefix")
     res = peh_table.get_item(
         Key={
             'id': 'd11111-111c-11b1-a11c-11111dg11o111'
         }
     )
-    assert res['Item']['status'] == 'COMPLETED'
+    assert res['Item']['status'] == 'FAILED'
+
+
+def test_handler_unknown_job_run(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.job_state_change.handler import lambda_handler
+
+    # runs not started by the pipeline are ignored
+    lambda_handler(_job_state_change_event('FAILED', job_run_id='jr_other_id'), lambda_context)
+
+    states_client = _helpers_service_clients["stepfunctions"]
+    states_client.send_task_success.assert_not_called()
+    states_client.send_task_failure.assert_not_called()
+    assert 'Item' in _dynamodb_resource.Table("octagon-JobTaskTokens-dev-prefix").get_item(Key={'id': 'jr_a_id'})
+
+
+def test_handler_fail_fetch_event_data(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.job_state_change.handler import lambda_handler, \
+        logger as lambda_function_logger
+    lambda_function_logger.propagate = True
+
+    with pytest.raises(KeyError):
+        lambda_handler({"detail": {"jobName": "prefix-adtech-datasetA-glue-job"}}, lambda_context)
+
+    _helpers_service_clients["stepfunctions"].send_task_failure.assert_not_called()
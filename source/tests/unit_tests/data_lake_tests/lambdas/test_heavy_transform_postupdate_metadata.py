@@ -4,12 +4,14 @@
 #   * Unit test for data_lake/stages/sdlf_heavy_transform/lambdas/postupdate_metadata/handler.py
 # USAGE:
 #   ./run-unit-tests.sh --test-file-name data_lake_tests/lambdas/test_heavy_transform_postupdate_metadata.py
+import json
 import os
+import sys
 from datetime import datetime
 
 import boto3
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, MagicMock, patch
 from moto import mock_aws
 from dataclasses import dataclass
 from aws_solutions.core.helpers import get_service_client, _helpers_service_clients, _helpers_service_resources
@@ -56,7 +58,7 @@ def _dynamodb_resource():
         pipelines_table = ddb.Table("octagon-Pipelines-dev-prefix")
         pipelines_table.put_item(
             Item={
-                'name': "adtech-insights-stage-a",
+                'name': "adtech-insights-stage-b",
                 'description': "amci1 data lake light transform",
                 'id': "sdlf-stage-a",
                 "last_execution_date": '2023-05-23',
@@ -109,12 +111,20 @@ def _dynamodb_resource():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         peh_table = ddb.Table("octagon-PipelineExecutionHistory-dev-prefix")
         peh_table.put_item(
             Item={
                 'id': "d11111-111c-11b1-a11c-11111dg11o111",
-                'active': "false",
+                'active': True,
                 'comment': "comment",
                 "dataset_date": '2023-05-23',
                 "duration_in_seconds": "7.822",
@@ -123,7 +133,7 @@ def _dynamodb_resource():
                 "history": [
                     "{\"M\": {\"status\": {\"S\": \"STARTED\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.369Z\"}}}, {\"M\": {\"component\": {\"S\": \"Preupdate\"}, \"status\": {\"S\": \"StageA Preupdate Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.529Z\"}}}, {\"M\": {\"component\": {\"S\": \"Process\"}, \"status\": {\"S\": \"StageA Process Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:47.978Z\"}}}, {\"M\": {\"component\": {\"S\": \"Postupdate\"}, \"status\": {\"S\": \"StageA Postupdate Processing\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:52.240Z\"}}}, {\"M\": {\"status\": {\"S\": \"COMPLETED\"}, \"timestamp\": {\"S\": \"2023-05-23T02:24:52.320Z\"}}}"],
                 "last_updated_timestamp": "2023-05-23T02:24:52.320Z",
-                "pipeline": "adtech-insights-stage-a",
+                "pipeline": "adtech-insights-stage-b",
                 "start_timestamp": "2023-05-23T02:24:47.369Z",
                 "status": "FAILED",
                 "status_last_updated_timestamp": "COMPLETED#2023-05-23T02:24:52.320Z",
@@ -246,3 +256,112 @@ def test_handler(lambda_event, lambda_context, _mock_clients, _dynamodb_resource
     )
     assert res['Item']['status'] == 'COMPLETED'
     assert response == 200
+
+    # Catalog entries reuse the listing metadata instead of a head_object per key
+    _helpers_service_clients["s3"].head_object.assert_not_called()
+    metadata_table = _helpers_service_resources["dynamodb"].Table("octagon-ObjectMetadata-dev-prefix")
+    item = metadata_table.get_item(
+        Key={'id': 's3://stage_bucket/post-stage/adtech/datasetA/filename/filename-parquet'})['Item']
+    assert item['size'] == len("pre-stage file content")
+    assert item['peh_id'] == 'd11111-111c-11b1-a11c-11111dg11o111'
+
+
+def test_handler_schema_validation(lambda_context, _mock_clients, _dynamodb_resource, monkeypatch):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.postupdate_metadata import handler
+    sys.modules['awswrangler'] = MagicMock()
+    sys.modules['awswrangler'].catalog.sanitize_table_name = lambda table: table.lower().replace('-', '_')
+    from datalake_library.data_quality import schema_validator
+    validated = []
+
+    def validate(self, prefix, keys, database_name, table_name):
+        if table_name == 'missing':
+            raise self.glue_client.exceptions.EntityNotFoundException(
+                {'Error': {'Code': 'EntityNotFoundException'}}, 'GetTable')
+        validated.append((keys, database_name, table_name))
+        return False
+
+    monkeypatch.setattr(schema_validator.ParquetSchemaValidator, 'validate', validate)
+    monkeypatch.setattr(handler, 'SCHEMA_VALIDATION', True)
+    _helpers_service_clients["ssm"].get_parameter.side_effect = lambda **kwargs: {
+        'Parameter': {'Value': 'prefix_datalake_dev_adtech_datasetA_db'}} \
+        if kwargs['Name'].endswith('StageDataCatalog') else side_effect(**kwargs)
+    _s3_resource = _helpers_service_resources["s3"]
+    _s3_resource.Object('stage_bucket', "post-stage/adtech/datasetA/Other-Table/other-parquet").put(Body="content")
+    _s3_resource.Object('stage_bucket', "post-stage/adtech/datasetA/missing/missing-parquet").put(Body="content")
+    event = {
+        "body": {
+            "bucket": "stage_bucket",
+            "team": "adtech",
+            "pipeline": "insights",
+            "pipeline_stage": "StageB",
+            "dataset": "datasetA",
+            "env": "dev",
+            "job": {
+                "processedKeysPath": "post-stage/adtech/datasetA",
+                "jobDetails": {"jobStatus": "SUCCEEDED", "tables": ["filename", "Other-Table", "missing"]},
+                "peh_id": "d11111-111c-11b1-a11c-11111dg11o111",
+                "peh_start_timestamp": None
+            }
+        }
+    }
+
+    # objects of earlier runs are skipped
+    event['body']['job']['peh_start_timestamp'] = "2999-01-01T00:00:00.000Z"
+    assert handler.lambda_handler(event, lambda_context) == 200
+    assert validated == []
+
+    peh_table = _helpers_service_resources["dynamodb"].Table("octagon-PipelineExecutionHistory-dev-prefix")
+    peh_table.update_item(Key={'id': 'd11111-111c-11b1-a11c-11111dg11o111'},
+                          UpdateExpression='SET #status = :status, active = :active',
+                          ExpressionAttributeNames={'#status': 'status'},
+                          ExpressionAttributeValues={':status': 'STARTED', ':active': True})
+    event['body']['job']['peh_start_timestamp'] = "2000-01-01T00:00:00.000Z"
+    with pytest.raises(ValueError, match='do not match their schema'):
+        handler.lambda_handler(event, lambda_context)
+
+    # only the objects written by the run are validated, table by table, tables not in the catalog are skipped
+    assert validated == [
+        (["s3://stage_bucket/post-stage/adtech/datasetA/filename/filename-parquet"],
+         'prefix_datalake_dev_adtech_datasetA_db', 'filename'),
+        (["s3://stage_bucket/post-stage/adtech/datasetA/Other-Table/other-parquet"],
+         'prefix_datalake_dev_adtech_datasetA_db', 'other_table')
+    ]
+    assert peh_table.get_item(Key={'id': 'd11111-111c-11b1-a11c-11111dg11o111'})['Item']['status'] == 'FAILED'
+
+
+def test_handler_manifest(lambda_context, _mock_clients, _dynamodb_resource, _s3_resource):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.postupdate_metadata.handler import lambda_handler
+    awswrangler = MagicMock()
+    awswrangler.catalog.sanitize_table_name.side_effect = lambda table: table.lower()
+    _s3_resource.Object('stage_bucket', "manifests/adtech/datasetA/batch.json").put(Body=json.dumps({
+        "bucket": "stage_bucket",
+        "entries": [{"key": "pre-stage/adtech/datasetA/FileName/file-1"},
+                    {"key": "pre-stage/adtech/datasetA/FileName/file-2"}]
+    }))
+
+    # the tables of a manifest batch are not carried by the job details
+    with patch.dict(sys.modules, {'awswrangler': awswrangler}):
+        sys.modules.pop('datalake_library.transforms.table_partitions', None)
+        response = lambda_handler({
+            "body": {
+                "bucket": "stage_bucket",
+                "manifestUri": "s3://stage_bucket/manifests/adtech/datasetA/batch.json",
+                "keysCount": 2,
+                "team": "adtech",
+                "pipeline": "insights",
+                "pipeline_stage": "StageB",
+                "dataset": "datasetA",
+                "env": "dev",
+                "job": {
+                    "processedKeysPath": "post-stage/adtech/datasetA",
+                    "jobDetails": {"jobName": "prefix-adtech-datasetA-glue-job", "jobRunId": "jr_a_id",
+                                   "jobStatus": "SUCCEEDED"},
+                    "peh_id": "d11111-111c-11b1-a11c-11111dg11o111"
+                }
+            }
+        }, lambda_context)
+
+    assert response == 200
+    metadata_table = _helpers_service_resources["dynamodb"].Table("octagon-ObjectMetadata-dev-prefix")
+    assert 'Item' in metadata_table.get_item(
+        Key={'id': 's3://stage_bucket/post-stage/adtech/datasetA/filename/filename-parquet'})
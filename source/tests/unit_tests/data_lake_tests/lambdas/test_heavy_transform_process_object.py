@@ -1,5 +1,6 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
+import json
 import boto3
 import pytest
 from unittest.mock import Mock, MagicMock
@@ -81,6 +82,14 @@ def _dynamodb_resource():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         datasets_table_attr = [
             {
@@ -115,6 +124,11 @@ def _dynamodb_resource():
             }
         )
 
+        ddb.create_table(AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+                         TableName="octagon-JobTaskTokens-dev-prefix",
+                         KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+                         BillingMode='PAY_PER_REQUEST')
+
         yield ddb
 
 
@@ -131,6 +145,12 @@ def side_effect(*args, **kwargs):
                 'Value': 'octagon-Datasets-dev-prefix',
             }
         }
+    if kwargs["Name"].endswith('JobTaskTokens'):
+        return {
+            'Parameter': {
+                'Value': 'octagon-JobTaskTokens-dev-prefix',
+            }
+        }
     if kwargs["Name"].endswith('StageDataCatalog'):
         return {
             'Parameter': {
@@ -237,3 +257,101 @@ def test_handler_fail_fetch_event_data(lambda_event, lambda_context, _mock_clien
 
     peh_table = _helpers_service_resources["dynamodb"].Table("octagon-PipelineExecutionHistory-dev-prefix")
     assert peh_table.item_count == 0
+
+
+def test_handler_manifest(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports, monkeypatch):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.process_object import handler
+
+    with mock_aws():
+        s3 = boto3.client('s3', 'us-east-1')
+        s3.create_bucket(Bucket="stage_bucket")
+        s3.put_object(Bucket="stage_bucket", Key="manifests/adtech/datasetA/batch.json", Body=json.dumps({
+            "bucket": "stage_bucket",
+            "entries": [{"key": "pre-stage/adtech/datasetA/file1", "size": 1, "etag": "etag1"},
+                        {"key": "pre-stage/adtech/datasetA/file2", "size": 2, "etag": "etag2"}]
+        }))
+        monkeypatch.setitem(_helpers_service_clients, 's3', s3)
+
+        transform_calls = []
+
+        class Transform:
+            def transform_object(self, resource_prefix, bucket, keys, team, dataset, manifest_uri=None):
+                transform_calls.append((keys, manifest_uri))
+                return {'processedKeysPath': 'post-stage/adtech/datasetA', 'jobDetails': {'jobStatus': 'STARTED'}}
+
+        monkeypatch.setattr(handler.TransformHandler, 'stage_transform', lambda *args: Transform)
+        manifest_uri = "s3://stage_bucket/manifests/adtech/datasetA/batch.json"
+        response = handler.lambda_handler({
+            "statusCode": 200,
+            "body": {
+                "bucket": "stage_bucket",
+                "manifestUri": manifest_uri,
+                "keysCount": 2,
+                "team": "adtech",
+                "pipeline": "insights",
+                "pipeline_stage": "StageB",
+                "dataset": "datasetA",
+                "env": "dev"
+            }
+        }, lambda_context)
+
+    assert transform_calls == [(["pre-stage/adtech/datasetA/file1", "pre-stage/adtech/datasetA/file2"], manifest_uri)]
+    assert response['jobDetails']['jobStatus'] == 'STARTED'
+
+
+def test_handler_task_token(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports, monkeypatch):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.process_object import handler
+
+    class Transform:
+        def transform_object(self, resource_prefix, bucket, keys, team, dataset):
+            return {'processedKeysPath': 'post-stage/adtech/datasetA',
+                    'jobDetails': {'jobName': 'prefix-adtech-datasetA-glue-job', 'jobRunId': 'jr_a_id',
+                                   'jobStatus': 'STARTED'}}
+
+    monkeypatch.setattr(handler.TransformHandler, 'stage_transform', lambda *args: Transform)
+    response = handler.lambda_handler({
+        "body": {
+            "bucket": "stage_bucket",
+            "keysToProcess": ["pre-stage/adtech/datasetA/filename_parsed"],
+            "team": "adtech",
+            "pipeline": "insights",
+            "pipeline_stage": "StageB",
+            "dataset": "datasetA",
+            "env": "dev"
+        },
+        "taskToken": "task-token"
+    }, lambda_context)
+
+    # the job state change resumes the execution with the job details
+    item = _dynamodb_resource.Table("octagon-JobTaskTokens-dev-prefix").get_item(Key={'id': 'jr_a_id'})['Item']
+    assert item['task_token'] == 'task-token'
+    assert json.loads(item['payload']) == {
+        'job': response, 'env': 'dev', 'team': 'adtech', 'pipeline': 'insights', 'pipeline_stage': 'StageB'
+    }
+
+
+def test_handler_concurrent_runs_exceeded(lambda_context, _mock_clients, _dynamodb_resource, _mock_imports,
+                                          monkeypatch):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.process_object import handler
+
+    class Transform:
+        def transform_object(self, resource_prefix, bucket, keys, team, dataset):
+            raise ClientError({'Error': {'Code': 'ConcurrentRunsExceededException'}}, 'StartJobRun')
+
+    monkeypatch.setattr(handler.TransformHandler, 'stage_transform', lambda *args: Transform)
+    with pytest.raises(ClientError):
+        handler.lambda_handler({
+            "body": {
+                "bucket": "stage_bucket",
+                "keysToProcess": ["pre-stage/adtech/datasetA/filename_parsed"],
+                "team": "adtech",
+                "pipeline": "insights",
+                "pipeline_stage": "StageB",
+                "dataset": "datasetA",
+                "env": "dev"
+            }
+        }, lambda_context)
+
+    # the batch is retried by the state machine, its execution is canceled instead of failed
+    peh_items = _dynamodb_resource.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()['Items']
+    assert [item['status'] for item in peh_items] == ['CANCELED']
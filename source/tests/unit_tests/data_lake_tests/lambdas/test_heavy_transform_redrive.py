@@ -22,6 +22,12 @@ def _mock_stepfunctions_client():
     return client
 
 
+@pytest.fixture()
+def lambda_context():
+    # The redrive long polls the DLQ until 10 seconds before the Lambda timeout
+    return Mock(get_remaining_time_in_millis=Mock(return_value=12000))
+
+
 def _side_effect(*args, **kwargs):
     if kwargs["Name"].endswith('DLQ'):
         return {
@@ -85,7 +91,24 @@ def _mock_imports(monkeypatch):
         }
     ],
 )
-def test_handler(lambda_event, _mock_imports, _mock_clients):
+def test_handler(lambda_event, _mock_imports, _mock_clients, lambda_context):
     from data_lake.stages.sdlf_heavy_transform.lambdas.redrive.handler import lambda_handler
-    lambda_handler(lambda_event, None)
+    lambda_handler(lambda_event, lambda_context)
     _helpers_service_clients["stepfunctions"].start_execution.assert_called_once()
+
+
+def test_handler_max_in_flight(_mock_imports, _mock_clients, _mock_sqs_client, lambda_context):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.redrive.handler import lambda_handler
+    dlq = _mock_sqs_client.get_queue_by_name(QueueName='stage_dlq_name.fifo')
+    for i in range(4):
+        dlq.send_message(MessageBody="{\"test_redrive\": %d}" % i, MessageGroupId="test_stage_dlq_group_id",
+                         MessageDeduplicationId="test_stage_dlq_message_deduplication_id_%d" % i)
+    stepfunctions = _helpers_service_clients["stepfunctions"]
+    # 2 executions are already running, the redrive only starts 3 of the 5 messages
+    stepfunctions.get_paginator = Mock(return_value=Mock(paginate=Mock(side_effect=lambda **kwargs: [
+        {'executions': [{}] * min(2 + stepfunctions.start_execution.call_count, 5)}])))
+
+    response = lambda_handler({"dataset": "datasetA", "max_in_flight": 5, "rate": 0}, lambda_context)
+
+    assert response == {'redriven': 3, 'failed': 0, 'drained': False}
+    assert stepfunctions.start_execution.call_count == 3
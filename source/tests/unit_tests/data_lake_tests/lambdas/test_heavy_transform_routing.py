@@ -1,6 +1,7 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 import sys
+import json
 
 import pytest
 from unittest.mock import Mock, MagicMock
@@ -48,6 +49,12 @@ def _side_effect(*args, **kwargs):
                 'Value': 'prefix-foundations-stage-bucket',
             }
         }
+    if kwargs["Name"].endswith('StageBucketKeyArn'):
+        return {
+            'Parameter': {
+                'Value': 'stage_bucket_key_arn',
+            }
+        }
     if kwargs["Name"].endswith('SM'):
         return {
             'Parameter': {
@@ -144,8 +151,20 @@ def _mock_sqs_client():
 
 
 @pytest.fixture()
-def _mock_clients(monkeypatch, _mock_stepfunctions_client, _mock_ssm_client, _dynamodb_client, _mock_sqs_client):
+def _mock_s3_client():
+    with mock_aws():
+        s3 = boto3.client('s3', 'us-east-1')
+        s3.create_bucket(Bucket='prefix-foundations-stage-bucket')
+        s3.put_object(Bucket='prefix-foundations-stage-bucket', Key='stage_b_message_body', Body=b'data')
+
+        yield s3
+
+
+@pytest.fixture()
+def _mock_clients(monkeypatch, _mock_stepfunctions_client, _mock_ssm_client, _dynamodb_client, _mock_sqs_client,
+                  _mock_s3_client):
     monkeypatch.setitem(_helpers_service_clients, 'stepfunctions', _mock_stepfunctions_client)
+    monkeypatch.setitem(_helpers_service_clients, 's3', _mock_s3_client)
     monkeypatch.setitem(_helpers_service_clients, 'ssm', _mock_ssm_client)
     monkeypatch.setitem(_helpers_service_resources, 'dynamodb', _dynamodb_client)
     monkeypatch.setitem(_helpers_service_resources, 'sqs', _mock_sqs_client)
@@ -170,7 +189,53 @@ def _mock_imports(monkeypatch):
         }
     ],
 )
-def test_handler(lambda_event, _mock_imports, _mock_clients):
+def test_handler(lambda_event, _mock_imports, _mock_clients, _mock_s3_client):
     from data_lake.stages.sdlf_heavy_transform.lambdas.routing.handler import lambda_handler
     lambda_handler(lambda_event, None)
     _helpers_service_clients["stepfunctions"].start_execution.assert_called_once()
+
+    # the keys are handed over through a manifest in the stage bucket
+    execution_input = json.loads(_helpers_service_clients["stepfunctions"].start_execution.call_args.kwargs['input'])
+    assert 'keysToProcess' not in execution_input['body']
+    assert execution_input['body']['keysCount'] == 1
+    manifest_uri = execution_input['body']['manifestUri']
+    assert manifest_uri.startswith('s3://prefix-foundations-stage-bucket/manifests/adtech/datasetA/')
+
+    manifest_key = manifest_uri.split('/', 3)[3]
+    manifest = json.loads(
+        _mock_s3_client.get_object(Bucket='prefix-foundations-stage-bucket', Key=manifest_key)['Body'].read())
+    assert manifest['bucket'] == 'prefix-foundations-stage-bucket'
+    assert manifest['entries'] == [{'key': 'stage_b_message_body', 'size': 4, 'etag': '8d777f385d3dfec8815d20f7496026dc'}]
+
+
+def test_handler_tables(_mock_imports, _mock_clients, _mock_s3_client):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.routing.handler import lambda_handler
+    queue = _helpers_service_resources['sqs'].get_queue_by_name(QueueName='stage_b_queue_name.fifo')
+    keys = ['pre-stage/adtech/datasetA/table_1/customer_hash=abc/file-1.csv',
+            'pre-stage/adtech/datasetA/table_2/customer_hash=abc/file-1.csv',
+            'pre-stage/adtech/datasetA/table_1/customer_hash=def/file-1.csv']
+    for index, key in enumerate(keys):
+        queue.send_message(MessageBody=key, MessageGroupId="test_group_id", MessageDeduplicationId=str(index))
+
+    lambda_handler({"team": "adtech", "pipeline": "insights", "env": "dev", "pipeline_stage": "StageB",
+                    "dataset": "datasetA"}, None)
+
+    # one execution per table
+    start_execution = _helpers_service_clients["stepfunctions"].start_execution
+    assert start_execution.call_count == 3
+    keys_count = [json.loads(call.kwargs['input'])['body']['keysCount'] for call in start_execution.call_args_list]
+    assert keys_count == [1, 2, 1]
+
+
+def test_handler_manifest_fail(monkeypatch, _mock_imports, _mock_clients):
+    from data_lake.stages.sdlf_heavy_transform.lambdas.routing import handler
+    monkeypatch.setattr(handler, "write_keys_manifest", Mock(side_effect=Exception("access denied")))
+
+    handler.lambda_handler({"team": "adtech", "pipeline": "insights", "env": "dev", "pipeline_stage": "StageB",
+                            "dataset": "datasetA"}, None)
+
+    # the keys stay inline when the manifest can not be written
+    execution_input = json.loads(_helpers_service_clients["stepfunctions"].start_execution.call_args.kwargs['input'])
+    assert 'manifestUri' not in execution_input['body']
+    assert execution_input['body']['keysToProcess'] == ['stage_b_message_body']
+    assert execution_input['body']['keysCount'] == 1
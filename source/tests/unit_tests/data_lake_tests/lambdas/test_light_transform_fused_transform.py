@@ -0,0 +1,221 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+import json
+import sys
+from datetime import datetime
+
+import boto3
+import pytest
+from unittest.mock import Mock, MagicMock
+from moto import mock_aws
+from aws_solutions.core.helpers import get_service_client, _helpers_service_clients, _helpers_service_resources
+
+RECORD_BODY = json.dumps({
+    "bucket": "raw_bucket",
+    "key": "filename",
+    "timestamp": 1684808687458,
+    "last_modified_date": "2023-05-23T02:24:43Z+00:00",
+    "id": "s3://raw_bucket/filename",
+    "stage": "raw",
+    "team": "adtech",
+    "dataset": "datasetA",
+    "pipeline": "insights",
+    "env": "dev",
+    "pipeline_stage": "StageA"
+})
+
+
+@pytest.fixture()
+def _mock_sts_client():
+    sts_client = get_service_client('sts')
+    sts_client.get_caller_identity = Mock(
+        return_value={
+            'Account': 'account_id',
+        }
+    )
+    return sts_client
+
+
+@pytest.fixture()
+def dynamodb_client():
+    with mock_aws():
+        ddb = boto3.resource('dynamodb', 'us-east-1')
+        for table_name, key in [("octagon-Pipelines-dev-prefix", "name"),
+                                ("octagon-ObjectMetadata-dev-prefix", "id"),
+                                ("octagon-PipelineExecutionHistory-dev-prefix", "id")]:
+            ddb.create_table(AttributeDefinitions=[{'AttributeName': key, 'AttributeType': 'S'}],
+                             TableName=table_name,
+                             KeySchema=[{'AttributeName': key, 'KeyType': 'HASH'}],
+                             BillingMode='PAY_PER_REQUEST')
+        ddb.create_table(AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                               {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+                         TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+                         KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+                         BillingMode='PAY_PER_REQUEST')
+
+        ddb.Table("octagon-Pipelines-dev-prefix").put_item(
+            Item={
+                'name': "adtech-insights-stage-a",
+                'id': "sdlf-stage-a",
+                "status": "ACTIVE",
+                "version": 4
+            }
+        )
+
+        yield ddb
+
+
+@pytest.fixture()
+def _mock_s3_client():
+    s3_client = get_service_client('s3')
+    s3_client.head_object = Mock(
+        return_value={
+            'ContentLength': 1,
+            'ETag': '"d41d8cd98f00b204e9800998ecf8427e"',
+            'LastModified': datetime.now(),
+        }
+    )
+    return s3_client
+
+
+@pytest.fixture()
+def _mock_stepfunctions_client():
+    client = get_service_client('stepfunctions')
+    client.start_execution = Mock(
+        return_value={
+            'executionArn': 'state_machine_execution_arn',
+            'startDate': datetime(2023, 1, 1)
+        }
+    )
+    return client
+
+
+def side_effect(*args, **kwargs):
+    if kwargs["Name"].endswith('ObjectMetadata'):
+        return {
+            'Parameter': {
+                'Value': 'octagon-ObjectMetadata-dev-prefix',
+            }
+        }
+    if kwargs["Name"].endswith('Datasets'):
+        return {
+            'Parameter': {
+                'Value': 'octagon-Datasets-dev-prefix',
+            }
+        }
+    if kwargs["Name"].endswith('Queue'):
+        return {
+            'Parameter': {
+                'Value': 'stage_b_queue_name.fifo',
+            }
+        }
+    if kwargs["Name"].endswith('SM'):
+        return {
+            'Parameter': {
+                'Value': 'state_machine_arn',
+            }
+        }
+    return {}
+
+
+@pytest.fixture()
+def _mock_ssm_client():
+    ssm_client = get_service_client('ssm')
+    ssm_client.get_parameter = Mock(
+        side_effect=side_effect
+    )
+    return ssm_client
+
+
+@pytest.fixture()
+def _mock_sqs_client():
+    with mock_aws():
+        sqs = boto3.resource('sqs', 'us-east-1')
+        sqs.create_queue(
+            QueueName='stage_b_queue_name.fifo',
+            Attributes={'FifoQueue': 'true'}
+        )
+        yield sqs
+
+
+@pytest.fixture()
+def _mock_clients(monkeypatch, _mock_sts_client, dynamodb_client, _mock_ssm_client, _mock_s3_client,
+                  _mock_sqs_client, _mock_stepfunctions_client):
+    monkeypatch.setitem(_helpers_service_clients, 'sts', _mock_sts_client)
+    monkeypatch.setitem(_helpers_service_resources, 'dynamodb', dynamodb_client)
+    monkeypatch.setitem(_helpers_service_clients, 'ssm', _mock_ssm_client)
+    monkeypatch.setitem(_helpers_service_clients, 's3', _mock_s3_client)
+    monkeypatch.setitem(_helpers_service_resources, 'sqs', _mock_sqs_client)
+    monkeypatch.setitem(_helpers_service_clients, 'stepfunctions', _mock_stepfunctions_client)
+
+
+@pytest.fixture()
+def __mock_imports(monkeypatch):
+    mocked_cloudwatch_metrics = MagicMock()
+    sys.modules['cloudwatch_metrics'] = mocked_cloudwatch_metrics
+
+
+def _mock_transform(monkeypatch, handler, transform_object):
+    transform = Mock()
+    transform.return_value.transform_object = transform_object
+    transform_handler = Mock()
+    transform_handler.return_value.stage_transform.return_value = transform
+    monkeypatch.setattr(handler.light_transform_steps, "TransformHandler", transform_handler)
+
+
+def test_handler_success(monkeypatch, __mock_imports, _mock_clients, dynamodb_client, _mock_sqs_client):
+    from data_lake.stages.sdlf_light_transform.lambdas.fused_transform import handler
+    _mock_transform(monkeypatch, handler, Mock(return_value=["pre-stage/adtech/datasetA/filename_parsed"]))
+
+    response = handler.lambda_handler({"Records": [{"messageId": "1", "body": RECORD_BODY}]}, None)
+
+    assert response == {'batchItemFailures': []}
+    peh_items = dynamodb_client.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()['Items']
+    assert len(peh_items) == 1
+    assert peh_items[0]['status'] == "COMPLETED"
+    assert dynamodb_client.Table("octagon-ObjectMetadata-dev-prefix").item_count == 2
+    queue = _mock_sqs_client.get_queue_by_name(QueueName='stage_b_queue_name.fifo')
+    assert len(queue.receive_messages(MaxNumberOfMessages=10)) == 1
+    _helpers_service_clients["stepfunctions"].start_execution.assert_not_called()
+
+
+def test_handler_transform_fail(monkeypatch, __mock_imports, _mock_clients, dynamodb_client):
+    from data_lake.stages.sdlf_light_transform.lambdas.fused_transform import handler
+    _mock_transform(monkeypatch, handler, Mock(side_effect=ValueError("transform failed")))
+
+    response = handler.lambda_handler({"Records": [{"messageId": "1", "body": RECORD_BODY}]}, None)
+
+    assert response == {'batchItemFailures': []}
+    peh_items = dynamodb_client.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()['Items']
+    assert peh_items[0]['status'] == "FAILED"
+    execution_input = json.loads(
+        _helpers_service_clients["stepfunctions"].start_execution.call_args.kwargs["input"])
+    assert execution_input == {"objects": [RECORD_BODY]}
+
+
+def test_handler_error_path_fail(monkeypatch, __mock_imports, _mock_clients):
+    from data_lake.stages.sdlf_light_transform.lambdas.fused_transform import handler
+    _mock_transform(monkeypatch, handler, Mock(side_effect=ValueError("transform failed")))
+    _helpers_service_clients["stepfunctions"].start_execution.side_effect = Exception("throttled")
+
+    response = handler.lambda_handler({"Records": [{"messageId": "1", "body": RECORD_BODY}]}, None)
+
+    assert response == {'batchItemFailures': [{'itemIdentifier': '1'}]}
+
+
+def test_handler_close_fail_after_send(monkeypatch, __mock_imports, _mock_clients, dynamodb_client, _mock_sqs_client):
+    from data_lake.stages.sdlf_light_transform.lambdas.fused_transform import handler
+    _mock_transform(monkeypatch, handler, Mock(return_value=["pre-stage/adtech/datasetA/filename_parsed"]))
+    monkeypatch.setattr(handler.octagon.OctagonClient, "update_pipeline_execution",
+                        Mock(side_effect=[None, None, Exception("throttled")]))
+
+    response = handler.lambda_handler({"Records": [{"messageId": "1", "body": RECORD_BODY}]}, None)
+
+    # the keys were sent to stage B once, the object is not run again by the state machine
+    assert response == {'batchItemFailures': []}
+    queue = _mock_sqs_client.get_queue_by_name(QueueName='stage_b_queue_name.fifo')
+    assert len(queue.receive_messages(MaxNumberOfMessages=10)) == 1
+    _helpers_service_clients["stepfunctions"].start_execution.assert_not_called()
+    peh_items = dynamodb_client.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()['Items']
+    assert peh_items[0]['status'] == "COMPLETED"
@@ -100,12 +100,20 @@ def dynamodb_client():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         peh_table = ddb.Table("octagon-PipelineExecutionHistory-dev-prefix")
         peh_table.put_item(
             Item={
                 'id': "d11111-111c-11b1-a11c-11111dg11o111",
-                'active': "false",
+                'active': True,
                 'comment': "comment",
                 "dataset_date": '2023-05-23',
                 "duration_in_seconds": "7.822",
@@ -133,6 +141,7 @@ def _mock_s3_client():
     s3_client.head_object = Mock(
         return_value={
             'ContentLength': 1,
+            'ETag': '"d41d8cd98f00b204e9800998ecf8427e"',
             'LastModified': datetime.now(),
         }
     )
@@ -237,6 +246,9 @@ def test_handler_success(lambda_event, lambda_context, __mock_imports, _mock_cli
     table = dynamodb_client.Table("octagon-PipelineExecutionHistory-dev-prefix")
     assert table.item_count == 1
     assert response == 200
+    # One head_object call per processed key
+    assert _helpers_service_clients["s3"].head_object.call_count == 1
+    assert dynamodb_client.Table("octagon-ObjectMetadata-dev-prefix").item_count == 1
 
 
 @pytest.mark.parametrize(
@@ -266,3 +278,36 @@ def test_handler_fail(lambda_event, lambda_context, __mock_imports, _mock_client
     from data_lake.stages.sdlf_light_transform.lambdas.postupdate_metadata.handler import lambda_handler
     with pytest.raises(KeyError):
         lambda_handler(lambda_event, lambda_context)
+
+
+@pytest.mark.parametrize(
+    "lambda_event",
+    [
+        {
+            "statusCode": 200,
+            "body": {
+                "bucket": "raw_bucket",
+                "key": "filename",
+                "team": "adtech",
+                "dataset": "datasetA",
+                "pipeline": "insights",
+                "env": "dev",
+                "pipeline_stage": "StageA",
+                "peh_id": "d11111-111c-11b1-a11c-11111dg11o111",
+                "processedKeys": [
+                    "pre-stage/adtech/datasetA/filename_parsed"
+                ]
+            }
+        }
+    ],
+)
+def test_handler_close_fail_after_send(monkeypatch, lambda_event, lambda_context, __mock_imports, _mock_clients,
+                                       _mock_sqs_client):
+    from data_lake.stages.sdlf_light_transform.lambdas.postupdate_metadata import handler
+    monkeypatch.setattr(handler.octagon.OctagonClient, "end_pipeline_execution_success",
+                        Mock(side_effect=Exception("throttled")))
+
+    # the keys were sent to stage B once, the step does not fail and the object is not run again
+    assert handler.lambda_handler(lambda_event, lambda_context) == 200
+    queue = _mock_sqs_client.get_queue_by_name(QueueName='stage_b_queue_name.fifo')
+    assert len(queue.receive_messages(MaxNumberOfMessages=10)) == 1
@@ -102,6 +102,14 @@ def _dynamodb_resource():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         yield ddb
 
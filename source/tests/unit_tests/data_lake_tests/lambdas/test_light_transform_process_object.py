@@ -102,12 +102,20 @@ def dynamodb_client():
             KeySchema=peh_table_schema,
             BillingMode='PAY_PER_REQUEST'
         )
+        ddb.create_table(
+            AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+            TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+            KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                       {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
 
         peh_table = ddb.Table("octagon-PipelineExecutionHistory-dev-prefix")
         peh_table.put_item(
             Item={
                 'id': "d11111-111c-11b1-a11c-11111dg11o111",
-                'active': "false",
+                'active': True,
                 'comment': "comment",
                 "dataset_date": '2023-05-23',
                 "duration_in_seconds": "7.822",
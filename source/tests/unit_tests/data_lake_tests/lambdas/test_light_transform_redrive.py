@@ -16,6 +16,12 @@ def mock_cloudwatch_metrics_imports(monkeypatch):
     sys.modules['cloudwatch_metrics'] = mocked_cloudwatch_metrics
 
 
+@pytest.fixture()
+def lambda_context():
+    # The redrive long polls the DLQ until 10 seconds before the Lambda timeout
+    return Mock(get_remaining_time_in_millis=Mock(return_value=12000))
+
+
 def side_effect(*args, **kwargs):
     if kwargs["Name"].endswith('DLQ'):
         return {
@@ -53,6 +59,10 @@ def _mock_sqs_client_no_message():
         sqs.create_queue(
             QueueName='stage_dlq_name.fifo'
         )
+        sqs.create_queue(
+            QueueName='stage_queue_name.fifo',
+            Attributes={'FifoQueue': 'true'}
+        )
         yield sqs
 
 
@@ -74,10 +84,10 @@ def _mock_sqs_no_message(monkeypatch, _mock_sqs_client_no_message):
     ],
 )
 def test_handler_no_message(lambda_event, mock_cloudwatch_metrics_imports, _mock_ssm, _mock_sqs_client_no_message,
-                            _mock_sqs_no_message):
+                            _mock_sqs_no_message, lambda_context):
     from data_lake.stages.sdlf_light_transform.lambdas.redrive.handler import lambda_handler
 
-    response = lambda_handler(lambda_event, None)
+    response = lambda_handler(lambda_event, lambda_context)
     messages_in_stage_queue = _mock_sqs_client_no_message.get_queue_by_name(
         QueueName='stage_dlq_name.fifo').receive_messages(MaxNumberOfMessages=10, WaitTimeSeconds=1)
     assert len(messages_in_stage_queue) == 0
@@ -121,9 +131,27 @@ def _mock_queue_with_message(monkeypatch, _mock_sqs_client_with_message):
     ],
 )
 def test_handler_with_message(lambda_event, mock_cloudwatch_metrics_imports, _mock_ssm, _mock_queue_with_message,
-                              _mock_sqs_client_with_message, caplog):
+                              _mock_sqs_client_with_message, caplog, lambda_context):
     from data_lake.stages.sdlf_light_transform.lambdas.redrive.handler import lambda_handler
-    lambda_handler(lambda_event, None)
+    lambda_handler(lambda_event, lambda_context)
     messages_in_stage_queue = _mock_sqs_client_with_message.get_queue_by_name(
         QueueName='stage_queue_name.fifo').receive_messages(MaxNumberOfMessages=10, WaitTimeSeconds=1)
     assert len(messages_in_stage_queue) == 1
+
+
+def test_handler_bulk_redrive(mock_cloudwatch_metrics_imports, _mock_ssm, _mock_queue_with_message,
+                              _mock_sqs_client_with_message, lambda_context):
+    from data_lake.stages.sdlf_light_transform.lambdas.redrive.handler import lambda_handler
+    dlq = _mock_sqs_client_with_message.get_queue_by_name(QueueName='stage_dlq_name.fifo')
+    for i in range(24):
+        dlq.send_message(MessageBody='stage_dlq_message_body_{}'.format(i), MessageGroupId="test_group_id",
+                         MessageDeduplicationId="test_message_deduplication_id_{}".format(i))
+
+    response = lambda_handler({'rate': 0}, lambda_context)
+
+    assert response == {'redriven': 25, 'failed': 0, 'drained': True}
+    stage_queue = _mock_sqs_client_with_message.get_queue_by_name(QueueName='stage_queue_name.fifo')
+    stage_queue.reload()
+    assert stage_queue.attributes['ApproximateNumberOfMessages'] == '25'
+    dlq.reload()
+    assert dlq.attributes['ApproximateNumberOfMessages'] == '0'
@@ -1,6 +1,7 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import json
 import sys
 import pytest
 from unittest.mock import Mock, MagicMock
@@ -72,6 +73,33 @@ def test_handler_success(lambda_event, _mock_imports, _mock_clients):
     _helpers_service_clients["stepfunctions"].start_execution.assert_called_once()
 
 
+@pytest.mark.parametrize(
+    "lambda_event",
+    [
+        {
+            "Records": [
+                {
+                    "body": "{\"bucket\": \"raw_bucket\", \"key\": \"file1\", \"timestamp\": 1684808678810, \"last_modified_date\": \"date\", \"id\": \"s3://file1\", \"stage\": \"raw\", \"team\": \"adtech\", \"dataset\": \"newdataset\", \"pipeline\": \"insights\", \"env\": \"dev\", \"pipeline_stage\": \"StageA\"}"
+                },
+                {
+                    "body": "{\"bucket\": \"raw_bucket\", \"key\": \"file2\", \"timestamp\": 1684808678810, \"last_modified_date\": \"date\", \"id\": \"s3://file2\", \"stage\": \"raw\", \"team\": \"adtech\", \"dataset\": \"newdataset\", \"pipeline\": \"insights\", \"env\": \"dev\", \"pipeline_stage\": \"StageA\"}"
+                }
+            ],
+        }
+    ],
+)
+def test_handler_batch_executions(lambda_event, monkeypatch, _mock_imports, _mock_clients):
+    from data_lake.stages.sdlf_light_transform.lambdas.routing import handler
+    monkeypatch.setattr(handler, "BATCH_EXECUTIONS", True)
+    response = handler.lambda_handler(lambda_event, None)
+    assert response is None
+    _helpers_service_clients["ssm"].get_parameter.assert_called_once()
+    _helpers_service_clients["stepfunctions"].start_execution.assert_called_once()
+    execution_input = json.loads(
+        _helpers_service_clients["stepfunctions"].start_execution.call_args.kwargs["input"])
+    assert execution_input["objects"] == [record["body"] for record in lambda_event["Records"]]
+
+
 @pytest.mark.parametrize(
     "lambda_event",
     [
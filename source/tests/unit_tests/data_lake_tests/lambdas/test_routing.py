@@ -8,10 +8,13 @@
 #   ./run-unit-tests.sh --test-file-name data_lake_tests/lambdas/test_routing.py
 
 import sys
+import json
+import uuid
 import pytest
 import boto3
 from datetime import datetime
 from unittest.mock import Mock, MagicMock
+from botocore.exceptions import ClientError
 from moto import mock_aws
 from aws_solutions.core.helpers import get_service_client
 
@@ -32,6 +35,16 @@ def _mocked_cloudwatch_metrics(monkeypatch):
     sys.modules['cloudwatch_metrics'] = mocked_cloudwatch_metrics
 
 
+@pytest.fixture(autouse=True)
+def _clear_routing_caches(_mocked_cloudwatch_metrics):
+    from data_lake.pipelines.lambdas.routing import handler
+    handler.routes.clear()
+    handler.queue_urls.clear()
+    yield
+    handler.routes.clear()
+    handler.queue_urls.clear()
+
+
 @pytest.fixture()
 def _mock_ssm_client():
     ssm_client = get_service_client('ssm')
@@ -159,12 +172,191 @@ def test_handler(lambda_event, _mock_clients_and_resources, _mock_functions, _mo
     assert len(messages_in_queue) == 1
 
 
+@pytest.fixture()
+def _mock_customer_config_table(monkeypatch, _mock_dynamodb_resource):
+    _mock_dynamodb_resource.create_table(
+        AttributeDefinitions=[{'AttributeName': 'customer_id', 'AttributeType': 'S'},
+                              {'AttributeName': 'hash_key', 'AttributeType': 'S'}],
+        TableName="sdlf-customer-config",
+        KeySchema=[{'AttributeName': 'customer_id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{'IndexName': 'amc-index',
+                                 'KeySchema': [{'AttributeName': 'hash_key', 'KeyType': 'HASH'}],
+                                 'Projection': {'ProjectionType': 'ALL'}}],
+        BillingMode='PAY_PER_REQUEST')
+    _mock_dynamodb_resource.Table("sdlf-customer-config").put_item(
+        Item={'customer_id': 'customer', 'hash_key': 'external-amc-bucket', 'team': 'adtech', 'dataset': 'datasetA'})
+    monkeypatch.setattr("data_lake.pipelines.lambdas.routing.handler.dynamodb", _mock_dynamodb_resource)
+    monkeypatch.setattr("data_lake.pipelines.lambdas.routing.handler.dataset_table",
+                        _mock_dynamodb_resource.Table("octagon-Datasets-dev-prefix"))
+    return _mock_dynamodb_resource
+
+
+def test_resolve_route(_mock_customer_config_table):
+    from data_lake.pipelines.lambdas.routing.handler import resolve_route
+
+    assert resolve_route("prefix-raw-bucket", "adtech", "datasetA") == ("adtech", "datasetA", "insights")
+    # external AMC buckets are looked up in the customer config
+    assert resolve_route("external-amc-bucket", "workflow", "output") == ("adtech", "datasetA", "insights")
+    assert resolve_route("unknown-bucket", "workflow", "output") is None
+
+    # found and missing routes are served from the cache
+    _mock_customer_config_table.Table("octagon-Datasets-dev-prefix").delete_item(Key={'name': 'adtech-datasetA'})
+    _mock_customer_config_table.Table("sdlf-customer-config").put_item(
+        Item={'customer_id': 'new', 'hash_key': 'unknown-bucket', 'team': 'adtech', 'dataset': 'datasetA'})
+    assert resolve_route("prefix-raw-bucket", "adtech", "datasetA") == ("adtech", "datasetA", "insights")
+    assert resolve_route("unknown-bucket", "workflow", "output") is None
+
+
+def test_resolve_route_negative_ttl(monkeypatch, _mock_customer_config_table):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "ROUTING_NEGATIVE_CACHE_TTL", 0)
+    assert handler.resolve_route("unknown-bucket", "workflow", "output") is None
+    _mock_customer_config_table.Table("sdlf-customer-config").put_item(
+        Item={'customer_id': 'new', 'hash_key': 'unknown-bucket', 'team': 'adtech', 'dataset': 'datasetA'})
+    assert handler.resolve_route("unknown-bucket", "workflow", "output") == ("adtech", "datasetA", "insights")
+
+
+def test_get_queue(monkeypatch, _mock_sqs_resource):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "sqs", _mock_sqs_resource)
+    queue = handler.get_queue('prefix-adtech-insights-queue-a.fifo')
+
+    # the queue url is only looked up once
+    monkeypatch.setattr(_mock_sqs_resource, "get_queue_by_name", Mock(side_effect=AssertionError("unexpected lookup")))
+    assert handler.get_queue('prefix-adtech-insights-queue-a.fifo').url == queue.url
+
+
+def _object_event(detail_type, key, bucket='prefix-raw-bucket', etag=None):
+    return {
+        'id': str(uuid.uuid4()),
+        'detail-type': detail_type,
+        'time': '2023-05-23T02:24:33Z',
+        'detail': {'bucket': {'name': bucket}, 'object': {'key': key, 'etag': etag or str(uuid.uuid4())}}
+    }
+
+
+def _buffered_record(message_id, detail_type, key, bucket='prefix-raw-bucket', etag=None):
+    return {
+        'messageId': message_id,
+        'body': json.dumps(_object_event(detail_type, key, bucket, etag))
+    }
+
+
+def _receive_all(queue):
+    messages = []
+    while received := queue.receive_messages(MaxNumberOfMessages=10):
+        messages.extend(json.loads(message.body) for message in received)
+        for message in received:
+            message.delete()
+    return messages
+
+
+def test_handler_buffered_records(monkeypatch, _mock_customer_config_table, _mock_sqs_resource):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "sqs", _mock_sqs_resource)
+    catalog_table = _mock_customer_config_table.Table("octagon-ObjectMetadata-dev-prefix")
+    catalog_table.put_item(Item={'id': "s3://prefix-raw-bucket/adtech/datasetA/deleted"})
+    monkeypatch.setattr(handler, "catalog_table", catalog_table)
+
+    records = [_buffered_record(f"created-{i}", 'Object Created', f"adtech/datasetA/file-{i}") for i in range(25)]
+    records += [
+        _buffered_record("deleted", 'Object Deleted', "adtech/datasetA/deleted"),
+        _buffered_record("unknown", 'Object Created', "adtech/unknown/file", bucket='unknown-bucket'),
+        {'messageId': "invalid", 'body': "{}"}
+    ]
+    response = handler.lambda_handler({'Records': records}, None)
+
+    # only records which could not be routed are retried
+    assert sorted(failure['itemIdentifier'] for failure in response['batchItemFailures']) == ["invalid", "unknown"]
+    assert sorted(item['id'] for item in catalog_table.scan()['Items']) == sorted(
+        f"s3://prefix-raw-bucket/adtech/datasetA/file-{i}" for i in range(25))
+
+    queue = _mock_sqs_resource.get_queue_by_name(QueueName='prefix-adtech-insights-queue-a.fifo')
+    messages = _receive_all(queue)
+    assert sorted(message['key'] for message in messages) == sorted(f"adtech/datasetA/file-{i}" for i in range(25))
+    assert all(message['pipeline'] == "insights" and message['pipeline_stage'] == "StageA" for message in messages)
+
+
+def test_handler_buffered_duplicates(monkeypatch, _mock_customer_config_table, _mock_sqs_resource):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "sqs", _mock_sqs_resource)
+    monkeypatch.setattr(handler, "catalog_table", _mock_customer_config_table.Table("octagon-ObjectMetadata-dev-prefix"))
+    queue = _mock_sqs_resource.get_queue_by_name(QueueName='prefix-adtech-insights-queue-a.fifo')
+
+    records = [_buffered_record(f"record-{i}", 'Object Created', "adtech/datasetA/file", etag="etag-1") for i in range(3)]
+    assert handler.lambda_handler({'Records': records}, None) == {'batchItemFailures': []}
+    assert len(_receive_all(queue)) == 1
+
+    # re-delivered events of the cataloged version are dropped, a new version is routed
+    records = [_buffered_record("record-3", 'Object Created', "adtech/datasetA/file", etag="etag-1"),
+               _buffered_record("record-4", 'Object Created', "adtech/datasetA/file", etag="etag-2")]
+    assert handler.lambda_handler({'Records': records}, None) == {'batchItemFailures': []}
+    assert [message['object_version'] for message in _receive_all(queue)] == ["etag-2"]
+
+
+def test_handler_buffered_route_failure(monkeypatch, _mock_customer_config_table, _mock_sqs_resource):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "sqs", _mock_sqs_resource)
+    catalog_table = _mock_customer_config_table.Table("octagon-ObjectMetadata-dev-prefix")
+    monkeypatch.setattr(handler, "catalog_table", catalog_table)
+    queue = _mock_sqs_resource.get_queue_by_name(QueueName='prefix-adtech-insights-queue-a.fifo')
+
+    # the object is not cataloged when its route can not be resolved, so that the retry is forwarded
+    monkeypatch.setattr(handler, "resolve_route", Mock(side_effect=[
+        ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'GetItem'),
+        ("adtech", "datasetA", "insights")
+    ]))
+    records = [_buffered_record("record-1", 'Object Created', "adtech/datasetA/file", etag="etag-1")]
+    assert handler.lambda_handler({'Records': records}, None) == {
+        'batchItemFailures': [{'itemIdentifier': "record-1"}]}
+    assert catalog_table.get_item(Key={'id': "s3://prefix-raw-bucket/adtech/datasetA/file"}).get('Item') is None
+
+    assert handler.lambda_handler({'Records': records}, None) == {'batchItemFailures': []}
+    assert [message['object_version'] for message in _receive_all(queue)] == ["etag-1"]
+
+
+def test_handler_duplicate_events(monkeypatch, _mock_customer_config_table, _mock_sqs_resource):
+    from data_lake.pipelines.lambdas.routing import handler
+
+    monkeypatch.setattr(handler, "sqs", _mock_sqs_resource)
+    catalog_table = _mock_customer_config_table.Table("octagon-ObjectMetadata-dev-prefix")
+    monkeypatch.setattr(handler, "catalog_table", catalog_table)
+    queue = _mock_sqs_resource.get_queue_by_name(QueueName='prefix-adtech-insights-queue-a.fifo')
+
+    handler.lambda_handler(_object_event('Object Created', "adtech/datasetA/file", etag="etag-1"), None)
+    handler.lambda_handler(_object_event('Object Created', "adtech/datasetA/file", etag="etag-1"), None)
+    assert len(_receive_all(queue)) == 1
+
+    # the catalog item is released when the event can not be forwarded so that its retry is not dropped
+    monkeypatch.setattr(handler, "get_queue", Mock(side_effect=ValueError("unavailable")))
+    with pytest.raises(ValueError):
+        handler.lambda_handler(_object_event('Object Created', "adtech/datasetA/other", etag="etag-1"), None)
+    assert catalog_table.get_item(Key={'id': "s3://prefix-raw-bucket/adtech/datasetA/other"}).get('Item') is None
+
+
+def test_get_message_entry():
+    from data_lake.pipelines.lambdas.routing.handler import get_message_entry
+
+    message = {'bucket': 'prefix-raw-bucket', 'key': 'adtech/datasetA/file', 'team': 'adtech', 'dataset': 'datasetA',
+               'object_version': 'etag-1'}
+    assert get_message_entry(message)['MessageDeduplicationId'] == \
+        get_message_entry(dict(message, timestamp=1))['MessageDeduplicationId']
+    assert get_message_entry(message)['MessageDeduplicationId'] != \
+        get_message_entry(dict(message, object_version='etag-2'))['MessageDeduplicationId']
+
+
 def test_get_item(_mock_dynamodb_resource):
     from data_lake.pipelines.lambdas.routing.handler import get_item
 
     table = _mock_dynamodb_resource.Table("octagon-Datasets-dev-prefix")
     response = get_item(table, "adtech", "datasetA")
     assert response == "insights"
+    assert get_item(table, "adtech", "unknown") is None
 
 
 def test_delete_item(_mock_dynamodb_resource):
@@ -188,9 +380,15 @@ def test_put_item(_mock_dynamodb_resource):
                'id': "s3://raw_bucket/adtech/datasetA/file"
                }
     table = _mock_dynamodb_resource.Table("octagon-ObjectMetadata-dev-prefix")
-    put_item(table, message, "id")
+    assert put_item(table, message, "id")
     assert table.item_count == 1
 
+    # the same object version is only cataloged once
+    message['object_version'] = "etag-1"
+    assert put_item(table, message, "id")
+    assert not put_item(table, message, "id")
+    assert put_item(table, dict(message, object_version="etag-2"), "id")
+
 
 def test_parse_s3_event_cloudtrail():
     s3_event = {
@@ -207,3 +207,55 @@ def test_metric_api_no_notif():
 
     assert len(sns_client.list_topics()["Topics"]) == 1  # check if topics published
     assert sns_client.list_topics()["Topics"][0]["TopicArn"] == "arn:aws:sns:us-east-1:111111111111:test_sns_topic"
+
+
+@mock_aws
+def test_metric_api_atomic_counters():
+    dynamodb_client = boto3.resource("dynamodb", region_name=os.environ["AWS_DEFAULT_REGION"])
+    table_name = "metric_table"
+    dynamodb_client.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "root", "KeyType": "HASH"}, {"AttributeName": "metric", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": "root", "AttributeType": "S"},
+                              {"AttributeName": "metric", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    sns_client = MagicMock()
+    sns_client.publish.return_value = {"MessageId": "message_id"}
+
+    mock_config = MagicMock(metric_info=[MagicMock(
+        evaluation=">=",
+        threshold=5,
+        notify="ONCE",
+        sns_topic="test_sns_topic",
+        metric_type="DAILY",
+        metric="Metric1"
+    )])
+    mock_config.get_metrics_table.return_value = table_name
+    mock_config.get_metrics_ttl.return_value = 1
+    mock_client = MagicMock(
+        dynamodb=dynamodb_client,
+        config=mock_config,
+        pipeline_execution_id="1234567890",
+        sns=sns_client,
+        region=os.environ["AWS_DEFAULT_REGION"],
+        account_id=os.environ["MOTO_ACCOUNT_ID"],
+    )
+    mock_client.is_pipeline_set.return_value = True
+    mock_client.is_sns_set.return_value = False
+
+    metric_api_cls = MetricAPI(client=mock_client)
+    metric_api_cls.metrics_table.get_item = MagicMock(side_effect=AssertionError("unexpected read"))
+    for _ in range(3):
+        assert metric_api_cls.create_metrics(date_str="2023-04-15", metric_code="Metric1", value=2)
+
+    # Every counter is incremented atomically, the metric with a threshold returns its new value
+    items = {item["metric"]: item for item in dynamodb_client.Table(table_name).scan()["Items"]}
+    assert sorted(items) == ["Metric1", "Metric1.D2023-04-15", "Metric1.M2023-04", "Metric1.Y2023"]
+    assert all(item["value"] == 6 and item["version"] == 3 and "ttl" in item for item in items.values())
+
+    # Threshold is crossed on the third increment and ONCE notifications are only sent once
+    sns_client.publish.assert_called_once()
+    assert items["Metric1.D2023-04-15"]["notification_sns_message_id"] == "message_id"
+    assert all("notification_sns_message_id" not in items[metric] for metric in [
+        "Metric1", "Metric1.Y2023", "Metric1.M2023-04"])
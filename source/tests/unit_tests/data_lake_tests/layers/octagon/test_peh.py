@@ -0,0 +1,115 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for data_lake/layers/data_lake_library/python/datalake_library/octagon/peh
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/octagon/test_peh.py
+
+
+import os
+import boto3
+import pytest
+from unittest.mock import MagicMock
+from moto import mock_aws
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon.client import OctagonClient
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon.peh import PipelineExecutionHistoryAPI
+
+
+@pytest.fixture()
+def octagon_client():
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name=os.environ["AWS_DEFAULT_REGION"])
+        for table_name, key in [("octagon-Pipelines-dev-prefix", "name"),
+                                ("octagon-PipelineExecutionHistory-dev-prefix", "id")]:
+            dynamodb.create_table(AttributeDefinitions=[{'AttributeName': key, 'AttributeType': 'S'}],
+                                  TableName=table_name,
+                                  KeySchema=[{'AttributeName': key, 'KeyType': 'HASH'}],
+                                  BillingMode='PAY_PER_REQUEST')
+        dynamodb.create_table(AttributeDefinitions=[{'AttributeName': 'peh_id', 'AttributeType': 'S'},
+                                                    {'AttributeName': 'timestamp', 'AttributeType': 'S'}],
+                              TableName="octagon-PipelineExecutionHistoryEvents-dev-prefix",
+                              KeySchema=[{'AttributeName': 'peh_id', 'KeyType': 'HASH'},
+                                         {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}],
+                              BillingMode='PAY_PER_REQUEST')
+        dynamodb.Table("octagon-Pipelines-dev-prefix").put_item(
+            Item={"name": "adtech-insights-stage-a", "status": "ACTIVE", "version": 1})
+
+        client = OctagonClient().with_configuration_instance("dev", "prefix")
+        client.dynamodb = dynamodb
+        client.config = MagicMock()
+        client.config.get_pipelines_table.return_value = "octagon-Pipelines-dev-prefix"
+        client.config.get_peh_table.return_value = "octagon-PipelineExecutionHistory-dev-prefix"
+        client.config.get_peh_ttl.return_value = 1
+        client.config.get_peh_events_table.return_value = "octagon-PipelineExecutionHistoryEvents-dev-prefix"
+        client.config.get_peh_events_ttl.return_value = 1
+        PipelineExecutionHistoryAPI.pipelines.clear()
+        yield client
+
+
+def test_update_pipeline_execution_without_reads(octagon_client):
+    peh_id = octagon_client.start_pipeline_execution("adtech-insights-stage-a")
+    start_timestamp = octagon_client.pipeline_start_timestamp
+
+    # Next step of the pipeline only carries the execution id and start timestamp
+    octagon_client.reset_pipeline_execution()
+    octagon_client.set_pipeline_execution(peh_id, "adtech-insights-stage-a", start_timestamp)
+    api = PipelineExecutionHistoryAPI(octagon_client)
+    api.peh_table.get_item = MagicMock(side_effect=AssertionError("unexpected read"))
+    api.pipelines_table.get_item = MagicMock(side_effect=AssertionError("unexpected read"))
+
+    assert api.update_pipeline_execution("StageA Process Processing", component="Process")
+    assert api.update_pipeline_execution("COMPLETED")
+
+    item = octagon_client.dynamodb.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()["Items"][0]
+    assert item["version"] == 3
+    assert item["active"] is False
+    assert item["success"] is True
+    assert item["status"] == "COMPLETED"
+    assert item["start_timestamp"] == start_timestamp
+    assert "duration_in_seconds" in item
+    assert "history" not in item
+
+    events = octagon_client.get_pipeline_execution_history(peh_id)
+    assert [event["status"] for event in events] == ["STARTED", "StageA Process Processing", "COMPLETED"]
+    assert [event["version"] for event in events] == [1, 2, 3]
+    assert events[1]["component"] == "Process"
+
+    pipeline = octagon_client.dynamodb.Table("octagon-Pipelines-dev-prefix").get_item(
+        Key={"name": "adtech-insights-stage-a"})["Item"]
+    assert pipeline["version"] == 2
+    assert pipeline["last_execution_id"] == peh_id
+
+    with pytest.raises(ValueError, match="not active"):
+        api.update_pipeline_execution("FAILED")
+
+
+def test_update_pipeline_execution_without_start_timestamp(octagon_client):
+    peh_id = octagon_client.start_pipeline_execution("adtech-insights-stage-a")
+    octagon_client.set_pipeline_execution(peh_id, "adtech-insights-stage-a")
+
+    assert octagon_client.end_pipeline_execution_failed(component="Process", issue_comment="error")
+
+    item = octagon_client.dynamodb.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()["Items"][0]
+    assert item["status"] == "FAILED"
+    assert item["issue_comment"] == "error"
+    assert "duration_in_seconds" in item
+
+
+def test_update_unknown_pipeline_execution(octagon_client):
+    octagon_client.set_pipeline_execution("unknown", "adtech-insights-stage-a", "2023-05-23T02:24:47.369Z")
+    with pytest.raises(ValueError, match="not active"):
+        octagon_client.update_pipeline_execution("StageA Process Processing", component="Process")
+
+
+def test_update_pipeline_execution_without_events_table(octagon_client):
+    octagon_client.config.get_peh_events_table.return_value = None
+    peh_id = octagon_client.start_pipeline_execution("adtech-insights-stage-a")
+
+    assert octagon_client.update_pipeline_execution("StageA Process Processing", component="Process")
+
+    item = octagon_client.dynamodb.Table("octagon-PipelineExecutionHistory-dev-prefix").scan()["Items"][0]
+    assert [history["status"] for history in item["history"]] == ["STARTED", "StageA Process Processing"]
+    assert octagon_client.get_pipeline_execution_history(peh_id) == item["history"]
+    assert octagon_client.dynamodb.Table("octagon-PipelineExecutionHistoryEvents-dev-prefix").item_count == 0
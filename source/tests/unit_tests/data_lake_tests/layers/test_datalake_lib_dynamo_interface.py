@@ -0,0 +1,89 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library DynamoInterface object metadata index queries.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_dynamo_interface.py
+
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.interfaces.dynamo_interface import \
+    DynamoInterface
+
+
+@pytest.fixture()
+def dynamo_interface():
+    with mock_aws():
+        ddb = boto3.resource('dynamodb', 'us-east-1')
+        ddb.create_table(
+            TableName='octagon-ObjectMetadata-dev-prefix',
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'},
+                                  {'AttributeName': 'dataset', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'dataset-index',
+                'KeySchema': [{'AttributeName': 'dataset', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            }],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        with ddb.Table('octagon-ObjectMetadata-dev-prefix').batch_writer() as batch:
+            for dataset, count in [('amc', 30), ('ads_report', 5), ('sp_report', 0)]:
+                for i in range(count):
+                    batch.put_item(Item={
+                        'id': 's3://stage_bucket/{}/file-{}'.format(dataset, i),
+                        'dataset': dataset,
+                        'stage': 'pre-stage' if i % 2 else 'raw',
+                        'size': i
+                    })
+        configuration = Mock(object_metadata_table='octagon-ObjectMetadata-dev-prefix',
+                             transform_mapping_table='octagon-Datasets-dev-prefix')
+        yield DynamoInterface(configuration, dynamodb_resource=ddb)
+
+
+def test_query_object_metadata_index(dynamo_interface):
+    items = dynamo_interface.query_object_metadata_index('dataset-index', 'dataset', 'amc', 'stage', 'pre-stage', 10)
+
+    assert len(items) == 10
+    assert all(item['stage'] == 'pre-stage' for item in items)
+
+
+def test_iter_object_metadata_index(dynamo_interface):
+    # size is a reserved word, projected through an attribute name
+    items = list(dynamo_interface.iter_object_metadata_index(
+        'dataset-index', 'dataset', 'amc', projection=['id', 'size'], page_size=4))
+
+    assert len(items) == 30
+    assert set(items[0]) == {'id', 'size'}
+
+    # the pages are read as the items are consumed
+    table = dynamo_interface.object_metadata_table
+    table.query = Mock(wraps=table.query)
+    items = dynamo_interface.iter_object_metadata_index('dataset-index', 'dataset', 'amc', page_size=4, limit=6)
+    assert next(items)['dataset'] == 'amc'
+    assert table.query.call_count == 1
+    assert len(list(items)) == 5
+    assert table.query.call_count == 2
+
+
+def test_iter_object_metadata_index_partitions(dynamo_interface):
+    items = list(dynamo_interface.iter_object_metadata_index_partitions(
+        'dataset-index', 'dataset', ['amc', 'ads_report', 'sp_report'], projection=['id'], max_workers=2))
+
+    assert sorted(key_value for key_value, _ in items) == ['ads_report'] * 5 + ['amc'] * 30
+    assert {'s3://stage_bucket/ads_report/file-4'} <= {item['id'] for _, item in items}
+
+    # closing the generator stops the queries
+    items = dynamo_interface.iter_object_metadata_index_partitions(
+        'dataset-index', 'dataset', ['amc', 'ads_report'], limit=3)
+    next(items)
+    items.close()
+
+    with pytest.raises(ClientError):
+        list(dynamo_interface.iter_object_metadata_index_partitions('missing-index', 'dataset', ['amc']))
@@ -0,0 +1,105 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library FairShareScheduler.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_fair_share.py
+
+from unittest.mock import Mock
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.fair_share import FairShareScheduler
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.interfaces.sqs_interface import SQSInterface
+
+
+def _key(customer_hash, table, index):
+    return 'pre-stage/adtech/amc/{}/customer_hash={}/export_year=2024/export_month=01/file-{}.json'.format(
+        table, customer_hash, index)
+
+
+def test_get_share():
+    assert FairShareScheduler.get_share(_key('abc', 'table_wf_daily', 1)) == ('abc', 'table_wf_daily')
+    assert FairShareScheduler.get_share('pre-stage/adtech/ads_report/report_table/report-1.json') == \
+        ('', 'report_table')
+    assert FairShareScheduler.get_share('object-key') == ('', '')
+
+
+def test_select_round_robin():
+    # a customer backfilling two tables ahead of two daily results
+    keys = [_key('big', 'table_1', i) for i in range(10)] + [_key('big', 'table_2', i) for i in range(10)] + \
+        [_key('small', 'table_1', 0), _key('other', 'table_1', 0)]
+    scheduler = FairShareScheduler(max_items_per_customer=0, customers={}, lookahead=5)
+
+    selected = scheduler.select(keys, 6)
+
+    assert [keys[position] for position in selected] == [
+        _key('big', 'table_1', 0), _key('big', 'table_1', 1), _key('big', 'table_2', 0), _key('big', 'table_2', 1),
+        _key('small', 'table_1', 0), _key('other', 'table_1', 0)
+    ]
+    # without competition the batch is filled
+    assert scheduler.select(keys[:20], 6) == [0, 1, 2, 10, 11, 12]
+
+
+def test_select_weights_and_caps():
+    keys = [_key('big', 'table_1', i) for i in range(10)] + [_key('small', 'table_1', i) for i in range(10)]
+    scheduler = FairShareScheduler(max_items_per_customer=3, customers={'small': {'weight': 2, 'max_items': 5}},
+                                   lookahead=5)
+
+    selected = scheduler.select(keys, 10)
+
+    assert [keys[position] for position in selected] == \
+        [_key('big', 'table_1', i) for i in range(3)] + [_key('small', 'table_1', i) for i in range(5)]
+
+
+def test_message_group_id():
+    assert FairShareScheduler.get_message_group_id('adtech-amc', _key('abc', 'table_1', 0)) == 'adtech-amc-abc'
+    assert FairShareScheduler.get_message_group_id('adtech-amc', 'pre-stage/adtech/amc/table_1/file.json') == \
+        'adtech-amc'
+
+
+def test_receive_fair_share_messages():
+    with mock_aws():
+        sqs = boto3.resource('sqs', 'us-east-1')
+        queue = sqs.create_queue(QueueName='stage_b_queue_name.fifo', Attributes={
+            'FifoQueue': 'true', 'ContentBasedDeduplication': 'true'})
+        queue_interface = SQSInterface('stage_b_queue_name.fifo', sqs_resource=sqs)
+        queue_interface.send_fair_share_messages_to_fifo_queue(
+            [_key('big', 'table_1', i) for i in range(25)] + [_key('small', 'table_1', 0)], 10, 'adtech-amc')
+        scheduler = FairShareScheduler(max_items_per_customer=5, customers={}, lookahead=10)
+
+        assert queue_interface.receive_fair_share_messages(30, 10, scheduler) == []
+        messages = queue_interface.receive_fair_share_messages(1, 10, scheduler)
+
+        assert messages == [_key('big', 'table_1', i) for i in range(5)] + [_key('small', 'table_1', 0)]
+        # only the picked messages are deleted, the others keep their place ahead of newer messages
+        queue_interface.send_fair_share_messages_to_fifo_queue([_key('big', 'table_1', 25)], 10, 'adtech-amc')
+        queue.reload()
+        assert queue.attributes['ApproximateNumberOfMessages'] == '21'
+        received = queue.receive_messages(MaxNumberOfMessages=10, AttributeNames=['MessageGroupId'])
+        assert [message.body for message in received] == [_key('big', 'table_1', i) for i in range(5, 15)]
+        assert received[0].attributes['MessageGroupId'] == 'adtech-amc-big'
+
+
+def test_receive_fair_share_messages_release_fail():
+    with mock_aws():
+        sqs = boto3.resource('sqs', 'us-east-1')
+        queue = sqs.create_queue(QueueName='stage_b_queue_name.fifo', Attributes={'FifoQueue': 'true'})
+        for index in range(25):
+            queue.send_message(MessageBody=_key('big', 'table_1', index), MessageGroupId='adtech-amc-big',
+                               MessageDeduplicationId=str(index))
+        queue_interface = SQSInterface('stage_b_queue_name.fifo', sqs_resource=sqs)
+        queue_interface._message_queue.change_message_visibility_batch = Mock(
+            side_effect=ClientError({'Error': {'Code': 'ThrottlingException'}}, 'ChangeMessageVisibilityBatch'))
+        scheduler = FairShareScheduler(max_items_per_customer=5, customers={}, lookahead=10)
+
+        assert queue_interface.receive_fair_share_messages(1, 5, scheduler) == \
+            [_key('big', 'table_1', i) for i in range(5)]
+
+        # the messages which could not be released stay in the queue until their visibility timeout
+        queue.reload()
+        assert queue.attributes['ApproximateNumberOfMessagesNotVisible'] == '5'
+        assert queue.attributes['ApproximateNumberOfMessages'] == '15'
@@ -0,0 +1,84 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library DLQRedrive.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_redrive.py
+
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library import redrive
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.redrive import DLQRedrive
+
+
+class FakeDLQ:
+    def __init__(self, count):
+        self.messages = [Mock(message_id=str(i), body='body-{}'.format(i)) for i in range(count)]
+        self.received = []
+        self.deleted = []
+
+    def receive_message_batch(self, max_num_messages, wait_time_seconds):
+        batch = [message for message in self.messages if message not in self.received][:max_num_messages]
+        self.received.extend(batch)
+        return batch
+
+    def delete_message_batch(self, messages):
+        self.deleted.extend(messages)
+        return set()
+
+
+@pytest.fixture()
+def _mock_time(monkeypatch):
+    clock = MagicMock()
+    clock.monotonic.return_value = 100.0
+    clock.sleep.side_effect = lambda seconds: setattr(clock.monotonic, 'return_value',
+                                                      clock.monotonic.return_value + seconds)
+    monkeypatch.setattr(redrive, 'time', clock)
+    return clock
+
+
+def test_redrive_batches(_mock_time):
+    dlq = FakeDLQ(25)
+    batches = []
+
+    def redrive_batch(messages):
+        batches.append(messages)
+        return {'3'} & set(messages)
+
+    response = DLQRedrive(dlq, redrive_batch, rate=5).run()
+
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert batches[0]['0'] == 'body-0'
+    # failed messages stay in the queue
+    assert len(dlq.deleted) == 24 and dlq.messages[3] not in dlq.deleted
+    assert response == {'redriven': 24, 'failed': 1, 'drained': False}
+    # 24 messages at 5 per second
+    assert _mock_time.monotonic.return_value == pytest.approx(100.0 + 24 / 5)
+
+
+def test_redrive_max_in_flight(_mock_time):
+    dlq = FakeDLQ(30)
+    in_flight = Mock(side_effect=[8, 10, 10, 0, 0, 0, 0])
+    context = Mock(get_remaining_time_in_millis=Mock(return_value=60000))
+
+    response = DLQRedrive(dlq, lambda messages: set(), rate=0, max_in_flight=10, in_flight=in_flight).run(context)
+
+    # 2 messages then waits twice for capacity, and 10, 10, 8 messages once capacity is back
+    assert response == {'redriven': 30, 'failed': 0, 'drained': True}
+    assert [call.args[0] for call in _mock_time.sleep.call_args_list] == [redrive.REDRIVE_IN_FLIGHT_POLL_SECONDS] * 2
+
+    with pytest.raises(ValueError):
+        DLQRedrive(dlq, lambda messages: set(), max_in_flight=10)
+
+
+def test_redrive_deadline(_mock_time):
+    dlq = FakeDLQ(100)
+    context = Mock(get_remaining_time_in_millis=Mock(return_value=(redrive.REDRIVE_TIME_MARGIN_SECONDS + 3) * 1000))
+
+    response = DLQRedrive(dlq, lambda messages: set(), rate=10).run(context)
+
+    # stops when the time left is used by the rate limit
+    assert response == {'redriven': 30, 'failed': 0, 'drained': False}
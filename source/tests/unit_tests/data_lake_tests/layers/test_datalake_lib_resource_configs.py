@@ -0,0 +1,55 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library configuration SSM parameters cache.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_resource_configs.py
+
+import boto3
+from moto import mock_aws
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.configuration import (
+    DynamoConfiguration, KMSConfiguration, SQSConfiguration, clear_ssm_parameters_cache
+)
+
+
+def _put_parameters(ssm):
+    ssm.put_parameter(Name="/prefix/DynamoDB/ObjectMetadata", Value="octagon-ObjectMetadata-dev-prefix", Type="String")
+    ssm.put_parameter(Name="/prefix/KMS/StageBucketKeyArn", Value="stage_key_arn", Type="String")
+    ssm.put_parameter(Name="/prefix/SQS/adtech/datasetStageBQueue", Value="queue-b.fifo", Type="String")
+    ssm.put_parameter(Name="/other/S3/StageBucket", Value="other_bucket", Type="String")
+
+
+@mock_aws
+def test_ssm_parameters_cache(monkeypatch):
+    ssm = boto3.client("ssm", "us-east-1")
+    _put_parameters(ssm)
+
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "octagon-ObjectMetadata-dev-prefix"
+    ssm.put_parameter(Name="/prefix/DynamoDB/ObjectMetadata", Value="new_table", Type="String", Overwrite=True)
+    # Served from the process cache until it expires or is cleared
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "octagon-ObjectMetadata-dev-prefix"
+
+    clear_ssm_parameters_cache()
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "new_table"
+
+    monkeypatch.setenv("SSM_PARAMETERS_CACHE_TTL", "0")
+    clear_ssm_parameters_cache()
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "new_table"
+    ssm.put_parameter(Name="/prefix/DynamoDB/ObjectMetadata", Value="newest_table", Type="String", Overwrite=True)
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "newest_table"
+
+
+@mock_aws
+def test_ssm_parameters_prefetch(monkeypatch):
+    monkeypatch.setenv("SSM_PARAMETERS_PREFETCH", "true")
+    ssm = boto3.client("ssm", "us-east-1")
+    _put_parameters(ssm)
+
+    assert KMSConfiguration("prefix", "Stage", ssm_interface=ssm).get_kms_arn == "stage_key_arn"
+    # Parameters under the same prefix were loaded by the first lookup
+    ssm.delete_parameter(Name="/prefix/SQS/adtech/datasetStageBQueue")
+    assert SQSConfiguration("prefix", "adtech", "dataset", "StageB",
+                            ssm_interface=ssm).get_stage_queue_name == "queue-b.fifo"
+    assert DynamoConfiguration("prefix", ssm_interface=ssm).object_metadata_table == "octagon-ObjectMetadata-dev-prefix"
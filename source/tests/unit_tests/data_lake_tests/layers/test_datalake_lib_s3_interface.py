@@ -0,0 +1,75 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library S3Interface object reads.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_s3_interface.py
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.interfaces.s3_interface import S3Interface
+
+
+@pytest.fixture()
+def s3_interface():
+    with mock_aws():
+        s3_resource = boto3.resource("s3", "us-east-1")
+        s3_resource.create_bucket(Bucket="stage_bucket")
+        s3_resource.Object("stage_bucket", "records.json").put(Body=b'{"a": 1}\r\n\n{"a": 2}\n{"a": 3}')
+        yield S3Interface(s3_client=boto3.client("s3", "us-east-1"), s3_resource=s3_resource)
+
+
+def test_read_object(s3_interface):
+    assert s3_interface.read_object("stage_bucket", "records.json").read() == '{"a": 1}\n\n{"a": 2}\n{"a": 3}\n'
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"chunk_size": 3}, {"buffered": True}])
+def test_iter_object_lines(s3_interface, kwargs):
+    lines = s3_interface.iter_object_lines("stage_bucket", "records.json", **kwargs)
+    assert list(lines) == ['{"a": 1}', '', '{"a": 2}', '{"a": 3}']
+
+
+def test_iter_object_records(s3_interface):
+    records = s3_interface.iter_object_records("stage_bucket", "records.json", chunk_size=4)
+    assert next(records) == {"a": 1}
+    assert [record["a"] for record in records] == [2, 3]
+
+
+def test_read_object_range(s3_interface):
+    assert s3_interface.read_object_range("stage_bucket", "records.json", 0, 7) == b'{"a": 1}'
+    assert s3_interface.read_object_range("stage_bucket", "records.json", 20) == b'{"a": 3}'
+
+
+def test_copy_and_head_objects(s3_interface):
+    results, errors = s3_interface.copy_objects("stage_bucket", ["records.json", "missing.json"], "stage_bucket",
+                                                dest_keys={"records.json": "copy/records.json"})
+    assert results == {"records.json": "copy/records.json"}
+    assert list(errors) == ["missing.json"]
+
+    results, errors = s3_interface.head_objects("stage_bucket", ["records.json", "copy/records.json"])
+    assert not errors
+    assert results["copy/records.json"]["size"] == results["records.json"]["size"] == 28
+
+
+def test_upload_objects(s3_interface, tmp_path):
+    object_path = tmp_path / "object.csv"
+    object_path.write_text("a,b\n")
+
+    results, errors = s3_interface.upload_objects({str(object_path): "upload/object.csv"}, "stage_bucket")
+    assert results == {"upload/object.csv": str(object_path)}
+    assert not errors
+    assert s3_interface.read_object("stage_bucket", "upload/object.csv").read() == "a,b\n"
+
+
+def test_write_and_read_manifest(s3_interface):
+    results, errors = s3_interface.head_objects("stage_bucket", ["records.json"])
+    entries = [{key: results["records.json"][key] for key in ["key", "size", "etag"]}]
+    assert entries[0]["etag"] and '"' not in entries[0]["etag"]
+
+    manifest_uri = s3_interface.write_manifest("stage_bucket", "manifests/adtech/amc/batch.json", "stage_bucket",
+                                               entries)
+    assert manifest_uri == "s3://stage_bucket/manifests/adtech/amc/batch.json"
+    assert s3_interface.read_manifest(manifest_uri) == {"bucket": "stage_bucket", "entries": entries}
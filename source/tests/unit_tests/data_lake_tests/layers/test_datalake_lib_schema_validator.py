@@ -0,0 +1,96 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for datalake_library ParquetSchemaValidator.
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/test_datalake_lib_schema_validator.py
+
+import sys
+from unittest.mock import MagicMock, Mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+COLUMNS = [{'Name': 'customer_hash', 'Type': 'string'}, {'Name': 'impressions', 'Type': 'bigint'}]
+
+
+@pytest.fixture()
+def schema_validator():
+    sys.modules['awswrangler'] = MagicMock()
+    from data_lake.lambda_layers.data_lake_library.python.datalake_library.data_quality import schema_validator
+    schema_validator._footer_schema_cache.clear()
+    return schema_validator
+
+
+@pytest.fixture()
+def validator(schema_validator):
+    with mock_aws():
+        s3 = boto3.client('s3', 'us-east-1')
+        s3.create_bucket(Bucket='stage_bucket')
+        for i in range(3):
+            s3.put_object(Bucket='stage_bucket', Key='post-stage/adtech/amc/table/file-{}.parquet'.format(i),
+                          Body='content-{}'.format(i))
+        s3.put_object(Bucket='stage_bucket', Key='post-stage/adtech/amc/table/empty.parquet', Body='')
+
+        validator = schema_validator.ParquetSchemaValidator(max_workers=2)
+        validator.s3_client = s3
+        validator.glue_client = Mock()
+        validator.glue_client.get_table.return_value = {'Table': {
+            'Parameters': {'validate_schema': 'true'},
+            'StorageDescriptor': {'Columns': COLUMNS}
+        }}
+        yield validator
+
+
+def _read_parquet_metadata(column_types_by_path):
+    return Mock(side_effect=lambda path, boto3_session: (column_types_by_path.get(
+        path, {'CUSTOMER_HASH': 'string', 'impressions': 'bigint'}), {}))
+
+
+def test_validate_cached_footers(schema_validator, validator):
+    read_parquet_metadata = _read_parquet_metadata({})
+    schema_validator.wr.s3.read_parquet_metadata = read_parquet_metadata
+    prefix = 's3://stage_bucket/post-stage/adtech/amc/table/'
+
+    assert validator.validate(prefix, None, 'database', 'table')
+    # empty objects are skipped
+    assert sorted(call.kwargs['path'] for call in read_parquet_metadata.call_args_list) == [
+        prefix + 'file-{}.parquet'.format(i) for i in range(3)]
+
+    # only the footers of new objects are read again
+    validator.s3_client.put_object(Bucket='stage_bucket', Key='post-stage/adtech/amc/table/file-3.parquet',
+                                   Body='content-3')
+    read_parquet_metadata.reset_mock()
+    assert validator.validate(prefix, None, 'database', 'table')
+    assert [call.kwargs['path'] for call in read_parquet_metadata.call_args_list] == [prefix + 'file-3.parquet']
+
+
+def test_validate_batch_keys(schema_validator, validator):
+    prefix = 's3://stage_bucket/post-stage/adtech/amc/table/'
+    # the new object adds a column to the schema
+    read_parquet_metadata = _read_parquet_metadata(
+        {prefix + 'file-2.parquet': {'customer_hash': 'string', 'impressions': 'bigint', 'clicks': 'bigint'}})
+    schema_validator.wr.s3.read_parquet_metadata = read_parquet_metadata
+
+    assert validator.validate(None, [prefix + 'file-0.parquet', prefix + 'file-1.parquet'], 'database', 'table')
+    assert not validator.validate(None, [prefix + 'file-2.parquet'], 'database', 'table')
+    assert read_parquet_metadata.call_count == 3
+
+
+def test_validate_conflicting_types(schema_validator, validator):
+    prefix = 's3://stage_bucket/post-stage/adtech/amc/table/'
+    schema_validator.wr.s3.read_parquet_metadata = _read_parquet_metadata(
+        {prefix + 'file-1.parquet': {'customer_hash': 'string', 'impressions': 'string'}})
+
+    assert not validator.validate(prefix, None, 'database', 'table')
+    assert validator._get_object_schema(prefix, None, False) == [
+        {'Name': 'customer_hash', 'Type': 'string'}, {'Name': 'impressions', 'Type': 'bigint'},
+        {'Name': 'impressions', 'Type': 'string'}]
+
+    # the latest object only
+    validator.glue_client.get_table.return_value['Table']['Parameters']['validate_latest'] = 'true'
+    validator.s3_client.put_object(Bucket='stage_bucket', Key='post-stage/adtech/amc/table/file-3.parquet',
+                                   Body='content-3')
+    assert validator.validate(prefix, None, 'database', 'table')
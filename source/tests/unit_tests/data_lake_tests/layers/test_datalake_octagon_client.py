@@ -1,6 +1,9 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+from unittest.mock import Mock
+
+from aws_solutions.core.helpers import get_service_client, _helpers_service_clients
 from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon.client import OctagonClient
 
 def test_octagon_client():
@@ -22,3 +25,26 @@ def test_octagon_client():
     client.with_configuration_instance("configuration_instance", "resource_prefix")
     assert client.configuration_instance == "configuration_instance"
     assert client.resource_prefix == "resource_prefix"
+
+
+def test_octagon_client_build_cache(monkeypatch):
+    sts_client = get_service_client('sts')
+    sts_client.get_caller_identity = Mock(return_value={'Account': 'account_id'})
+    monkeypatch.setitem(_helpers_service_clients, 'sts', sts_client)
+
+    client = OctagonClient().with_run_lambda(True).with_configuration_instance("dev", "prefix").build()
+    client.set_pipeline_execution("peh_id", "pipeline")
+    other_client = OctagonClient().with_run_lambda(True).with_configuration_instance("dev", "prefix").build()
+
+    sts_client.get_caller_identity.assert_called_once()
+    assert other_client.config is client.config
+    assert other_client.meta is client.meta
+    assert other_client.account_id == "account_id"
+    assert not other_client.is_pipeline_set()
+
+    OctagonClient().with_run_lambda(True).with_configuration_instance("test", "prefix").build()
+    assert sts_client.get_caller_identity.call_count == 2
+
+    OctagonClient.clear_cache()
+    OctagonClient().with_run_lambda(True).with_configuration_instance("dev", "prefix").build()
+    assert sts_client.get_caller_identity.call_count == 3
@@ -1,53 +1,76 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-import itertools
 from unittest.mock import MagicMock
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
 from pytest import fixture
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon import dynamodb as octagon_dynamodb
 from data_lake.lambda_layers.data_lake_library.python.datalake_library.octagon.dynamodb import clean_table
 
 
 @fixture
 def dynamodb_service():
-    table = MagicMock()
-    table.scan = MagicMock()
-    table.scan.side_effect = [{
-        "Count": 1,
-        "Items": [{
-            "id": {}, "dd": {}
-        }]
-    }, {
-        "Count": 0
-    }]
-    writer = MagicMock()
-    writer.delete_item = MagicMock()
-    writer.delete_item.side_effect = itertools.repeat(True)
-    table.batch_writer = MagicMock()
-    table.batch_writer.side_effect = itertools.repeat(writer)
-    dynamodb = MagicMock()
-    dynamodb.Table = MagicMock()
-    dynamodb.Table.side_effect = itertools.repeat(table)
-    return dynamodb
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", "us-east-1")
+        dynamodb.create_table(
+            TableName="mock_table",
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        dynamodb.create_table(
+            TableName="mock_table_sk",
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"},
+                                  {"AttributeName": "timestamp", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}, {"AttributeName": "timestamp", "KeyType": "RANGE"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with dynamodb.Table("mock_table").batch_writer() as batch:
+            for i in range(120):
+                batch.put_item(Item={"id": str(i), "payload": "x" * 10})
+        with dynamodb.Table("mock_table_sk").batch_writer() as batch:
+            for i in range(60):
+                batch.put_item(Item={"id": str(i % 3), "timestamp": str(i)})
+        yield dynamodb
 
 
 def test_dynamodb_clean_table_pk(dynamodb_service):
-    table_name = "mock_table"
-    pk_name = "id"
-    clean_table(dynamodb_service, table_name, pk_name)
-    table = dynamodb_service.Table
-    table.assert_called_once_with("mock_table")
-    table().scan.assert_called()
-    batch_writer = table().batch_writer
-    batch_writer.assert_called()
+    progress = []
+
+    assert clean_table(dynamodb_service, "mock_table", "id", total_segments=4, progress=progress.append) == 120
+
+    assert dynamodb_service.Table("mock_table").scan()["Count"] == 0
+    assert progress[-1] == 120
 
 
 def test_dynamodb_clean_table_sk(dynamodb_service):
-    table_name = "mock_table"
-    pk_name = "id"
-    sk_name = "dd"
-    clean_table(dynamodb_service, table_name, pk_name, sk_name)
-    table = dynamodb_service.Table
-    table.assert_called_once_with("mock_table")
-    table().scan.assert_called()
-    batch_writer = table().batch_writer
-    batch_writer.assert_called()
+    # timestamp is a reserved word, keys are projected through attribute names
+    assert clean_table(dynamodb_service, "mock_table_sk", "id", "timestamp", total_segments=2) == 60
+
+    assert dynamodb_service.Table("mock_table_sk").scan()["Count"] == 0
+
+
+def test_dynamodb_clean_table_backoff(monkeypatch):
+    monkeypatch.setattr(octagon_dynamodb.time, "sleep", MagicMock())
+    throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "BatchWriteItem")
+    key = {"id": {"S": "1"}}
+    client = MagicMock()
+    client.scan.return_value = {"Items": [key]}
+    client.batch_write_item.side_effect = [
+        throttled,
+        {"UnprocessedItems": {"mock_table": [{"DeleteRequest": {"Key": key}}]}},
+        {"UnprocessedItems": {}}
+    ]
+    dynamodb = MagicMock()
+    dynamodb.meta.client = client
+
+    assert clean_table(dynamodb, "mock_table", "id", total_segments=1) == 1
+    assert client.batch_write_item.call_count == 3
+    assert octagon_dynamodb.time.sleep.call_count == 2
+
+    client.batch_write_item.side_effect = ClientError({"Error": {"Code": "ValidationException"}}, "BatchWriteItem")
+    with pytest.raises(ClientError):
+        clean_table(dynamodb, "mock_table", "id", total_segments=1)
@@ -97,6 +97,43 @@ class TestCustomTransform(unittest.TestCase):
         # assert that UI analytics queries are ignored and not processed
         assert test_response == []
         
+    @patch.dict('sys.modules', {'awswrangler': MagicMock()})
+    @patch('awswrangler.catalog.sanitize_table_name', return_value=MOCK_TABLE_NAME)
+    def test_transform_object_zero_copy(self, mock_sanitize_table_name):
+        from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms import \
+            amc_light_transform
+        s3_object = MagicMock(content_length=5000)
+        s3_object.last_modified.isoformat.return_value = "2024-01-01T01:02:03+00:00"
+        config_table = MagicMock()
+        config_table.query.return_value = {"Items": [{"prefix": "AMC", "customer_hash_key": "HASH"}]}
+        with patch.object(amc_light_transform, 's3') as mock_s3, \
+             patch.object(amc_light_transform, 's3_interface') as mock_s3_interface, \
+             patch.object(amc_light_transform, 'ssm') as mock_ssm, \
+             patch.object(amc_light_transform, 'dynamodb') as mock_dynamodb, \
+             patch.object(amc_light_transform, 'wr') as mock_wr, \
+             patch.object(amc_light_transform, 'S3Configuration') as mock_s3_configuration, \
+             patch.object(amc_light_transform, 'KMSConfiguration') as mock_kms_configuration:
+            mock_s3.Object.return_value = s3_object
+            mock_ssm.get_parameter.return_value = {'Parameter': {'Value': "customer-config"}}
+            mock_dynamodb.Table.return_value = config_table
+            mock_wr.catalog.sanitize_table_name.return_value = MOCK_TABLE_NAME
+            mock_s3_configuration.return_value.stage_bucket = MOCK_STAGE_BUCKET
+            mock_kms_configuration.return_value.get_kms_arn = MOCK_KMS_KEY
+
+            key = "workflow=geo_summary/schedule=adhoc/2024-01-01T01:01:00.000Z-geo_summary.csv"
+            test_response = amc_light_transform.CustomTransform().transform_object(
+                "test-prefix", "source-bucket", key, MOCK_TEAM, MOCK_DATASET)
+
+        # the file is copied server side without being read into the Lambda
+        assert len(test_response) == 1
+        s3_object.get.assert_not_called()
+        mock_s3_interface.copy_object.assert_called_once()
+        args, kwargs = mock_s3_interface.copy_object.call_args
+        assert args == ("source-bucket", key, MOCK_STAGE_BUCKET, test_response[0])
+        assert kwargs["kms_key"] == MOCK_KMS_KEY
+        assert kwargs["metadata"]["workflowName"] == "geo_summary"
+        assert kwargs["metadata"]["fileTimestamp"] == "2024-01-01T01-01-00-000Z"
+
     @patch.dict('sys.modules', {'awswrangler': MagicMock()})
     @patch('awswrangler.catalog.sanitize_table_name', return_value=MOCK_TABLE_NAME)  
     def test_get_table_prefix(self, mock_sanitize_table_name):
@@ -73,7 +73,7 @@ class TestCustomTransform(unittest.TestCase):
             dataset = "ads_report"
             
             # run the function code
-            CustomTransform().transform_object(resource_prefix, bucket, keys, team, dataset)
+            response = CustomTransform().transform_object(resource_prefix, bucket, keys, team, dataset)
         
         # capture some values passed to start_execution and assert them below
         _, kwargs = self.mock_glue_client.start_job_run.call_args
@@ -83,6 +83,30 @@ class TestCustomTransform(unittest.TestCase):
         assert kwargs['Arguments']['--DATABASE_NAME'] == MOCK_DATABASE_NAME
         assert kwargs['Arguments']['--STAGE_BUCKET'] == bucket
         assert kwargs['Arguments']['--JOB_NAME'] == MOCK_GLUE_JOB_NAME
+        # inline batches carry their tables in the job details
+        assert len(response['jobDetails']['tables']) == 1
+
+    @patch.dict('sys.modules', {'awswrangler': MagicMock()})
+    def test_transform_object_manifest(self):
+        awswrangler = sys.modules['awswrangler']
+        awswrangler.catalog.sanitize_table_name.side_effect = lambda table_name: table_name
+        with patch('datalake_library.configuration.resource_configs.KMSConfiguration.get_kms_arn') as mock_get_kms_arn:
+            mock_get_kms_arn.return_value = "mock-arn"
+            from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_b_transforms.default_heavy_transform import CustomTransform
+
+            keys = ["pre-stage/adtech/amc/workflow/customer_hash=1/file-{}.csv".format(i) for i in range(3)]
+            manifest_uri = "s3://XXXXXXXXXXX/manifests/adtech/amc/batch.json"
+            response = CustomTransform().transform_object("test-prefix", "XXXXXXXXXXX", keys, "adtech", "amc",
+                                                          manifest_uri=manifest_uri)
+
+        # the job reads its keys from the manifest instead of the arguments
+        _, kwargs = self.mock_glue_client.start_job_run.call_args
+        assert kwargs['Arguments']['--SOURCE_MANIFEST'] == manifest_uri
+        assert '--SOURCE_LOCATIONS' not in kwargs['Arguments']
+        assert kwargs['Arguments']['--SOURCE_LOCATION'] == "s3://XXXXXXXXXXX/{}".format(keys[0])
+        # the tables of a manifest batch are read from the manifest by the post-update step
+        assert 'tables' not in response['jobDetails']
+
         
 if __name__ == '__main__':
     unittest.main()
@@ -7,6 +7,7 @@
 #   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/transforms/test_reports_light_transform.py
 
 import os
+import gzip
 from io import BytesIO
 import sys
 import json
@@ -46,33 +47,108 @@ class TestCustomTransform(unittest.TestCase):
     def setUp(self, mock_get_service_resource):   
         self.mock_s3_resource = mock_s3_resource()
         
-    @patch.dict('sys.modules', {'awswrangler': MagicMock()})
-    @patch('awswrangler.catalog.sanitize_table_name', return_value=MOCK_TABLE_NAME)  
-    def test_transform_object(self, mock_sanitize_table_name):
-        awswrangler = sys.modules['awswrangler']
-        awswrangler.mock_sanitize_table_name = awswrangler.catalog.sanitize_table_name
-        with patch('datalake_library.configuration.resource_configs.KMSConfiguration.get_kms_arn') as mock_get_kms_arn, \
-             patch('datalake_library.configuration.resource_configs.S3Configuration.stage_bucket') as mock_stage_bucket, \
-             patch('data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms.reports_light_transform.CustomTransform.read_gzip', return_value=json.dumps({"test": "test"})):
-            mock_get_kms_arn.return_value = MOCK_KMS_KEY
-            mock_stage_bucket.return_value = MOCK_STAGE_BUCKET
-            from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms.reports_light_transform import CustomTransform
-            
-            # set up our test function input
-            resource_prefix = "test-prefix"
-            bucket = "XXXXXXXXXXX"
-            table_name = MOCK_TABLE_NAME
-            file_name = "report-123"
+    def _transform_object(self, body, file_extension="json.gz"):
+        from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms import \
+            reports_light_transform
+        s3_object = MagicMock()
+        s3_object.get.return_value = {'Body': BytesIO(body), 'Metadata': {'timestamp': "2024-01-01T00:00:00"}}
+        with patch.object(reports_light_transform, 's3') as mock_s3, \
+             patch.object(reports_light_transform, 's3_interface') as mock_s3_interface, \
+             patch.object(reports_light_transform, 'wr') as mock_wr, \
+             patch.object(reports_light_transform, 'S3Configuration') as mock_s3_configuration, \
+             patch.object(reports_light_transform, 'KMSConfiguration') as mock_kms_configuration:
+            mock_s3.Object.return_value = s3_object
+            mock_wr.catalog.sanitize_table_name.return_value = MOCK_TABLE_NAME
+            mock_s3_configuration.return_value.stage_bucket = MOCK_STAGE_BUCKET
+            mock_kms_configuration.return_value.get_kms_arn = MOCK_KMS_KEY
+
+            # upload_fileobj consumes the stream while the transform is running
+            uploaded = {}
+            mock_s3_interface.upload_fileobj.side_effect = \
+                lambda fileobj, bucket, key, **kwargs: uploaded.update({key: fileobj.read()})
+
             #{team}/{dataset}/{table_name}/{file_name}.{file_extension}
-            key = f"{MOCK_TEAM}/{MOCK_DATASET}/{table_name}/{file_name}.json.gz"
-            team = MOCK_TEAM
-            dataset = MOCK_DATASET
-            
-            # run the function code
-            test_response = CustomTransform().transform_object(resource_prefix, bucket, key, team, dataset)
-        
+            key = f"{MOCK_TEAM}/{MOCK_DATASET}/{MOCK_TABLE_NAME}/report-123.{file_extension}"
+            test_response = reports_light_transform.CustomTransform().transform_object(
+                "test-prefix", "XXXXXXXXXXX", key, MOCK_TEAM, MOCK_DATASET)
+        return test_response, uploaded
+
+    def test_transform_object(self):
+        report = json.dumps([{"test": "test"}] * 1000).encode('utf-8')
+        test_response, uploaded = self._transform_object(gzip.compress(report))
+
         # assert we write out an uncompressed file to the correct destination path
-        assert test_response == [f"pre-stage/{MOCK_TEAM}/{MOCK_DATASET}/{table_name}/{file_name}.json"]
-        
+        assert test_response == [f"pre-stage/{MOCK_TEAM}/{MOCK_DATASET}/{MOCK_TABLE_NAME}/report-123.json"]
+        assert uploaded[test_response[0]] == report
+
+    def test_transform_object_json(self):
+        test_response, uploaded = self._transform_object(b' \r\n{\n  "test": "te\\nst"\n}\n', file_extension="json")
+
+        # the document is written on a single line
+        assert test_response == [f"pre-stage/{MOCK_TEAM}/{MOCK_DATASET}/{MOCK_TABLE_NAME}/report-123.json"]
+        assert uploaded[test_response[0]] == b' {  "test": "te\\nst"}'
+
+    def test_transform_object_empty(self):
+        for body in [b'[]', b'  [\n  ]\n', b'{ }', b'']:
+            test_response, uploaded = self._transform_object(gzip.compress(body))
+            assert test_response == []
+            assert uploaded == {}
+
+    def test_sniff_empty(self):
+        from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms.reports_light_transform import \
+            CustomTransform, PrefixedStream
+        body = b' ' * 3000 + b'[ ' + b' ' * 3000 + b'{"a": 1}]'
+        stream = BytesIO(body)
+        is_empty, prefix = CustomTransform.sniff_empty(stream)
+        assert not is_empty
+        assert PrefixedStream(prefix, stream).read() == body
+
+        stream = BytesIO(b'[\n' + body + b'\n]')
+        assert PrefixedStream(stream.read(2), stream).read() == b'[' + body + b']'
+
+    @patch.dict(os.environ, {'REPORTS_LIGHT_TRANSFORM_OUTPUT_FORMAT': "ndjson"})
+    def test_transform_object_ndjson(self):
+        records = [{"campaignId": i, "cost": i / 3, "name": "caf\u00e9 \\n"} for i in range(1000)]
+        test_response, uploaded = self._transform_object(gzip.compress(json.dumps(records, indent=2).encode('utf-8')))
+
+        # one record per line
+        assert test_response == [f"pre-stage/{MOCK_TEAM}/{MOCK_DATASET}/{MOCK_TABLE_NAME}/report-123.ndjson"]
+        lines = uploaded[test_response[0]].decode('utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == records
+
+    @patch.dict(os.environ, {'REPORTS_LIGHT_TRANSFORM_OUTPUT_FORMAT': "ndjson"})
+    def test_transform_object_ndjson_sections(self):
+        report = {
+            "reportSpecification": {"reportType": "GET_SALES_AND_TRAFFIC_REPORT", "dataStartTime": "2024-01-01"},
+            "salesAndTrafficByDate": [{"date": "2024-01-01", "sales": {"units": 1}}, {"date": "2024-01-02", "sales": None}],
+            "salesAndTrafficByAsin": [],
+            "dataByAsin": [{"asin": "B000000000", "combinationPct": 1.5}]
+        }
+        test_response, uploaded = self._transform_object(json.dumps(report).encode('utf-8'), file_extension="json")
+
+        # one file per non-empty report section
+        prefix = f"pre-stage/{MOCK_TEAM}/{MOCK_DATASET}/{MOCK_TABLE_NAME}/report-123"
+        assert test_response == [f"{prefix}/salesAndTrafficByDate.ndjson", f"{prefix}/dataByAsin.ndjson"]
+        for key, section in zip(test_response, ["salesAndTrafficByDate", "dataByAsin"]):
+            lines = uploaded[key].decode('utf-8').splitlines()
+            assert [json.loads(line) for line in lines] == report[section]
+
+        test_response, uploaded = self._transform_object(gzip.compress(b'{"reportSpecification": {}, "dataByAsin": []}'))
+        assert test_response == []
+        assert uploaded == {}
+
+    def test_json_stream_reader(self):
+        from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.stage_a_transforms.reports_light_transform import \
+            JsonStreamReader
+        records = [12345678, -0.5e10, "\u00e9\u00e9\u00e9", None, True, {"a": [1, {"b": "]"}]}, []]
+        # values and multi-byte characters are split across chunks
+        reader = JsonStreamReader(BytesIO(json.dumps(records, ensure_ascii=False).encode('utf-8')), chunk_size=3)
+        assert list(reader.iter_array()) == records
+        assert reader.peek() == ''
+
+        reader = JsonStreamReader(BytesIO(b'[1, 2 3]'), chunk_size=3)
+        with self.assertRaises(ValueError):
+            list(reader.iter_array())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+# ###############################################################################
+# PURPOSE:
+#   * Unit test for data_lake/lambda_layers/data_lake_library/python/datalake_library/transforms/transform_handler
+# USAGE:
+#   ./run-unit-tests.sh --test-file-name data_lake_tests/layers/transforms/test_transform_handler.py
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from aws_solutions.core.helpers import _helpers_service_clients, _helpers_service_resources
+from data_lake.lambda_layers.data_lake_library.python.datalake_library.transforms.transform_handler import \
+    TransformHandler
+
+
+@pytest.fixture()
+def _mock_clients(monkeypatch):
+    with mock_aws():
+        ddb = boto3.resource('dynamodb', 'us-east-1')
+        ddb.create_table(AttributeDefinitions=[{'AttributeName': 'name', 'AttributeType': 'S'}],
+                         TableName="octagon-Datasets-dev-prefix",
+                         KeySchema=[{'AttributeName': 'name', 'KeyType': 'HASH'}],
+                         BillingMode='PAY_PER_REQUEST')
+        ddb.Table("octagon-Datasets-dev-prefix").put_item(
+            Item={
+                'name': "adtech-amcdataset",
+                'transforms': {
+                    'stage_a_transform': "amc_light_transform",
+                    'stage_b_transform': "default_heavy_transform"
+                },
+                'min_items_process': {'stage_b': 1, 'stage_c': 1},
+                'max_items_process': {'stage_b': 100, 'stage_c': 100}
+            }
+        )
+        ssm = boto3.client('ssm', 'us-east-1')
+        ssm.put_parameter(Name="/prefix/DynamoDB/ObjectMetadata", Value="octagon-ObjectMetadata-dev-prefix",
+                          Type="String")
+        ssm.put_parameter(Name="/prefix/DynamoDB/Datasets", Value="octagon-Datasets-dev-prefix", Type="String")
+        monkeypatch.setitem(_helpers_service_resources, 'dynamodb', ddb)
+        monkeypatch.setitem(_helpers_service_clients, 'ssm', ssm)
+        yield ddb
+
+
+def test_stage_transform_is_cached(_mock_clients):
+    transform = TransformHandler().stage_transform("prefix", "adtech", "amcdataset", "StageB")
+    assert transform.__module__ == "datalake_library.transforms.stage_b_transforms.default_heavy_transform"
+
+    _mock_clients.Table("octagon-Datasets-dev-prefix").delete_item(Key={'name': "adtech-amcdataset"})
+    assert TransformHandler().stage_transform("prefix", "adtech", "amcdataset", "StageB") is transform
+    assert TransformHandler().stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (1, 100)
+
+
+def test_stage_transform_invalidate(_mock_clients):
+    handler = TransformHandler()
+    assert handler.stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (1, 100)
+
+    _mock_clients.Table("octagon-Datasets-dev-prefix").update_item(
+        Key={'name': "adtech-amcdataset"},
+        UpdateExpression="SET max_items_process.stage_b = :max",
+        ExpressionAttributeValues={':max': 10}
+    )
+    assert handler.stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (1, 100)
+
+    TransformHandler.invalidate("prefix", "adtech", "amcdataset")
+    assert handler.stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (1, 10)
+
+
+def test_stage_transform_ttl(_mock_clients, monkeypatch):
+    monkeypatch.setenv("TRANSFORMS_CACHE_TTL", "0")
+    handler = TransformHandler()
+    assert handler.stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (1, 100)
+
+    _mock_clients.Table("octagon-Datasets-dev-prefix").update_item(
+        Key={'name': "adtech-amcdataset"},
+        UpdateExpression="SET min_items_process.stage_b = :min",
+        ExpressionAttributeValues={':min': 5}
+    )
+    assert handler.stage_processing_limits("prefix", "adtech", "amcdataset", "StageB") == (5, 100)
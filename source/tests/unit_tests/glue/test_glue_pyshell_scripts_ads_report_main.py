@@ -46,6 +46,19 @@ def test_parse_s3_object_key_valid_key(_mock_imports):
     assert output_s3_path == "post-stage/adtech/<team>/<table_name>/<filename>"
 
 
+def test_parse_s3_object_key_ndjson_key(_mock_imports):
+    from data_lake.glue.lambdas.sdlf_heavy_transform.adtech.ads_report.main import extract_table_name_and_s3_path, \
+        get_format_options
+
+    s3_object_key = 'pre-stage/adtech/<team>/<table_name>/<filename>.ndjson'
+
+    table_name, output_s3_path = extract_table_name_and_s3_path(s3_object_key)
+    assert table_name == "<table_name>"
+    assert output_s3_path == "post-stage/adtech/<team>/<table_name>/<filename>"
+    assert get_format_options(s3_object_key) == {"multiline": False}
+    assert "jsonPath" in get_format_options('pre-stage/adtech/<team>/<table_name>/<filename>.json')
+
+
 @patch('awsglue.context.GlueContext.create_dynamic_frame')
 def test_create_dynamic_frame_from_options(mock_create_dynamic_frame, _mock_imports):
     from data_lake.glue.lambdas.sdlf_heavy_transform.adtech.ads_report.main import load_source_data_from_s3
@@ -316,3 +316,19 @@ def test_process_files(_mock_imports, fake_glue_table_attrs):
             kms_key=kms_res["KeyMetadata"]["KeyId"],
             silver_catalog="glue_dbname"
         )
+
+
+def test_get_source_locations(_mock_imports):
+    from data_lake.glue.lambdas.sdlf_heavy_transform.adtech.amc import main
+
+    assert main.get_source_locations({'SOURCE_LOCATIONS': "s3://stage_bucket/a.csv,s3://stage_bucket/b.csv"}) == [
+        "s3://stage_bucket/a.csv", "s3://stage_bucket/b.csv"]
+
+    # the manifest is read with the shared utilities
+    with patch.object(main.glue_utils, 'read_source_manifest',
+                      return_value=(["pre-stage/adtech/amc/a.csv", "pre-stage/adtech/amc/b.csv"], {})) as read_manifest:
+        assert main.get_source_locations({
+            'SOURCE_LOCATION': "s3://stage_bucket/pre-stage/adtech/amc/a.csv",
+            'SOURCE_MANIFEST': "s3://stage_bucket/manifests/adtech/amc/batch.json"
+        }) == ["s3://stage_bucket/pre-stage/adtech/amc/a.csv", "s3://stage_bucket/pre-stage/adtech/amc/b.csv"]
+    read_manifest.assert_called_once_with("s3://stage_bucket/manifests/adtech/amc/batch.json")
@@ -49,6 +49,16 @@ def test_parse_s3_object_key_valid_key(_mock_imports):
     assert output_s3_path == "post-stage/adtech/<team>/<table_name>/<filename>"
 
 
+def test_parse_s3_object_key_ndjson_key(_mock_imports):
+    from data_lake.glue.lambdas.sdlf_heavy_transform.adtech.sp_report.main import parse_s3_object_key
+
+    s3_object_key = 'pre-stage/adtech/<team>/<table_name>/<filename>/dataByAsin.ndjson'
+
+    table_name, output_s3_path = parse_s3_object_key(s3_object_key)
+    assert table_name == "<table_name>"
+    assert output_s3_path == "post-stage/adtech/<team>/<table_name>/<filename>/dataByAsin"
+
+
 @patch('awsglue.context.GlueContext.create_dynamic_frame')
 def test_create_dynamic_frame_from_options(mock_create_dynamic_frame, _mock_imports):
     from data_lake.glue.lambdas.sdlf_heavy_transform.adtech.sp_report.main import load_source_data_from_s3
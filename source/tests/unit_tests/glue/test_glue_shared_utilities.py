@@ -5,7 +5,11 @@
 #   * Unit test for glue/sdlf_heavy_transform/shared/utilities.py.
 # USAGE:
 #   ./run-unit-tests.sh --test-file-name glue/test_glue_shared_utilities.py
+import json
+import os
+import time
 import pytest
+from moto import mock_aws
 from unittest.mock import MagicMock, patch
 import logging
 from botocore.exceptions import ClientError
@@ -122,6 +126,40 @@ def test_record_glue_metrics_failure(glue_utilities, mock_s3_client):
             'Error retrieving bytes_read Glue metric for source_key source_key1: An error occurred (InternalError) when calling the HeadObject operation: Internal Error'
         )
         
+def test_record_glue_metrics_source_sizes(glue_utilities, mock_s3_client):
+    mock_s3_client.head_object.return_value = {'ContentLength': 200}
+
+    glue_utilities.record_glue_metrics(
+        'source_bucket', 'destination_bucket',
+        source_keys=['source_key1', 'source_key2'],
+        source_sizes={'source_key1': 50}
+    )
+
+    mock_s3_client.head_object.assert_called_once_with(Bucket='source_bucket', Key='source_key2')
+    glue_utilities.cloudwatch_client.put_metric_data.assert_called_once_with(
+        Namespace=SOLUTION_ARGS['METRICS_NAMESPACE'],
+        MetricData=[{
+            'MetricName': 'SdlfHeavyTransformJob-bytes_read',
+            'Dimensions': [{'Name': 'stack-name', 'Value': SOLUTION_ARGS['RESOURCE_PREFIX']}],
+            'Value': 250,
+            'Unit': 'Count'
+        }]
+    )
+
+def test_get_source_object_keys(glue_utilities, mock_s3_client):
+    assert glue_utilities.get_source_object_keys({'SOURCE_S3_OBJECT_KEYS': 'key1,key2'}) == (['key1', 'key2'], {})
+
+    body = MagicMock()
+    body.read.return_value = json.dumps({
+        'bucket': 'stage_bucket',
+        'entries': [{'key': 'key1', 'size': 10, 'etag': 'etag1'}, {'key': 'key2'}]
+    }).encode('utf-8')
+    mock_s3_client.get_object.return_value = {'Body': body}
+
+    assert glue_utilities.get_source_object_keys({'SOURCE_MANIFEST': 's3://stage_bucket/manifests/batch.json'}) == \
+        (['key1', 'key2'], {'key1': 10})
+    mock_s3_client.get_object.assert_called_once_with(Bucket='stage_bucket', Key='manifests/batch.json')
+
 def test_get_s3_object_metadata(glue_utilities):
     metadata = glue_utilities.get_s3_object_metadata('bucket', 'key')
     assert metadata == {'timestamp': 'test'}
@@ -136,4 +174,68 @@ def test_map_fixed_value_column(glue_utilities):
     value = "test_value"
     output_record = glue_utilities.map_fixed_value_column(record=input_record, col_val=value, col_name=column)
     assert output_record == {column: value}
-    
\ No newline at end of file
+    
+@mock_aws
+def test_catalog_lease(glue_utilities):
+    import boto3
+    from data_lake.glue.lambdas.sdlf_heavy_transform.shared import utilities
+
+    dynamodb = boto3.client('dynamodb', region_name=os.environ['AWS_DEFAULT_REGION'])
+    dynamodb.create_table(TableName='catalog-leases',
+                          AttributeDefinitions=[{'AttributeName': 'name', 'AttributeType': 'S'}],
+                          KeySchema=[{'AttributeName': 'name', 'KeyType': 'HASH'}],
+                          BillingMode='PAY_PER_REQUEST')
+    glue_utilities.catalog_leases_table = 'catalog-leases'
+
+    with glue_utilities.catalog_lease('database', 'table', owner='run-1'):
+        item = dynamodb.get_item(TableName='catalog-leases', Key={'name': {'S': 'database.table'}})['Item']
+        assert item['owner'] == {'S': 'run-1'}
+
+        # another run waits for the lease, a lease on another table is independent
+        with patch.object(utilities, 'CATALOG_LEASE_WAIT_SECONDS', -1), patch.object(utilities.time, 'sleep') as sleep:
+            with pytest.raises(TimeoutError):
+                with glue_utilities.catalog_lease('database', 'table', owner='run-2'):
+                    pass
+            sleep.assert_not_called()
+            with glue_utilities.catalog_lease('database', 'other_table', owner='run-2'):
+                pass
+
+    assert 'Item' not in dynamodb.get_item(TableName='catalog-leases', Key={'name': {'S': 'database.table'}})
+
+    # an expired lease is taken over
+    dynamodb.put_item(TableName='catalog-leases',
+                      Item={'name': {'S': 'database.table'}, 'owner': {'S': 'run-1'}, 'ttl': {'N': '0'}})
+    with glue_utilities.catalog_lease('database', 'table', owner='run-2'):
+        pass
+
+@mock_aws
+def test_catalog_lease_renewal(glue_utilities):
+    import boto3
+    from data_lake.glue.lambdas.sdlf_heavy_transform.shared import utilities
+
+    dynamodb = boto3.client('dynamodb', region_name=os.environ['AWS_DEFAULT_REGION'])
+    dynamodb.create_table(TableName='catalog-leases',
+                          AttributeDefinitions=[{'AttributeName': 'name', 'AttributeType': 'S'}],
+                          KeySchema=[{'AttributeName': 'name', 'KeyType': 'HASH'}],
+                          BillingMode='PAY_PER_REQUEST')
+    glue_utilities.catalog_leases_table = 'catalog-leases'
+
+    # the lease is renewed while it is held
+    with patch.object(utilities, 'CATALOG_LEASE_RENEW_SECONDS', 0.01):
+        with glue_utilities.catalog_lease('database', 'table', owner='run-1'):
+            key = {'name': {'S': 'database.table'}}
+            dynamodb.update_item(TableName='catalog-leases', Key=key, UpdateExpression='SET #ttl = :ttl',
+                                 ExpressionAttributeNames={'#ttl': 'ttl'}, ExpressionAttributeValues={':ttl': {'N': '0'}})
+            deadline = time.time() + 5
+            while int(dynamodb.get_item(TableName='catalog-leases', Key=key)['Item']['ttl']['N']) == 0:
+                assert time.time() < deadline
+                time.sleep(0.01)
+
+    assert 'Item' not in dynamodb.get_item(TableName='catalog-leases', Key={'name': {'S': 'database.table'}})
+
+
+def test_catalog_lease_without_table(glue_utilities):
+    with patch.object(glue_utilities, 'get_service_client') as get_service_client:
+        with glue_utilities.catalog_lease('database', 'table'):
+            pass
+        get_service_client.assert_not_called()